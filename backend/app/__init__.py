@@ -1,4 +1,4 @@
-from flask import Flask
+from flask import Flask, Response
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from dotenv import load_dotenv
@@ -8,11 +8,16 @@ import os
 load_dotenv()
 
 # Initialize extensions
-db = SQLAlchemy()
+from app.replicas import RoutingSession
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 def create_app():
     app = Flask(__name__)
     
+    # Encode responses with orjson when it is installed
+    from app.serialization import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
     # Configuration
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     
@@ -25,25 +30,159 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # Connection pool settings and the SQLite pragma profile (default or production)
+    from app.engine import engine_options, install_sqlite_pragmas, is_sqlite, is_sqlite_memory, sqlite_pragmas
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_url)
+    app.config['SQLITE_PROFILE'] = os.getenv('SQLITE_PROFILE', 'production')
+    
+    # Read replicas for the GET endpoints, comma separated; each becomes a replica_N bind.
+    # A replica lagging more than REPLICA_MAX_LAG_SECONDS is skipped until it catches up.
+    replica_urls = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    replica_urls = [url.replace('postgres://', 'postgresql://', 1) for url in replica_urls]
+    app.config['SQLALCHEMY_BINDS'] = {
+        f'replica_{number}': {'url': url, **engine_options(url)} for number, url in enumerate(replica_urls)
+    }
+    app.config['REPLICA_MAX_LAG_SECONDS'] = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))
+    app.config['REPLICA_CHECK_INTERVAL'] = float(os.getenv('REPLICA_CHECK_INTERVAL', 5))
+    
+    # Worker processes serving the app (gunicorn.conf.py exports its worker count). In-process
+    # state only sees the writes of its own worker, so with several it is kept for seconds only
+    app.config['WEB_CONCURRENCY'] = int(os.getenv('WEB_CONCURRENCY', 1))
+    single_process = app.config['WEB_CONCURRENCY'] == 1
+    
+    # Seconds before the in-process stats view is rebuilt from the database
+    app.config['STATS_REFRESH_INTERVAL'] = int(os.getenv('STATS_REFRESH_INTERVAL', 30 if single_process else 2))
+    # Seconds between background recomputations of the overdue counts (0 computes them per request)
+    app.config['OVERDUE_REFRESH_INTERVAL'] = int(os.getenv('OVERDUE_REFRESH_INTERVAL', 60))
+    
+    # Rows per executemany INSERT on the bulk ingestion endpoints
+    app.config['BULK_BATCH_SIZE'] = int(os.getenv('BULK_BATCH_SIZE', 500))
+    app.config['BULK_MAX_BATCH_SIZE'] = int(os.getenv('BULK_MAX_BATCH_SIZE', 5000))
+    
+    # Rows fetched per server side cursor round trip when streaming exports
+    app.config['EXPORT_YIELD_PER'] = int(os.getenv('EXPORT_YIELD_PER', 1000))
+    
+    # Response cache for the read endpoints: memory, redis or none
+    # Writes invalidate the memory backend of their own worker only; use redis to share it
+    app.config['CACHE_BACKEND'] = os.getenv('CACHE_BACKEND', 'memory')
+    shared_cache = app.config['CACHE_BACKEND'] != 'memory' or single_process
+    app.config['CACHE_DEFAULT_TTL'] = int(os.getenv('CACHE_DEFAULT_TTL', 30 if shared_cache else 2))
+    app.config['CACHE_MAX_ENTRIES'] = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    app.config['CACHE_REDIS_URL'] = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    
+    # Server-Sent Event change feed: memory (per process) or redis pub/sub shared by all workers
+    app.config['EVENTS_BACKEND'] = os.getenv('EVENTS_BACKEND', 'memory')
+    app.config['EVENTS_REDIS_URL'] = os.getenv('EVENTS_REDIS_URL', app.config['CACHE_REDIS_URL'])
+    app.config['EVENTS_BUFFER_SIZE'] = int(os.getenv('EVENTS_BUFFER_SIZE', 1000))
+    app.config['EVENTS_HEARTBEAT_INTERVAL'] = int(os.getenv('EVENTS_HEARTBEAT_INTERVAL', 15))
+    app.config['EVENTS_STREAM_TIMEOUT'] = int(os.getenv('EVENTS_STREAM_TIMEOUT', 300))
+    # Each stream occupies a worker thread, keep this below gunicorn's --threads
+    app.config['EVENTS_MAX_STREAMS'] = int(os.getenv('EVENTS_MAX_STREAMS', 16))
+    
+    # Sub-requests accepted by one POST /api/batch call
+    app.config['BATCH_MAX_REQUESTS'] = int(os.getenv('BATCH_MAX_REQUESTS', 20))
+    
+    # Background jobs: worker threads per process (0 only enqueues), poll interval for jobs
+    # queued by other processes, and the lease after which a crashed job is claimed again
+    app.config['JOBS_WORKERS'] = int(os.getenv('JOBS_WORKERS', 1))
+    app.config['JOBS_POLL_INTERVAL'] = float(os.getenv('JOBS_POLL_INTERVAL', 5))
+    app.config['JOBS_LEASE_SECONDS'] = int(os.getenv('JOBS_LEASE_SECONDS', 300))
+    app.config['JOBS_MAX_ATTEMPTS'] = int(os.getenv('JOBS_MAX_ATTEMPTS', 3))
+    
+    # Archiving: completed tasks idle for ARCHIVE_AFTER_DAYS move to the archive tables,
+    # ARCHIVE_BATCH_SIZE per transaction, queued every ARCHIVE_INTERVAL seconds (0, the default, disables it)
+    app.config['ARCHIVE_AFTER_DAYS'] = int(os.getenv('ARCHIVE_AFTER_DAYS', 90))
+    app.config['ARCHIVE_BATCH_SIZE'] = int(os.getenv('ARCHIVE_BATCH_SIZE', 500))
+    app.config['ARCHIVE_INTERVAL'] = int(os.getenv('ARCHIVE_INTERVAL', 0))
+    
+    # Admission control. Token buckets per client and endpoint, in requests per second with
+    # RATE_LIMIT_BURST_SECONDS of burst, shared by the workers gunicorn forks (0 disables a class).
+    # Off unless enabled: behind a proxy every request comes from the proxy's address until
+    # RATE_LIMIT_PROXY_HOPS is set, and all clients would share one bucket
+    app.config['RATE_LIMIT_ENABLED'] = os.getenv('RATE_LIMIT_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    app.config['RATE_LIMIT_READS'] = float(os.getenv('RATE_LIMIT_READS', 50))
+    app.config['RATE_LIMIT_WRITES'] = float(os.getenv('RATE_LIMIT_WRITES', 10))
+    app.config['RATE_LIMIT_EXPORTS'] = float(os.getenv('RATE_LIMIT_EXPORTS', 0.2))
+    app.config['RATE_LIMIT_BURST_SECONDS'] = float(os.getenv('RATE_LIMIT_BURST_SECONDS', 2))
+    app.config['RATE_LIMIT_SLOTS'] = int(os.getenv('RATE_LIMIT_SLOTS', 4096))
+    # Proxies in front of the app whose X-Forwarded-For entry is trusted to name the client
+    app.config['RATE_LIMIT_PROXY_HOPS'] = int(os.getenv('RATE_LIMIT_PROXY_HOPS', 0))
+    # Concurrent requests per worker and class (0 is unbounded), and the queueing budget after
+    # which a request is shed with 503; keep the sum below gunicorn's --threads
+    app.config['ADMISSION_MAX_READS'] = int(os.getenv('ADMISSION_MAX_READS', 12))
+    app.config['ADMISSION_MAX_WRITES'] = int(os.getenv('ADMISSION_MAX_WRITES', 4))
+    app.config['ADMISSION_MAX_EXPORTS'] = int(os.getenv('ADMISSION_MAX_EXPORTS', 2))
+    app.config['ADMISSION_QUEUE_BUDGET_MS'] = float(os.getenv('ADMISSION_QUEUE_BUDGET_MS', 500))
+    
+    # Response compression (brotli when installed, else gzip) for bodies of at least COMPRESSION_MIN_SIZE bytes
+    app.config['COMPRESSION'] = os.getenv('COMPRESSION', 'true').lower() in ('1', 'true', 'yes')
+    app.config['COMPRESSION_MIN_SIZE'] = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    app.config['COMPRESSION_GZIP_LEVEL'] = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    app.config['COMPRESSION_BROTLI_QUALITY'] = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+    
+    # Request instrumentation: Server-Timing headers and an opt-in slow query log (0 disables it)
+    app.config['SERVER_TIMING'] = os.getenv('SERVER_TIMING', 'true').lower() in ('1', 'true', 'yes')
+    app.config['SLOW_QUERY_LOG_MS'] = float(os.getenv('SLOW_QUERY_LOG_MS', 0))
+    
     # Initialize extensions with app
     db.init_app(app)
     
-    # CORS configuration - Custom origin checker for Vercel domains
-    def check_origin(origin):
-        allowed_origins = [
-            "http://localhost:3000",
-            "http://127.0.0.1:3000"
-        ]
-        
-        # Allow any vercel.app domain
-        if origin and (origin.endswith('.vercel.app') or origin in allowed_origins):
-            return True
-        return False
+    from app.metrics import metrics
+    from app.replicas import replica_router
+    with app.app_context():
+        databases = [(database_url, db.engine)]
+        databases += [(url, db.engines[name]) for name, url in zip(app.config['SQLALCHEMY_BINDS'], replica_urls)]
+        for url, engine in databases:
+            if is_sqlite(url) and not is_sqlite_memory(url):
+                install_sqlite_pragmas(engine, sqlite_pragmas(app.config['SQLITE_PROFILE']))
+        replica_router.init_app(app, db)
+        metrics.init_app(app, db.engine, *replica_router.engines)
+    
+    # Registered after metrics, so shed requests are still counted and timed
+    from app.admission import admission
+    admission.init_app(app)
+    
+    # After-request hooks run in reverse, so this one runs before metrics and the body size counts compressed bytes
+    from app.compression import compression
+    compression.init_app(app)
+    
+    from app.cache import response_cache
+    response_cache.init_app(app)
+    
+    from app.stats import task_stats
+    task_stats.init_app(app)
+    
+    from app.events import event_bus
+    event_bus.init_app(app)
+    
+    from app.jobs import job_queue
+    job_queue.init_app(app)
+    
+    from app.scheduler import scheduler
+    scheduler.init_app(app)
+    scheduler.every(app.config['OVERDUE_REFRESH_INTERVAL'], task_stats.refresh_overdue)
+    if replica_router.replicas:
+        scheduler.every(app.config['REPLICA_CHECK_INTERVAL'], replica_router.check)
+    
+    from app import archive
+    archive.init_app(app)
+    
+    from app import migrations
+    migrations.init_app(app)
+    
+    # CORS configuration - local dev servers plus any vercel.app domain.
+    # Flask-CORS only accepts strings and regexes here, a callable breaks every request.
+    allowed_origins = [
+        "http://localhost:3000",
+        "http://127.0.0.1:3000",
+        r".*\.vercel\.app$"
+    ]
     
     CORS(app, 
-         origins=check_origin,
-         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-         allow_headers=["Content-Type", "Authorization"],
+         origins=allowed_origins,
+         methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+         allow_headers=["Content-Type", "Authorization", "If-Match", "If-None-Match", "Prefer"],
+         expose_headers=["ETag", "Preference-Applied", "Location", "Retry-After"],
          supports_credentials=True)
     
     # Add basic routes for testing
@@ -61,20 +200,33 @@ def create_app():
         except Exception as e:
             return {'status': 'unhealthy', 'message': 'Database connection failed', 'error': str(e)}, 500
     
+    # Prometheus scrape endpoint for the per worker request metrics
+    @app.route('/api/metrics')
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+    
     # Add database initialization endpoint
     @app.route('/api/init-db')
     def init_database():
         try:
-            db.create_all()
-            return {'status': 'success', 'message': 'Database tables created successfully'}
+            applied = migrations.upgrade()
+            return {'status': 'success', 'message': 'Database schema is up to date', 'applied_migrations': applied}
         except Exception as e:
-            return {'status': 'error', 'message': 'Failed to create database tables', 'error': str(e)}, 500
+            return {'status': 'error', 'message': 'Failed to apply database migrations', 'error': str(e)}, 500
     
     # Register blueprints
     from app.routes.tasks import tasks_bp
     from app.routes.comments import comments_bp
+    from app.routes.events import events_bp
+    from app.routes.sync import sync_bp
+    from app.routes.jobs import jobs_bp
+    from app.routes.batch import batch_bp
     
     app.register_blueprint(tasks_bp, url_prefix='/api')
     app.register_blueprint(comments_bp, url_prefix='/api')
+    app.register_blueprint(events_bp, url_prefix='/api')
+    app.register_blueprint(sync_bp, url_prefix='/api')
+    app.register_blueprint(jobs_bp, url_prefix='/api')
+    app.register_blueprint(batch_bp, url_prefix='/api')
     
     return app
\ No newline at end of file
@@ -0,0 +1,168 @@
+import hashlib
+import math
+import mmap
+import multiprocessing
+import struct
+import threading
+import time
+
+from flask import current_app, g, jsonify, request
+
+from app.batch import is_subrequest
+from app.metrics import metrics
+
+ENDPOINT_CLASSES = ('reads', 'writes', 'exports')
+EXPORT_ENDPOINTS = {'tasks.export_tasks'}
+# Probes and the scrape endpoint must answer under load; event streams are capped by EVENTS_MAX_STREAMS
+EXEMPT_ENDPOINTS = {'root', 'health_check', 'metrics_endpoint', 'events.stream_events'}
+READ_METHODS = ('GET', 'HEAD')
+
+
+class SharedBuckets:
+    """Token buckets in an anonymous shared memory map
+
+    The map and its lock are inherited by processes forked after they are
+    created, so with gunicorn's preload_app every worker draws from the same
+    buckets. Keys hash into a fixed number of slots; a key that lands on a
+    slot held by another takes it over with a full bucket, which errs on the
+    side of admitting.
+    """
+
+    # Key hash, tokens left, time of the last refill
+    SLOT = struct.Struct('Qdd')
+
+    def __init__(self, slots=4096):
+        self.slots = slots
+        self._map = mmap.mmap(-1, slots * self.SLOT.size)
+        self._lock = multiprocessing.Lock()
+
+    def take(self, key, rate, capacity):
+        """Take a token from key's bucket; returns 0 when admitted, else the seconds until one is available"""
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big') or 1
+        offset = key_hash % self.slots * self.SLOT.size
+
+        # A worker killed while holding the lock must not stall the others; admit instead
+        if not self._lock.acquire(timeout=0.05):
+            return 0.0
+        try:
+            now = time.monotonic()
+            stored_hash, tokens, refilled_at = self.SLOT.unpack_from(self._map, offset)
+            if stored_hash != key_hash:
+                tokens, refilled_at = capacity, now
+            tokens = min(capacity, tokens + (now - refilled_at) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self.SLOT.pack_into(self._map, offset, key_hash, tokens, now)
+            return wait
+        finally:
+            self._lock.release()
+
+
+class AdmissionControl:
+    """Rate limits per client and endpoint, and concurrency limits per endpoint class
+
+    Requests are classed as reads, writes or exports. With RATE_LIMIT_ENABLED,
+    each client gets a token bucket per endpoint, refilled at the class's
+    RATE_LIMIT_* rate and answered with 429 once empty. Each class then holds at most ADMISSION_MAX_* requests
+    per worker; a request that has already waited ADMISSION_QUEUE_BUDGET_MS,
+    upstream (X-Request-Start) or for a slot, is shed with 503 instead of
+    queueing behind the others.
+    """
+
+    def __init__(self):
+        self.buckets = None
+        self.rates = {}
+        self.slots = {}
+
+    def init_app(self, app):
+        self.buckets = SharedBuckets(app.config['RATE_LIMIT_SLOTS'])
+        burst_seconds = app.config['RATE_LIMIT_BURST_SECONDS']
+        for endpoint_class in ENDPOINT_CLASSES:
+            rate = app.config[f'RATE_LIMIT_{endpoint_class.upper()}'] if app.config['RATE_LIMIT_ENABLED'] else 0
+            self.rates[endpoint_class] = (rate, max(1.0, rate * burst_seconds)) if rate else None
+            limit = app.config[f'ADMISSION_MAX_{endpoint_class.upper()}']
+            self.slots[endpoint_class] = threading.BoundedSemaphore(limit) if limit else None
+
+        app.before_request(self._admit)
+
+        @app.teardown_request
+        def release_slot(exception=None):
+            # Batch sub-requests share the batch's g; the slot is the batch's until it finishes
+            if is_subrequest():
+                return
+            # Streamed exports keep their request context, so this runs once the body is sent
+            slot = g.pop('admission_slot', None)
+            if slot is not None:
+                slot.release()
+
+    @staticmethod
+    def endpoint_class():
+        if request.endpoint in EXPORT_ENDPOINTS:
+            return 'exports'
+        return 'reads' if request.method in READ_METHODS else 'writes'
+
+    @staticmethod
+    def client():
+        """The client address, skipping the RATE_LIMIT_PROXY_HOPS proxies in front of the app"""
+        hops = current_app.config['RATE_LIMIT_PROXY_HOPS']
+        if not hops:
+            return request.remote_addr or 'unknown'
+        route = request.access_route
+        return route[max(len(route) - hops, 0)]
+
+    @staticmethod
+    def queued_seconds():
+        """Time spent in front of the app, from the proxy's X-Request-Start header (seconds or milliseconds)"""
+        header = request.headers.get('X-Request-Start', '')
+        try:
+            started = float(header.removeprefix('t='))
+        except ValueError:
+            return 0.0
+        # Heroku and most proxies send milliseconds, nginx's $msec sends seconds
+        if started > 1e11:
+            started /= 1000
+        return max(0.0, time.time() - started)
+
+    def _admit(self):
+        # Batched sub-requests were admitted with their batch; unmatched paths cost nothing to reject
+        if is_subrequest() or request.method == 'OPTIONS' or request.endpoint in EXEMPT_ENDPOINTS | {None}:
+            return None
+        endpoint_class = self.endpoint_class()
+
+        # Token bucket per client and endpoint
+        rate = self.rates[endpoint_class]
+        if rate:
+            wait = self.buckets.take(f'{self.client()}|{request.endpoint}', *rate)
+            if wait:
+                return self._shed(429, endpoint_class, 'rate_limited', wait, 'Too many requests. Retry later.')
+
+        # Requests that already queued past the budget are stale for the client; drop them first
+        budget = current_app.config['ADMISSION_QUEUE_BUDGET_MS'] / 1000
+        queued = self.queued_seconds()
+        if budget and queued > budget:
+            return self._shed(503, endpoint_class, 'queue_timeout', 1, 'Server is busy. Retry later.')
+
+        # Concurrency slot for the class, waiting no longer than what is left of the budget
+        slot = self.slots[endpoint_class]
+        if slot is not None:
+            started = time.perf_counter()
+            acquired = slot.acquire(timeout=budget - queued) if budget else slot.acquire()
+            queued += time.perf_counter() - started
+            if not acquired:
+                return self._shed(503, endpoint_class, 'over_capacity', 1, 'Server is busy. Retry later.')
+            g.admission_slot = slot
+        metrics.queue_time.observe(queued, endpoint_class)
+        return None
+
+    @staticmethod
+    def _shed(status, endpoint_class, reason, retry_after, message):
+        metrics.shed_requests.inc(request.endpoint, endpoint_class, reason)
+        return jsonify({
+            'success': False,
+            'error': message
+        }), status, {'Retry-After': str(max(1, math.ceil(retry_after)))}
+
+admission = AdmissionControl()
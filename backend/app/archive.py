@@ -0,0 +1,202 @@
+"""Hot/cold tiering: completed tasks move to the archive tables once they have been idle long enough
+
+The archiver copies tasks completed more than ARCHIVE_AFTER_DAYS ago, with
+their comments, into archived_tasks and archived_comments, adds them to
+archive_counters and deletes them from the hot tables, one batch per
+transaction. The stats view adds the counters to the hot counts, so totals
+don't change when tasks move, and GET /api/tasks?include_archived=true reads
+both tiers through tiered_task_statement. Archived tasks stay readable on
+their id and reach sync clients as changes, not deletes.
+"""
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+
+from app import db
+from app.cache import response_cache
+from app.events import event_bus
+from app.jobs import job_queue
+from app.models.archive import ArchiveCounter, ArchivedComment, ArchivedTask
+from app.models.change_log import ChangeLog
+from app.models.comment import Comment
+from app.models.job import Job
+from app.models.task import Task
+from app.pagination import keyset_filter
+from app.stats import task_stats
+
+ARCHIVED_TASK_COLUMNS = ['id', 'title', 'description', 'status', 'priority', 'due_date', 'created_at', 'updated_at', 'version']
+ARCHIVED_COMMENT_COLUMNS = ['task_id', 'id', 'content', 'author', 'created_at', 'updated_at', 'version']
+
+# Ids per IN list, well below the bound parameter limits of SQLite and PostgreSQL
+MAX_BATCH_SIZE = 5000
+
+
+def parse_archive_options(data):
+    """Validate the optional after_days and batch_size of an archiving request"""
+    options = {}
+    for name, minimum in (('after_days', 0), ('batch_size', 1)):
+        value = data.get(name)
+        if value is None:
+            options[name] = None
+        elif isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+            raise ValueError(f'{name} must be an integer of at least {minimum}')
+        else:
+            options[name] = min(value, MAX_BATCH_SIZE) if name == 'batch_size' else value
+    return options
+
+
+def archivable_statement(cutoff, batch_size):
+    """Select the ids of the next batch of tasks completed before cutoff, oldest change first"""
+    # Task ids are never reused since migration 0011; a task that was handed an archived
+    # id before it stays hot instead of failing every run on the archive's primary key
+    archived = db.select(ArchivedTask.id).where(ArchivedTask.id == Task.id).exists()
+    return db.select(Task.id)\
+        .where(Task.status == 'completed', Task.updated_at < cutoff, ~archived)\
+        .order_by(Task.updated_at)\
+        .limit(batch_size)
+
+
+def add_to_counters(ids):
+    """Count a batch of tasks, still in the hot table, into archive_counters"""
+    groups = db.session.execute(
+        db.select(Task.status, Task.priority, db.func.count())
+        .where(Task.id.in_(ids))
+        .group_by(Task.status, Task.priority)
+    ).all()
+    for status, priority, count in groups:
+        updated = db.session.execute(
+            db.update(ArchiveCounter)
+            .where(ArchiveCounter.status == status, ArchiveCounter.priority == priority)
+            .values(count=ArchiveCounter.count + count)
+        )
+        if updated.rowcount == 0:
+            db.session.execute(db.insert(ArchiveCounter).values(status=status, priority=priority, count=count))
+
+
+def archive_batch(ids):
+    """Move one batch of tasks and their comments to the archive in one transaction; returns the comment count"""
+    now = datetime.utcnow()
+    db.session.execute(
+        db.insert(ArchivedTask).from_select(
+            ARCHIVED_TASK_COLUMNS + ['comments_count', 'archived_at'],
+            db.select(*[getattr(Task, name) for name in ARCHIVED_TASK_COLUMNS], Task.comments_count, db.literal(now))
+            .where(Task.id.in_(ids))
+        )
+    )
+    comments = db.session.execute(
+        db.insert(ArchivedComment).from_select(
+            ARCHIVED_COMMENT_COLUMNS,
+            db.select(*[getattr(Comment, name) for name in ARCHIVED_COMMENT_COLUMNS]).where(Comment.task_id.in_(ids))
+        )
+    ).rowcount
+    add_to_counters(ids)
+
+    # The database deletes the comments with their tasks (migration 0006), and the
+    # change log triggers record tombstones for them. Sync clients would drop the moved
+    # rows, so their entries are flipped back to changes, read from the archive tables
+    logged_before = db.session.scalar(db.select(db.func.coalesce(db.func.max(ChangeLog.seq), 0)))
+    db.session.execute(db.delete(Task).where(Task.id.in_(ids)))
+    db.session.execute(
+        db.update(ChangeLog)
+        .where(ChangeLog.seq > logged_before, ChangeLog.task_id.in_(ids), ChangeLog.deleted.is_(True))
+        .values(deleted=False)
+    )
+    db.session.commit()
+    return comments
+
+
+def archive_completed_tasks(after_days=None, batch_size=None, max_batches=None):
+    """Archive every task completed more than after_days ago, batch by batch; returns the totals"""
+    after_days = current_app.config['ARCHIVE_AFTER_DAYS'] if after_days is None else after_days
+    batch_size = batch_size or current_app.config['ARCHIVE_BATCH_SIZE']
+    cutoff = datetime.utcnow() - timedelta(days=after_days)
+
+    tasks = comments = batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = db.session.scalars(archivable_statement(cutoff, batch_size)).all()
+        if not ids:
+            break
+        comments += archive_batch(ids)
+        tasks += len(ids)
+        batches += 1
+
+        for task_id in ids:
+            response_cache.invalidate(task_id, removed=True)
+        event_bus.publish('tasks.archived', {'ids': ids})
+
+    if tasks:
+        # Hot counts moved to the counters; reload so the split between the tiers is current
+        task_stats.invalidate()
+    return {
+        'archived_tasks': tasks,
+        'archived_comments': comments,
+        'batches': batches,
+        'cutoff': cutoff.isoformat()
+    }
+
+
+@job_queue.handler('tasks.archive')
+def run_archive(payload):
+    """Background archiving run, queued by the scheduler or POST /api/tasks/archive"""
+    return archive_completed_tasks(payload.get('after_days'), payload.get('batch_size'))
+
+
+def enqueue_archive():
+    """Queue an archiving run unless one is already waiting or running; the scheduler calls this"""
+    pending = db.session.scalar(
+        db.select(db.exists().where(Job.kind == 'tasks.archive', Job.status.in_(['queued', 'running'])))
+    )
+    if pending:
+        return None
+    return job_queue.enqueue('tasks.archive', {})
+
+
+def tiered_task_statement(fields, status=None, priority=None, ids=None, cursor=None, limit=None):
+    """Select tasks from both tiers, newest first, with an archived flag
+
+    Each tier is filtered, ordered and limited on its own indexes before the
+    two pages are merged, so a page never reads more than limit rows per tier.
+    """
+    columns = set(fields) | {'id', 'created_at'}
+    names = [name for name in Task.PROJECTABLE_FIELDS if name in columns]
+
+    pages = []
+    for model, archived in ((Task, False), (ArchivedTask, True)):
+        # Labelled, since column properties such as Task.comments_count lose their name inside a subquery
+        columns = [getattr(model, name).label(name) for name in names]
+        statement = db.select(*columns, db.literal(archived, db.Boolean).label('archived'))
+        if status:
+            statement = statement.where(model.status == status)
+        if priority:
+            statement = statement.where(model.priority == priority)
+        if ids is not None:
+            statement = statement.where(model.id.in_(ids))
+        if cursor:
+            statement = keyset_filter(statement, model.created_at, model.id, cursor)
+        statement = statement.order_by(model.created_at.desc(), model.id.desc())
+        if limit is not None:
+            statement = statement.limit(limit)
+        # Wrapped so each tier keeps its own ORDER BY and LIMIT inside the UNION
+        pages.append(db.select(statement.subquery()))
+
+    tiers = db.union_all(*pages).subquery('tiers')
+    statement = db.select(tiers).order_by(tiers.c.created_at.desc(), tiers.c.id.desc())
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+def init_app(app):
+    """Register the archiving CLI command and, when ARCHIVE_INTERVAL is set, the scheduled run"""
+    from app.scheduler import scheduler
+    scheduler.every(app.config['ARCHIVE_INTERVAL'], enqueue_archive)
+
+    @app.cli.command('archive-tasks')
+    @click.option('--after-days', type=int, default=None, help='Archive tasks completed more than this many days ago')
+    @click.option('--batch-size', type=int, default=None)
+    def archive_tasks_command(after_days, batch_size):
+        """Move old completed tasks and their comments to the archive tables"""
+        result = archive_completed_tasks(after_days, batch_size)
+        click.echo(f"Archived {result['archived_tasks']} tasks and {result['archived_comments']} comments "
+                   f"completed before {result['cutoff']}")
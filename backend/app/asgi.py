@@ -0,0 +1,505 @@
+"""Async ASGI variant of the task and comment API
+
+Serves the /api/tasks and /api/comments routes with async handlers over
+SQLAlchemy's asyncio extension (aiosqlite for SQLite, asyncpg for
+PostgreSQL), so one process can keep thousands of connections open while
+queries are in flight. Validation and serialization are shared with the
+Flask blueprints, and writes invalidate the response cache and publish
+their events through the Flask app's backends. Search, export, bulk
+ingestion, PATCH, stats and metrics stay on the WSGI app in run.py.
+"""
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm.exc import StaleDataError
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse as BaseJSONResponse
+from starlette.routing import Route
+
+from app.archive import tiered_task_statement
+from app.cache import response_cache
+from app.comment_pages import (
+    comment_page, comment_page_statement, parse_embed, split_task_with_comments, task_with_comments_statement,
+)
+from app.conditional import version_etag
+from app.engine import engine_options, install_sqlite_pragmas, is_sqlite, is_sqlite_memory, sqlite_pragmas
+from app.events import event_bus
+from app.models.archive import ArchivedTask
+from app.models.comment import Comment
+from app.models.task import Task
+from app.pagination import encode_cursor, keyset_filter, parse_fields, parse_ids, parse_limit
+from app.routes.tasks import build_task_query
+from app.serialization import FastJSONProvider, orjson, rows_to_dicts
+
+# Async drivers for the database URLs accepted by create_app
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg'
+}
+
+
+def async_database_url(database_url):
+    """Swap the driver of a sync database URL for its asyncio counterpart"""
+    scheme, separator, rest = database_url.partition('://')
+    dialect = scheme.split('+')[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver configured for {scheme} databases')
+    return ASYNC_DRIVERS[dialect] + separator + rest
+
+
+class JSONResponse(BaseJSONResponse):
+    """JSON response encoded like the Flask app's FastJSONProvider"""
+
+    def render(self, content):
+        if orjson is not None:
+            return orjson.dumps(content, default=FastJSONProvider.default)
+        return json.dumps(content, default=FastJSONProvider.default, separators=(',', ':')).encode('utf-8')
+
+
+def error_response(error, status_code, **extra):
+    return JSONResponse({'success': False, 'error': error, **extra}, status_code=status_code)
+
+
+async def read_json(request):
+    """Return the parsed request body, or None when it is missing or invalid"""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+def create_asgi_app(flask_app):
+    """Create the Starlette app from a configured Flask app"""
+    config = flask_app.config
+    database_url = config['SQLALCHEMY_DATABASE_URI']
+    options = engine_options(database_url)
+    if is_sqlite(database_url):
+        # A local file can't drop the connection, and with aiosqlite every ping
+        # is an extra hop through the connection's thread on each checkout
+        options['pool_pre_ping'] = False
+
+    engine = create_async_engine(async_database_url(database_url), **options)
+    if is_sqlite(database_url) and not is_sqlite_memory(database_url):
+        install_sqlite_pragmas(engine.sync_engine, sqlite_pragmas(config['SQLITE_PROFILE']))
+
+    # Objects stay readable after commit; attribute access must never trigger IO here
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    def publish_change(task_id, event_type, data, removed=False):
+        """Invalidate cached responses and publish the event, like the Flask write routes after their commit"""
+        with flask_app.app_context():
+            response_cache.invalidate(task_id, removed)
+            event_bus.publish(event_type, data)
+
+    async def get_tasks(request):
+        """Get all tasks with optional filtering, cursor pagination and field projection, or the tasks listed in ids"""
+        try:
+            status = request.query_params.get('status')
+            priority = request.query_params.get('priority')
+            cursor = request.query_params.get('cursor')
+            ids = request.query_params.get('ids')
+            paginate = ids is None and (cursor is not None or 'limit' in request.query_params)
+            include_archived = request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+            try:
+                limit = parse_limit(request.query_params.get('limit'))
+                fields = parse_fields(request.query_params.get('fields'), Task.PROJECTABLE_FIELDS) or Task.PROJECTABLE_FIELDS
+                ids = parse_ids(ids) if ids is not None else None
+            except ValueError as e:
+                return error_response(str(e), 400)
+
+            next_cursor = None
+            if include_archived:
+                # Hot and archived tasks in one UNION ALL statement, flagged by tier
+                try:
+                    statement = tiered_task_statement(
+                        fields, status, priority, ids,
+                        cursor=cursor if paginate else None,
+                        limit=limit + 1 if paginate else None
+                    )
+                except ValueError as e:
+                    return error_response(str(e), 400)
+                fields = fields + ['archived']
+            else:
+                statement = build_task_query(status, priority, fields)
+                if ids is not None:
+                    statement = statement.where(Task.id.in_(ids))
+                elif paginate:
+                    if cursor:
+                        try:
+                            statement = keyset_filter(statement, Task.created_at, Task.id, cursor)
+                        except ValueError as e:
+                            return error_response(str(e), 400)
+                    statement = statement.limit(limit + 1)
+
+            async with sessions() as session:
+                tasks = (await session.execute(statement)).all()
+
+            missing = None
+            if ids is not None:
+                # Returned in the order the ids were asked for
+                found = {task.id: task for task in tasks}
+                tasks = [found[task_id] for task_id in ids if task_id in found]
+                missing = [task_id for task_id in ids if task_id not in found]
+            if paginate and len(tasks) > limit:
+                tasks = tasks[:limit]
+                next_cursor = encode_cursor(tasks[-1].created_at, tasks[-1].id)
+
+            items = rows_to_dicts(tasks, fields)
+            response = {
+                'success': True,
+                'tasks': items,
+                'count': len(items)
+            }
+            if paginate:
+                response['next_cursor'] = next_cursor
+            if missing is not None:
+                response['missing'] = missing
+            return JSONResponse(response)
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+    async def create_task(request):
+        """Create a new task"""
+        try:
+            data = await read_json(request)
+            if not data:
+                return error_response('No data provided', 400)
+
+            task = Task(
+                title=data.get('title'),
+                description=data.get('description', ''),
+                status=data.get('status', 'pending'),
+                priority=data.get('priority', 'medium')
+            )
+
+            if data.get('due_date'):
+                try:
+                    task.due_date = Task.parse_due_date(data['due_date'])
+                except ValueError:
+                    return error_response('Invalid due_date format. Use ISO format.', 400)
+
+            validation_errors = task.validate()
+            if validation_errors:
+                return error_response('Validation failed', 400, validation_errors=validation_errors)
+
+            async with sessions() as session:
+                session.add(task)
+                await session.commit()
+                # Load the defaults and comments_count before the session closes
+                await session.refresh(task)
+
+            task_dict = task.to_dict()
+            # Redis calls block, so they run off the event loop
+            await run_in_threadpool(publish_change, None, 'task.created', task_dict)
+
+            return JSONResponse({
+                'success': True,
+                'message': 'Task created successfully',
+                'task': task_dict
+            }, status_code=201)
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+    async def get_task(request):
+        """Get a specific task by ID with its comments, or only the newest N with embed=comments:N"""
+        try:
+            task_id = request.path_params['task_id']
+            try:
+                embed = parse_embed(request.query_params.get('embed'))
+            except ValueError as e:
+                return error_response(str(e), 400)
+
+            async with sessions() as session:
+                rows = (await session.execute(task_with_comments_statement(task_id, embed))).all()
+                task_dict, comments, next_cursor = split_task_with_comments(rows, embed)
+                if task_dict is None:
+                    rows = (await session.execute(task_with_comments_statement(task_id, embed, archived=True))).all()
+                    task_dict, comments, next_cursor = split_task_with_comments(rows, embed)
+                    if task_dict is None:
+                        return error_response('Task not found', 404)
+                    task_dict['archived'] = True
+
+            response = {
+                'success': True,
+                'task': task_dict
+            }
+            if embed != 0:
+                task_dict['comments'] = comments
+            if embed:
+                response['comments_next_cursor'] = next_cursor
+            return JSONResponse(response)
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+    async def update_task(request):
+        """Update a specific task"""
+        try:
+            task_id = request.path_params['task_id']
+            async with sessions() as session:
+                task = await session.get(Task, task_id)
+                if not task:
+                    return error_response('Task not found', 404)
+
+                data = await read_json(request)
+                if not data:
+                    return error_response('No data provided', 400)
+
+                for name in ('title', 'description', 'status', 'priority'):
+                    if name in data:
+                        setattr(task, name, data[name])
+                if 'due_date' in data:
+                    if data['due_date']:
+                        try:
+                            task.due_date = Task.parse_due_date(data['due_date'])
+                        except ValueError:
+                            return error_response('Invalid due_date format. Use ISO format.', 400)
+                    else:
+                        task.due_date = None
+
+                validation_errors = task.validate()
+                if validation_errors:
+                    return error_response('Validation failed', 400, validation_errors=validation_errors)
+
+                task.updated_at = datetime.utcnow()
+                try:
+                    await session.commit()
+                except StaleDataError:
+                    await session.rollback()
+                    current_version = await session.scalar(select(Task.version).where(Task.id == task_id))
+                    if current_version is None:
+                        return error_response('Task not found', 404)
+                    response = error_response('Task was modified by another request; reload it and retry', 409,
+                                              current_version=current_version)
+                    response.headers['ETag'] = f'"{version_etag(current_version)}"'
+                    return response
+                await session.refresh(task)
+
+            task_dict = task.to_dict()
+            await run_in_threadpool(publish_change, task_id, 'task.updated', task_dict)
+
+            return JSONResponse({
+                'success': True,
+                'message': 'Task updated successfully',
+                'task': task_dict
+            })
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+    async def delete_task(request):
+        """Delete a specific task"""
+        try:
+            task_id = request.path_params['task_id']
+            async with sessions() as session:
+                # The database deletes the comments (migration 0006), so none of them are loaded
+                result = await session.execute(delete(Task).where(Task.id == task_id).returning(Task.id))
+                if result.first() is None:
+                    return error_response('Task not found', 404)
+
+                await session.commit()
+
+            await run_in_threadpool(publish_change, task_id, 'task.deleted', {'id': task_id}, True)
+
+            return JSONResponse({
+                'success': True,
+                'message': 'Task deleted successfully'
+            })
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+    async def get_task_comments(request):
+        """Get the comments of a task, newest first, with optional cursor pagination"""
+        try:
+            task_id = request.path_params['task_id']
+            cursor = request.query_params.get('cursor')
+            paginate = cursor is not None or 'limit' in request.query_params
+
+            try:
+                limit = parse_limit(request.query_params.get('limit')) if paginate else None
+                statement = comment_page_statement(task_id, limit, cursor)
+            except ValueError as e:
+                return error_response(str(e), 400)
+
+            async with sessions() as session:
+                comments, next_cursor = comment_page((await session.execute(statement)).all(), limit)
+                # Only an empty page needs to tell a missing task from a task without comments
+                if not comments and not await session.scalar(Task.exists_query(task_id)):
+                    if not await session.scalar(ArchivedTask.exists_query(task_id)):
+                        return error_response('Task not found', 404)
+                    statement = comment_page_statement(task_id, limit, cursor, archived=True)
+                    comments, next_cursor = comment_page((await session.execute(statement)).all(), limit)
+
+            response = {
+                'success': True,
+                'comments': comments,
+                'count': len(comments)
+            }
+            if paginate:
+                response['next_cursor'] = next_cursor
+            return JSONResponse(response)
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+    async def create_comment(request):
+        """Create a new comment for a task"""
+        try:
+            task_id = request.path_params['task_id']
+            async with sessions() as session:
+                if not await session.scalar(Task.exists_query(task_id)):
+                    return error_response('Task not found', 404)
+
+                data = await read_json(request)
+                if not data:
+                    return error_response('No data provided', 400)
+
+                comment = Comment(
+                    content=data.get('content'),
+                    author=data.get('author', 'Anonymous'),
+                    task_id=task_id
+                )
+
+                validation_errors = comment.validate()
+                if validation_errors:
+                    return error_response('Validation failed', 400, validation_errors=validation_errors)
+
+                session.add(comment)
+                await session.commit()
+
+            comment_dict = comment.to_dict()
+            await run_in_threadpool(publish_change, task_id, 'comment.created', comment_dict)
+
+            return JSONResponse({
+                'success': True,
+                'message': 'Comment created successfully',
+                'comment': comment_dict
+            }, status_code=201)
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+    async def get_comment(request):
+        """Get a specific comment by ID"""
+        try:
+            async with sessions() as session:
+                comment = await session.get(Comment, request.path_params['comment_id'])
+
+            if not comment:
+                return error_response('Comment not found', 404)
+
+            return JSONResponse({
+                'success': True,
+                'comment': comment.to_dict()
+            })
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+    async def update_comment(request):
+        """Update a specific comment"""
+        try:
+            async with sessions() as session:
+                comment = await session.get(Comment, request.path_params['comment_id'])
+                if not comment:
+                    return error_response('Comment not found', 404)
+
+                data = await read_json(request)
+                if not data:
+                    return error_response('No data provided', 400)
+
+                if 'content' in data:
+                    comment.content = data['content']
+                if 'author' in data:
+                    comment.author = data['author']
+
+                validation_errors = comment.validate()
+                if validation_errors:
+                    return error_response('Validation failed', 400, validation_errors=validation_errors)
+
+                comment.updated_at = datetime.utcnow()
+                await session.commit()
+
+            comment_dict = comment.to_dict()
+            await run_in_threadpool(publish_change, comment.task_id, 'comment.updated', comment_dict)
+
+            return JSONResponse({
+                'success': True,
+                'message': 'Comment updated successfully',
+                'comment': comment_dict
+            })
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+    async def delete_comment(request):
+        """Delete a specific comment"""
+        try:
+            async with sessions() as session:
+                comment = await session.get(Comment, request.path_params['comment_id'])
+                if not comment:
+                    return error_response('Comment not found', 404)
+
+                comment_id, task_id = comment.id, comment.task_id
+                await session.delete(comment)
+                await session.commit()
+
+            await run_in_threadpool(publish_change, task_id, 'comment.deleted', {'id': comment_id, 'task_id': task_id})
+
+            return JSONResponse({
+                'success': True,
+                'message': 'Comment deleted successfully'
+            })
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+    async def root(request):
+        return JSONResponse({'message': 'Task Management API', 'status': 'running', 'mode': 'asgi'})
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+
+    routes = [
+        Route('/', root),
+        Route('/api/tasks', get_tasks, methods=['GET']),
+        Route('/api/tasks', create_task, methods=['POST']),
+        Route('/api/tasks/{task_id:int}', get_task, methods=['GET']),
+        Route('/api/tasks/{task_id:int}', update_task, methods=['PUT']),
+        Route('/api/tasks/{task_id:int}', delete_task, methods=['DELETE']),
+        Route('/api/tasks/{task_id:int}/comments', get_task_comments, methods=['GET']),
+        Route('/api/tasks/{task_id:int}/comments', create_comment, methods=['POST']),
+        Route('/api/comments/{comment_id:int}', get_comment, methods=['GET']),
+        Route('/api/comments/{comment_id:int}', update_comment, methods=['PUT']),
+        Route('/api/comments/{comment_id:int}', delete_comment, methods=['DELETE']),
+    ]
+
+    # Same origins and headers as the Flask CORS configuration; PATCH is only served by run:app
+    middleware = [
+        Middleware(
+            CORSMiddleware,
+            allow_origins=['http://localhost:3000', 'http://127.0.0.1:3000'],
+            allow_origin_regex=r'.*\.vercel\.app$',
+            allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+            allow_headers=['Content-Type', 'Authorization', 'If-Match', 'If-None-Match', 'Prefer'],
+            expose_headers=['ETag', 'Preference-Applied', 'Location', 'Retry-After'],
+            allow_credentials=True
+        )
+    ]
+
+    app = Starlette(routes=routes, middleware=middleware, lifespan=lifespan)
+    app.state.engine = engine
+    app.state.sessions = sessions
+    return app
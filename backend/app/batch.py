@@ -0,0 +1,97 @@
+from flask import current_app, request
+
+BATCH_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+# Headers of a sub-response that are passed back to the client
+FORWARDED_HEADERS = ('ETag', 'Location', 'Retry-After', 'Preference-Applied')
+SUBREQUEST_ENVIRON_KEY = 'task_api.batch_subrequest'
+
+
+def is_subrequest():
+    """True inside a sub-request dispatched by POST /api/batch"""
+    return bool(request.environ.get(SUBREQUEST_ENVIRON_KEY))
+
+
+def parse_batch(data, maximum):
+    """Validate a batch body into a list of {'method', 'path', 'body', 'headers'} sub-requests"""
+    if not isinstance(data, dict) or not isinstance(data.get('requests'), list):
+        raise ValueError('Expected a JSON object with a requests array')
+    if not data['requests']:
+        raise ValueError('requests must not be empty')
+    if len(data['requests']) > maximum:
+        raise ValueError(f'At most {maximum} requests can be batched')
+
+    subrequests = []
+    for index, item in enumerate(data['requests']):
+        if not isinstance(item, dict):
+            raise ValueError(f'requests[{index}] must be an object')
+        method = str(item.get('method', 'GET')).upper()
+        path = item.get('path')
+        headers = item.get('headers') or {}
+        if method not in BATCH_METHODS:
+            raise ValueError(f"requests[{index}].method must be one of: {', '.join(BATCH_METHODS)}")
+        if not isinstance(path, str) or not path.startswith('/api/'):
+            raise ValueError(f'requests[{index}].path must be an /api/ path')
+        if path.split('?', 1)[0].rstrip('/') == request.path.rstrip('/'):
+            raise ValueError(f'requests[{index}] cannot be another batch')
+        if not isinstance(headers, dict):
+            raise ValueError(f'requests[{index}].headers must be an object')
+        subrequests.append({'method': method, 'path': path, 'body': item.get('body'), 'headers': headers})
+    return subrequests
+
+
+def run_subrequest(subrequest):
+    """Dispatch one sub-request through the app and return {'status', 'headers', 'body'}
+
+    The sub-request is pushed onto the current app context, so it shares the
+    batch request's db.session (and its identity map) instead of opening one
+    of its own.
+    """
+    with current_app.test_request_context(
+        subrequest['path'],
+        method=subrequest['method'],
+        base_url=request.host_url,
+        json=subrequest['body'],
+        headers=subrequest['headers'],
+        environ_overrides={SUBREQUEST_ENVIRON_KEY: True}
+    ):
+        # Unknown paths and methods get the API's JSON error shape instead of an HTML page
+        error = request.routing_exception
+        if error is not None:
+            return {'status': error.code, 'headers': {}, 'body': {'success': False, 'error': error.name}}
+
+        response = current_app.full_dispatch_request()
+        try:
+            if response.is_streamed:
+                return {
+                    'status': 400,
+                    'headers': {},
+                    'body': {'success': False, 'error': 'Streaming endpoints cannot be batched'}
+                }
+            return {
+                'status': response.status_code,
+                'headers': {name: response.headers[name] for name in FORWARDED_HEADERS if name in response.headers},
+                'body': response.get_json(silent=True)
+            }
+        finally:
+            response.close()
+
+
+def run_batch(subrequests):
+    """Run sub-requests in order, answering repeated GETs from the first identical one
+
+    A write invalidates what was read before it, so the remembered GETs are
+    dropped after every other method.
+    """
+    responses = []
+    seen = {}
+    for subrequest in subrequests:
+        if subrequest['method'] != 'GET':
+            seen.clear()
+            responses.append(run_subrequest(subrequest))
+            continue
+
+        key = (subrequest['path'], tuple(sorted(subrequest['headers'].items())))
+        if key not in seen:
+            seen[key] = run_subrequest(subrequest)
+        responses.append(seen[key])
+    return responses
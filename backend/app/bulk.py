@@ -0,0 +1,115 @@
+import json
+from itertools import islice
+
+from flask import current_app, request
+from sqlalchemy import insert
+
+from app import db
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+
+
+def bulk_batch_size():
+    """Return the batch size for this request, defaulting to BULK_BATCH_SIZE"""
+    default = current_app.config['BULK_BATCH_SIZE']
+    value = request.args.get('batch_size')
+    if value is None:
+        return default
+    try:
+        batch_size = int(value)
+    except ValueError:
+        raise ValueError('batch_size must be an integer')
+    if batch_size < 1:
+        raise ValueError('batch_size must be a positive integer')
+    return min(batch_size, current_app.config['BULK_MAX_BATCH_SIZE'])
+
+
+def iter_bulk_items():
+    """Yield (index, item, error) tuples from a JSON array or NDJSON request body
+
+    NDJSON bodies are read line by line from the request stream, so large
+    imports never have to be held in memory as a whole.
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        index = 0
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                yield index, None, 'Invalid JSON'
+            else:
+                yield index, item, None
+            index += 1
+        return
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON array or an NDJSON body')
+    for index, item in enumerate(data):
+        yield index, item, None
+
+
+def bulk_insert(model, items, prepare, batch_size):
+    """Validate and insert items in batches inside the current transaction
+
+    prepare(item) returns (row, errors) for a single item. Invalid items are
+    reported per index and skipped, valid rows of each batch are written with
+    one executemany INSERT. Returns (results, rows) where rows are the
+    inserted column dicts; the caller is responsible for committing.
+    """
+    results = []
+    inserted = []
+    items = iter(items)
+
+    # Asking SQLAlchemy to sort RETURNING rows makes it fall back to one INSERT
+    # per row on SQLite. SQLite hands out rowids in VALUES order within a single
+    # statement, so sorting the returned ids restores the parameter order there.
+    sqlite = db.engine.dialect.name == 'sqlite'
+    statement = insert(model).returning(model.id, sort_by_parameter_order=not sqlite)
+
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            break
+
+        # Validate the whole batch before touching the database
+        indexes, rows = [], []
+        for index, item, error in batch:
+            if error is None and not isinstance(item, dict):
+                error = 'Each item must be a JSON object'
+            if error is not None:
+                results.append({'index': index, 'success': False, 'validation_errors': [error]})
+                continue
+            row, errors = prepare(item)
+            if errors:
+                results.append({'index': index, 'success': False, 'validation_errors': errors})
+                continue
+            indexes.append(index)
+            rows.append(row)
+
+        if not rows:
+            continue
+
+        ids = db.session.scalars(statement, rows).all()
+        if sqlite:
+            ids.sort()
+        for index, row, row_id in zip(indexes, rows, ids):
+            row['id'] = row_id
+            inserted.append(row)
+            results.append({'index': index, 'success': True, 'id': row_id})
+
+    results.sort(key=lambda result: result['index'])
+    return results, inserted
+
+
+def bulk_response_status(results):
+    """201 when every item was created, 207 for partial success, 400 otherwise"""
+    created = sum(1 for result in results if result['success'])
+    if created and created == len(results):
+        return 201
+    if created:
+        return 207
+    return 400
@@ -0,0 +1,245 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, g, request
+
+from app.serialization import JSON_MIMETYPE, response_mimetype, vary_on_accept
+
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry TTL and a bound on the entry count"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._marks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counters(self, names):
+        with self._lock:
+            return [self._counters.get(name, 0) for name in names]
+
+    def incr(self, name, ttl=None):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def drop(self, name):
+        with self._lock:
+            self._counters.pop(name, None)
+
+    def mark(self, name, seconds):
+        with self._lock:
+            self._marks[name] = time.monotonic() + seconds
+
+    def is_marked(self, name):
+        with self._lock:
+            return self._marks.get(name, 0) > time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+            self._marks.clear()
+
+
+class RedisBackend:
+    """Redis (or any Redis protocol compatible server) backed cache
+
+    Generation counters live in Redis as well, so an invalidation in one
+    worker is seen by every other worker sharing the server.
+    """
+
+    def __init__(self, url, prefix='task-api:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('CACHE_BACKEND=redis requires the redis package')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def get_counters(self, names):
+        values = self.client.mget([self.prefix + 'gen:' + name for name in names])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def incr(self, name, ttl=None):
+        with self.client.pipeline() as pipe:
+            pipe.incr(self.prefix + 'gen:' + name)
+            if ttl is not None:
+                pipe.expire(self.prefix + 'gen:' + name, max(1, int(ttl)))
+            pipe.execute()
+
+    def drop(self, name):
+        self.client.delete(self.prefix + 'gen:' + name)
+
+    def mark(self, name, seconds):
+        self.client.set(self.prefix + 'mark:' + name, 1, px=max(1, int(seconds * 1000)))
+
+    def is_marked(self, name):
+        return bool(self.client.exists(self.prefix + 'mark:' + name))
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+def _encode_entry(status, etag, body):
+    return f'{status}\n{etag}\n'.encode('ascii') + body
+
+
+def _decode_entry(value):
+    status, etag, body = value.split(b'\n', 2)
+    return int(status), etag.decode('ascii'), body
+
+
+class ResponseCache:
+    """Caches JSON GET responses keyed on the endpoint and normalized query args
+
+    Every key embeds generation counters: a global one bumped on any write,
+    and a per task one bumped when that task or its comments change. Writes
+    therefore invalidate by bumping counters instead of scanning keys.
+    Since every key also embeds the global counter, which never resets, a
+    per task counter can be dropped with its task, or expire, without an
+    old entry becoming reachable again.
+    Responses also carry an ETag so clients can revalidate with
+    If-None-Match and receive a 304 without the body being serialized again.
+
+    A replica may not have replayed a write yet, so for the replica lag
+    window after a write responses read from a replica are served but not
+    cached; otherwise the stale page would outlive the lag by the entry TTL.
+    """
+
+    GLOBAL_SCOPE = 'all'
+
+    def __init__(self):
+        self.backend = None
+        self.default_ttl = 30
+        self.replica_window = 0
+
+    def init_app(self, app):
+        backend = app.config['CACHE_BACKEND']
+        self.default_ttl = app.config['CACHE_DEFAULT_TTL']
+        replicated = any(name.startswith('replica_') for name in app.config.get('SQLALCHEMY_BINDS') or {})
+        self.replica_window = app.config['REPLICA_MAX_LAG_SECONDS'] if replicated else 0
+        if backend == 'memory':
+            self.backend = MemoryBackend(app.config['CACHE_MAX_ENTRIES'])
+        elif backend == 'redis':
+            self.backend = RedisBackend(app.config['CACHE_REDIS_URL'])
+        elif backend == 'none':
+            self.backend = None
+        else:
+            raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
+
+    @staticmethod
+    def _task_scope(task_id):
+        return f'task:{task_id}'
+
+    def invalidate(self, task_id=None, removed=False):
+        """Invalidate list and stats responses, plus one task's detail responses
+
+        Pass removed for a deleted or archived task, whose counter is dropped
+        rather than kept around for a task that won't change again.
+        """
+        if self.backend is None:
+            return
+        self.backend.incr(self.GLOBAL_SCOPE)
+        if task_id is not None and removed:
+            self.backend.drop(self._task_scope(task_id))
+        elif task_id is not None:
+            # Redis counters also expire well after any entry built on them
+            self.backend.incr(self._task_scope(task_id), ttl=10 * self.default_ttl)
+        if self.replica_window:
+            self.backend.mark(self.GLOBAL_SCOPE, self.replica_window)
+
+    def _storable(self):
+        """False when the current request read from a replica that may still miss the last write"""
+        return not (self.replica_window and g.get('db_binds') and self.backend.is_marked(self.GLOBAL_SCOPE))
+
+    def make_key(self):
+        """Build the cache key for the current request"""
+        scopes = [self.GLOBAL_SCOPE]
+        task_id = (request.view_args or {}).get('task_id')
+        if task_id is not None:
+            scopes.append(self._task_scope(task_id))
+        generations = self.backend.get_counters(scopes)
+
+        args = '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True)))
+        versions = ','.join(f'{scope}@{generation}' for scope, generation in zip(scopes, generations))
+        # Each negotiated format is cached on its own; JSON keeps the plain key
+        mimetype = response_mimetype()
+        encoded_as = f';{mimetype}' if mimetype != JSON_MIMETYPE else ''
+        return f'{request.endpoint}?{args}#{versions}{encoded_as}'
+
+    @staticmethod
+    def _conditional(status, etag, body):
+        """Build the response, answering 304 when the client already has this ETag"""
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, status=status, mimetype=response_mimetype())
+        response.set_etag(etag)
+        return vary_on_accept(response)
+
+    def cached(self, ttl=None):
+        """Decorator caching successful responses of a GET view"""
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = None
+                if self.backend is not None:
+                    key = self.make_key()
+                    entry = self.backend.get(key)
+                    if entry is not None:
+                        response = self._conditional(*_decode_entry(entry))
+                        response.headers['X-Cache'] = 'HIT'
+                        return response
+
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+
+                body = response.get_data()
+                etag = hashlib.sha1(body).hexdigest()
+                if key is not None and self._storable():
+                    self.backend.set(key, _encode_entry(response.status_code, etag, body), ttl or self.default_ttl)
+
+                response = self._conditional(response.status_code, etag, body)
+                if key is not None:
+                    response.headers['X-Cache'] = 'MISS'
+                return response
+
+            return wrapper
+
+        return decorator
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,87 @@
+"""Comment thread pages and task embedding, shared by the Flask and ASGI routes
+
+Comments are walked newest first on (task_id, created_at, id), which
+ix_comments_task_id_created_at_id serves directly, with keyset cursors
+instead of offsets so deep pages cost the same as the first one. Archived
+tasks keep answering on their id from the archive tables, read only.
+"""
+from app import db
+from app.models.archive import ArchivedComment, ArchivedTask
+from app.models.comment import Comment
+from app.models.task import Task
+from app.pagination import MAX_PAGE_SIZE, encode_cursor, keyset_filter
+
+
+def parse_embed(value):
+    """Parse the embed parameter of GET /api/tasks/<id> into the number of comments to include
+
+    Returns None for every comment (also when embed is absent), 0 for none,
+    and N for embed=comments:N.
+    """
+    if value is None or value == 'comments':
+        return None
+    if value == 'none':
+        return 0
+    name, _, count = value.partition(':')
+    if name != 'comments' or not count.isdigit():
+        raise ValueError('embed must be comments, comments:N or none')
+    return min(int(count), MAX_PAGE_SIZE)
+
+
+def comment_page_statement(task_id, limit=None, cursor=None, archived=False):
+    """Select one page of a task's comments, newest first, plus one extra row to detect more"""
+    model = ArchivedComment if archived else Comment
+    statement = db.select(*[getattr(model, name) for name in Comment.FIELDS])\
+        .where(model.task_id == task_id)\
+        .order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        statement = keyset_filter(statement, model.created_at, model.id, cursor)
+    if limit is not None:
+        statement = statement.limit(limit + 1)
+    return statement
+
+
+def comment_page(rows, limit=None):
+    """Turn comment page rows into (comments, next_cursor)"""
+    comments = [dict(zip(Comment.FIELDS, row)) for row in rows]
+    next_cursor = None
+    if limit is not None and len(comments) > limit:
+        comments = comments[:limit]
+        next_cursor = encode_cursor(comments[-1]['created_at'], comments[-1]['id'])
+    return comments, next_cursor
+
+
+def task_with_comments_statement(task_id, limit=None, archived=False):
+    """Select a task and its newest comments in one query
+
+    The comment page is a subquery LEFT JOINed onto the task row, so a task
+    without comments still comes back as a single row with NULL comment
+    columns, and a missing task as no rows at all. archived reads the
+    archive tables instead.
+    """
+    model = ArchivedTask if archived else Task
+    task_columns = [getattr(model, name) for name in Task.PROJECTABLE_FIELDS]
+    if limit == 0:
+        return db.select(*task_columns).where(model.id == task_id)
+
+    newest = comment_page_statement(task_id, limit, archived=archived).subquery()
+    return db.select(*task_columns, *[newest.c[name].label(f'comment_{name}') for name in Comment.FIELDS])\
+        .select_from(model)\
+        .outerjoin(newest, db.true())\
+        .where(model.id == task_id)\
+        .order_by(newest.c.created_at.desc(), newest.c.id.desc())
+
+
+def split_task_with_comments(rows, limit=None):
+    """Turn task_with_comments_statement rows into (task, comments, next_cursor); task is None when missing"""
+    if not rows:
+        return None, [], None
+
+    width = len(Task.PROJECTABLE_FIELDS)
+    task = dict(zip(Task.PROJECTABLE_FIELDS, rows[0][:width]))
+    if limit == 0:
+        return task, [], None
+
+    # Rows of a task without comments carry NULL comment columns
+    comments, next_cursor = comment_page([row[width:] for row in rows if row[width] is not None], limit)
+    return task, comments, next_cursor
@@ -0,0 +1,93 @@
+import zlib
+
+from flask import request
+
+from app.batch import is_subrequest
+from app.serialization import COLUMNAR_MIMETYPE, JSON_MIMETYPE, MSGPACK_MIMETYPE
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    JSON_MIMETYPE, COLUMNAR_MIMETYPE, MSGPACK_MIMETYPE, 'application/x-ndjson', 'text/csv', 'text/plain'
+}
+
+
+class Compression:
+    """Compresses responses with brotli or gzip, whichever the client accepts
+
+    Buffered responses are compressed once they reach COMPRESSION_MIN_SIZE
+    bytes; below that the encoding costs more than it saves. Streamed
+    responses, such as the exports, are compressed chunk by chunk and flushed
+    after each one, so the client still receives them as they are produced.
+    """
+
+    def __init__(self):
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_quality = 4
+
+    def init_app(self, app):
+        if not app.config['COMPRESSION']:
+            return
+        self.min_size = app.config['COMPRESSION_MIN_SIZE']
+        self.gzip_level = app.config['COMPRESSION_GZIP_LEVEL']
+        self.brotli_quality = app.config['COMPRESSION_BROTLI_QUALITY']
+        app.after_request(self._compress)
+
+    @staticmethod
+    def choose_encoding():
+        offers = ['br', 'gzip'] if brotli is not None else ['gzip']
+        return request.accept_encodings.best_match(offers)
+
+    def compressor(self, encoding):
+        """Return (compress, finish, flush) functions for one response body; flush ends the current chunk"""
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            return compressor.process, compressor.finish, compressor.flush
+        # wbits 31 writes the gzip header and trailer around the deflate stream
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress, compressor.flush, lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def _compress(self, response):
+        # Sub-responses are read back by the batch endpoint, which compresses the whole batch
+        if is_subrequest() or request.method == 'HEAD' or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+        if response.status_code < 200 or response.status_code in (204, 304) or 'Content-Encoding' in response.headers:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            compress, finish, _ = self.compressor(encoding)
+            response.set_data(compress(body) + finish())
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _stream(self, chunks, encoding):
+        compress, finish, flush = self.compressor(encoding)
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                data = compress(chunk) + flush()
+                if data:
+                    yield data
+            yield finish()
+        finally:
+            # Closing the wrapped body ends the export's request context, and releases its slot
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+compression = Compression()
@@ -0,0 +1,38 @@
+from flask import request
+
+
+def version_etag(version):
+    """Entity tag for a row version, as sent in ETag and expected in If-Match"""
+    return f'v{version}'
+
+
+def if_match_versions():
+    """Return the row versions listed in If-Match, or None when any version is acceptable
+
+    A missing header and If-Match: * both mean no version condition. Tags that
+    are not version tags can never match, so they produce an empty list.
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+
+    versions = []
+    for etag in if_match.as_set():
+        if etag.startswith('v') and etag[1:].isdigit():
+            versions.append(int(etag[1:]))
+    return versions
+
+
+def preferences():
+    """Return the tokens of the Prefer request header"""
+    return [value.strip() for value in request.headers.get('Prefer', '').split(',')]
+
+
+def prefers_minimal():
+    """True when the client sent Prefer: return=minimal"""
+    return 'return=minimal' in preferences()
+
+
+def prefers_async():
+    """True when the client sent Prefer: respond-async"""
+    return 'respond-async' in preferences()
@@ -0,0 +1,50 @@
+from app import db
+from app.models.task import Task
+
+BUCKETS = ['day', 'week']
+
+
+def parse_instant(value, name):
+    """Parse an ISO timestamp query parameter into the naive UTC form due dates are stored in"""
+    try:
+        return Task.parse_due_date(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO formatted date or datetime')
+
+
+def due_filter(query, after=None, before=None, include_completed=False):
+    """Restrict a task query to due dates in [after, before), a range scan on ix_tasks_due_date_status"""
+    query = query.filter(Task.due_date.isnot(None))
+    if after is not None:
+        query = query.filter(Task.due_date >= after)
+    if before is not None:
+        query = query.filter(Task.due_date < before)
+    if not include_completed:
+        # A negative condition keeps the planner on the due date range instead of the status indexes
+        query = query.filter(Task.status != 'completed')
+    return query
+
+
+def bucket_expression(bucket):
+    """SQL expression for the start of the day or week (Monday) a task is due in"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        if bucket == 'day':
+            return db.func.date(Task.due_date)
+        # Step back six days, then forward to the next Monday, which is the week's own Monday
+        return db.func.date(Task.due_date, '-6 days', 'weekday 1')
+    if dialect == 'postgresql':
+        return db.cast(db.func.date_trunc(bucket, Task.due_date), db.Date)
+    raise RuntimeError(f'Due date buckets are not supported on {dialect}')
+
+
+def due_bucket_counts(bucket, after=None, before=None, include_completed=False):
+    """Return [{'start', 'count'}] per day or week, oldest first, counted from the index alone"""
+    start = bucket_expression(bucket).label('start')
+    query = due_filter(db.session.query(start, db.func.count()), after, before, include_completed)
+    rows = query.group_by(start).order_by(start).all()
+    return [
+        {'start': value if isinstance(value, str) else value.isoformat(), 'count': count}
+        for value, count in rows
+    ]
+
@@ -0,0 +1,87 @@
+import os
+
+from sqlalchemy import event
+
+# Connect-time pragmas for SQLite profiles; values can be overridden per pragma through env vars
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 268435456,
+        'cache_size': -65536,
+        'temp_store': 'MEMORY'
+    }
+}
+
+PRAGMA_ENV_VARS = {
+    'journal_mode': 'SQLITE_JOURNAL_MODE',
+    'synchronous': 'SQLITE_SYNCHRONOUS',
+    'busy_timeout': 'SQLITE_BUSY_TIMEOUT_MS',
+    'mmap_size': 'SQLITE_MMAP_SIZE',
+    'cache_size': 'SQLITE_CACHE_SIZE',
+    'temp_store': 'SQLITE_TEMP_STORE'
+}
+
+
+def _env_flag(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+def is_sqlite(database_url):
+    return database_url.startswith('sqlite')
+
+
+def is_sqlite_memory(database_url):
+    return database_url in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in database_url
+
+
+def sqlite_pragmas(profile):
+    """Resolve the pragma settings for a profile, applying env var overrides"""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE: {profile}. Use one of: {', '.join(SQLITE_PROFILES)}")
+
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for name, env_var in PRAGMA_ENV_VARS.items():
+        value = os.getenv(env_var)
+        if value:
+            pragmas[name] = value
+
+    # Pragma values can't be bound as parameters, so only accept plain words and numbers
+    for name, value in pragmas.items():
+        if not str(value).lstrip('-').isalnum():
+            raise ValueError(f'Invalid value for SQLite pragma {name}: {value}')
+    return pragmas
+
+
+def engine_options(database_url):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for the configured database"""
+    options = {
+        'pool_pre_ping': _env_flag('DB_POOL_PRE_PING', True)
+    }
+
+    if not is_sqlite(database_url):
+        options.update({
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800))
+        })
+
+    return options
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Apply the pragmas on every new DBAPI connection of a SQLite engine"""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from flask import current_app
+
+
+class RedisBroker:
+    """Relays events between worker processes through Redis pub/sub
+
+    Event ids come from a shared Redis counter, and every worker receives
+    every event into its own ring buffer, so a client can resume with
+    Last-Event-ID against whichever worker it reconnects to.
+    """
+
+    def __init__(self, url, channel='task-api:events'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('EVENTS_BACKEND=redis requires the redis package')
+        self.client = redis.Redis.from_url(url)
+        self.channel = channel
+        self._listener_pid = None
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, payload):
+        event_id = self.client.incr(self.channel + ':seq')
+        self.client.publish(self.channel, json.dumps([event_id, event_type, payload]))
+
+    def last_id(self):
+        return int(self.client.get(self.channel + ':seq') or 0)
+
+    def start(self, deliver):
+        """Start the subscriber thread once per process, forked workers included
+
+        Returns True when a new subscriber was started by this call.
+        """
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return False
+            self._listener_pid = os.getpid()
+
+        def listen():
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self.channel)
+            for message in pubsub.listen():
+                deliver(*json.loads(message['data']))
+
+        threading.Thread(target=listen, name='event-broker', daemon=True).start()
+        return True
+
+
+class EventBus:
+    """Publishes task and comment changes to Server-Sent Event streams
+
+    Recent events are kept in a bounded ring buffer so reconnecting clients
+    can resume from Last-Event-ID. A client that fell further behind than
+    the buffer reaches gets a reset event and should refetch. Without a
+    broker events only reach streams served by the publishing process, and
+    each stream opens with a hello event telling the client whether to poll.
+    """
+
+    def __init__(self, buffer_size=1000):
+        self.buffer = deque(maxlen=buffer_size)
+        self.broker = None
+        self.heartbeat_interval = 15
+        self.stream_timeout = 300
+        self.max_streams = 16
+        self.active_streams = 0
+        self.workers = 1
+        self._condition = threading.Condition()
+        # Ids continue from the clock, so ids handed out before a restart read as older
+        self._last_id = int(time.time() * 1000)
+
+    def init_app(self, app):
+        backend = app.config['EVENTS_BACKEND']
+        self.buffer = deque(maxlen=app.config['EVENTS_BUFFER_SIZE'])
+        self.heartbeat_interval = app.config['EVENTS_HEARTBEAT_INTERVAL']
+        self.stream_timeout = app.config['EVENTS_STREAM_TIMEOUT']
+        self.max_streams = app.config['EVENTS_MAX_STREAMS']
+        self.workers = app.config.get('WEB_CONCURRENCY', 1)
+        if backend == 'memory':
+            self.broker = None
+            if app.config.get('WEB_CONCURRENCY', 1) > 1:
+                app.logger.warning(
+                    'EVENTS_BACKEND=memory with %d workers: event streams only receive the changes made '
+                    'through their own worker; set EVENTS_BACKEND=redis to share them',
+                    app.config['WEB_CONCURRENCY'])
+        elif backend == 'redis':
+            self.broker = RedisBroker(app.config['EVENTS_REDIS_URL'])
+            self._last_id = 0
+        else:
+            raise ValueError(f'Unknown EVENTS_BACKEND: {backend}')
+
+    def publish(self, event_type, data):
+        """Send an event to every open stream; call only after the change is committed"""
+        payload = current_app.json.dumps(data)
+        if self.broker is not None:
+            self._start_broker()
+            self.broker.publish(event_type, payload)
+        else:
+            with self._condition:
+                self._deliver(self._last_id + 1, event_type, payload)
+
+    def _start_broker(self):
+        if self.broker.start(self._deliver):
+            # Streams opened before the first broker event start from the shared counter
+            with self._condition:
+                self._last_id = max(self._last_id, self.broker.last_id())
+
+    def _deliver(self, event_id, event_type, payload):
+        with self._condition:
+            self._last_id = max(self._last_id, event_id)
+            self.buffer.append((event_id, event_type, payload))
+            self._condition.notify_all()
+
+    def events_after(self, last_event_id):
+        """Return (events, complete); complete is False when events were already dropped"""
+        with self._condition:
+            first_id = self.buffer[0][0] if self.buffer else self._last_id + 1
+            if last_event_id < first_id - 1 or last_event_id > self._last_id:
+                return [], False
+            return [event for event in self.buffer if event[0] > last_event_id], True
+
+    @property
+    def complete(self):
+        """True when every stream sees every change, through the broker or a single worker"""
+        return self.broker is not None or self.workers <= 1
+
+    def acquire_stream(self):
+        """Reserve one of the per process stream slots"""
+        with self._condition:
+            if self.active_streams >= self.max_streams:
+                return False
+            self.active_streams += 1
+            return True
+
+    def release_stream(self):
+        with self._condition:
+            self.active_streams -= 1
+
+    def stream(self, last_event_id=None):
+        """Yield SSE frames after last_event_id until the stream timeout is reached"""
+        if self.broker is not None:
+            self._start_broker()
+
+        yield 'retry: 2000\n\n'
+        # Without an id, so Last-Event-ID is untouched; clients poll /api/sync when incomplete
+        yield f'event: hello\ndata: {json.dumps({"complete": self.complete})}\n\n'
+        if last_event_id is None:
+            with self._condition:
+                last_event_id = self._last_id
+
+        # Clients reconnect with Last-Event-ID, so closing periodically loses nothing
+        deadline = time.monotonic() + self.stream_timeout
+        while time.monotonic() < deadline:
+            events, complete = self.events_after(last_event_id)
+            if not complete:
+                # Missed events are gone, so the client has to reload its data
+                with self._condition:
+                    last_event_id = self._last_id
+                yield f'id: {last_event_id}\nevent: reset\ndata: {{}}\n\n'
+                continue
+
+            for event_id, event_type, payload in events:
+                last_event_id = event_id
+                yield f'id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n'
+
+            if not events:
+                with self._condition:
+                    notified = self._last_id != last_event_id or self._condition.wait(self.heartbeat_interval)
+                if not notified:
+                    # Comment line that keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+
+
+event_bus = EventBus()
@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from app import db
+from app.models.task import Task
+from app.models.comment import Comment
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+TASK_EXPORT_FIELDS = ['id', 'title', 'description', 'status', 'priority', 'due_date', 'created_at', 'updated_at']
+COMMENT_EXPORT_FIELDS = ['id', 'content', 'author', 'created_at', 'updated_at']
+
+# Flush streamed output in chunks of roughly this many bytes
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+
+def _format_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_export_records(status=None, priority=None, include_comments=False, yield_per=1000):
+    """Yield (task, comments) dict pairs using a server side cursor
+
+    Comments are fetched through the same ordered outer join rather than one
+    query per task, and consecutive rows are grouped back into tasks.
+    """
+    columns = [getattr(Task, name) for name in TASK_EXPORT_FIELDS]
+    if include_comments:
+        columns += [getattr(Comment, name).label(f'comment_{name}') for name in COMMENT_EXPORT_FIELDS]
+
+    query = db.select(*columns)
+    if include_comments:
+        query = query.outerjoin(Comment, Comment.task_id == Task.id)
+    if status:
+        query = query.where(Task.status == status)
+    if priority:
+        query = query.where(Task.priority == priority)
+    query = query.order_by(Task.id)
+    if include_comments:
+        query = query.order_by(Comment.created_at, Comment.id)
+
+    rows = db.session.execute(query.execution_options(yield_per=yield_per))
+    task_width = len(TASK_EXPORT_FIELDS)
+
+    if not include_comments:
+        for row in rows:
+            yield dict(zip(TASK_EXPORT_FIELDS, map(_format_value, row))), None
+        return
+
+    current, comments = None, []
+    for row in rows:
+        if current is None or current['id'] != row[0]:
+            if current is not None:
+                yield current, comments
+            current = dict(zip(TASK_EXPORT_FIELDS, map(_format_value, row[:task_width])))
+            comments = []
+        if row[task_width] is not None:
+            comments.append(dict(zip(COMMENT_EXPORT_FIELDS, map(_format_value, row[task_width:]))))
+    if current is not None:
+        yield current, comments
+
+
+def ndjson_lines(records):
+    """Render export records as newline delimited JSON"""
+    for task, comments in records:
+        if comments is not None:
+            task['comments'] = comments
+        yield json.dumps(task) + '\n'
+
+
+def csv_lines(records, include_comments=False):
+    """Render export records as CSV, one row per comment when comments are embedded"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    header = list(TASK_EXPORT_FIELDS)
+    if include_comments:
+        header += [f'comment_{name}' for name in COMMENT_EXPORT_FIELDS]
+    writer.writerow(header)
+    yield flush()
+
+    for task, comments in records:
+        values = [task[name] for name in TASK_EXPORT_FIELDS]
+        if not include_comments:
+            writer.writerow(values)
+        elif not comments:
+            writer.writerow(values + [None] * len(COMMENT_EXPORT_FIELDS))
+        else:
+            for comment in comments:
+                writer.writerow(values + [comment[name] for name in COMMENT_EXPORT_FIELDS])
+        yield flush()
+
+
+def buffered(chunks, size=EXPORT_BUFFER_SIZE):
+    """Coalesce small string chunks so the response is written in larger blocks"""
+    pending, length = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(pending)
+            pending, length = [], 0
+    if pending:
+        yield ''.join(pending)
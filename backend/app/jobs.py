@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app import db
+from app.models.job import Job
+
+
+class JobQueue:
+    """Runs slow operations on background threads, tracked in the jobs table
+
+    Every job is a row first: the request records it and answers 202 right
+    away, and worker threads claim queued rows with a single UPDATE, so any
+    number of processes can share the table. A claim holds a lease; a job
+    whose lease ran out because its process died is claimed again, up to
+    max_attempts. Jobs still queued when a process stops are run once the
+    workers start again.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        self.app = None
+        self.workers = 1
+        self.poll_interval = 5
+        self.lease = timedelta(seconds=300)
+        self.max_attempts = 3
+        self._wakeup = threading.Event()
+        self._worker_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config['JOBS_WORKERS']
+        self.poll_interval = app.config['JOBS_POLL_INTERVAL']
+        self.lease = timedelta(seconds=app.config['JOBS_LEASE_SECONDS'])
+        self.max_attempts = app.config['JOBS_MAX_ATTEMPTS']
+        # Threads don't survive a fork, so each process starts its own on its first request
+        app.before_request(self.start)
+
+    def handler(self, kind):
+        """Register the function that runs jobs of a kind; it takes the payload and returns the result"""
+        def decorator(function):
+            self.handlers[kind] = function
+            return function
+        return decorator
+
+    def enqueue(self, kind, payload):
+        """Commit a new job and wake a worker"""
+        if kind not in self.handlers:
+            raise ValueError(f'Unknown job kind: {kind}')
+        job = Job(kind=kind, status='queued', payload=current_app.json.dumps(payload), attempts=0)
+        db.session.add(job)
+        db.session.commit()
+        self.start()
+        self._wakeup.set()
+        return job
+
+    def start(self):
+        """Start the worker threads once per process, forked workers included"""
+        if not self.workers:
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+
+        for number in range(self.workers):
+            threading.Thread(target=self._work, name=f'job-worker-{number}', daemon=True).start()
+
+    def _work(self):
+        while True:
+            try:
+                ran = self.run_next()
+            except Exception:
+                self.app.logger.exception('Job worker failed to claim or record a job')
+                ran = False
+            if not ran:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _claimable(self, now):
+        return db.or_(
+            Job.status == 'queued',
+            db.and_(Job.status == 'running', Job.lease_expires_at < now)
+        )
+
+    def claim(self):
+        """Mark the oldest claimable job as running and return (id, kind, payload), or None"""
+        now = datetime.utcnow()
+
+        # Jobs that keep taking their process down with them are not retried forever
+        db.session.execute(
+            db.update(Job)
+            .where(Job.status == 'running', Job.lease_expires_at < now, Job.attempts >= self.max_attempts)
+            .values(status='failed', error=f'Gave up after {self.max_attempts} attempts', finished_at=now)
+        )
+
+        # The outer condition is checked again against the row being updated, so
+        # of two workers racing for the same job only one gets it back
+        oldest = db.select(Job.id).where(self._claimable(now))\
+                                  .order_by(Job.id).limit(1)\
+                                  .with_for_update(skip_locked=True).scalar_subquery()
+        row = db.session.execute(
+            db.update(Job)
+            .where(Job.id == oldest, self._claimable(now))
+            .values(status='running', attempts=Job.attempts + 1, started_at=now, lease_expires_at=now + self.lease)
+            .returning(Job.id, Job.kind, Job.payload)
+        ).first()
+        db.session.commit()
+        return row
+
+    def finish(self, job_id, result=None, error=None):
+        """Record the outcome of a claimed job"""
+        db.session.execute(
+            db.update(Job).where(Job.id == job_id).values(
+                status='failed' if error is not None else 'succeeded',
+                result=None if result is None else current_app.json.dumps(result),
+                error=error,
+                finished_at=datetime.utcnow(),
+                lease_expires_at=None
+            )
+        )
+        db.session.commit()
+
+    def run_next(self):
+        """Claim and run one job; returns False when there was nothing to run"""
+        with self.app.app_context():
+            row = self.claim()
+            if row is None:
+                return False
+
+            handler = self.handlers.get(row.kind)
+            try:
+                if handler is None:
+                    raise ValueError(f'Unknown job kind: {row.kind}')
+                result = handler(json.loads(row.payload))
+            except Exception as e:
+                db.session.rollback()
+                self.finish(row.id, error=str(e))
+            else:
+                self.finish(row.id, result=result)
+            return True
+
+
+job_queue = JobQueue()
@@ -0,0 +1,200 @@
+import bisect
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from app.batch import is_subrequest
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {value}')
+        return lines
+
+
+class Histogram:
+    """Cumulative bucket histogram in the Prometheus exposition format"""
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per bucket counts, with one extra slot for values above the last bound
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        bucket_labels = self.labels + ('le',)
+        with self._lock:
+            for label_values, (counts, total, observations) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{_format_labels(bucket_labels, label_values + (bound,))} {cumulative}')
+                lines.append(f'{self.name}_bucket{_format_labels(bucket_labels, label_values + ("+Inf",))} {observations}')
+                lines.append(f'{self.name}_sum{_format_labels(self.labels, label_values)} {total}')
+                lines.append(f'{self.name}_count{_format_labels(self.labels, label_values)} {observations}')
+        return lines
+
+
+class Metrics:
+    """Per request instrumentation: latency, SQL queries, serialization time and response size
+
+    Values are kept per worker process, so each gunicorn worker exposes its
+    own series on /api/metrics.
+    """
+
+    def __init__(self):
+        self.requests = Counter(
+            'http_requests_total', 'Requests handled', ('endpoint', 'method', 'status'))
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Time spent handling a request', ('endpoint', 'method'))
+        self.db_queries = Histogram(
+            'http_request_db_queries', 'SQL statements executed per request', ('endpoint',), QUERY_COUNT_BUCKETS)
+        self.db_time = Counter(
+            'http_request_db_seconds_total', 'Time spent executing SQL statements', ('endpoint',))
+        self.serialization_time = Counter(
+            'http_request_serialization_seconds_total', 'Time spent encoding response bodies', ('endpoint',))
+        self.response_size = Histogram(
+            'http_response_size_bytes', 'Size of response bodies', ('endpoint',), SIZE_BUCKETS)
+        self.slow_queries = Counter(
+            'db_slow_queries_total', 'SQL statements slower than SLOW_QUERY_LOG_MS', ('endpoint',))
+        self.shed_requests = Counter(
+            'http_requests_shed_total', 'Requests rejected by admission control', ('endpoint', 'class', 'reason'))
+        self.queue_time = Histogram(
+            'http_request_queue_seconds', 'Time admitted requests waited upstream and for a slot', ('class',))
+        self.collectors = [
+            self.requests, self.latency, self.db_queries, self.db_time,
+            self.serialization_time, self.response_size, self.slow_queries,
+            self.shed_requests, self.queue_time
+        ]
+
+    def init_app(self, app, *engines):
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        for engine in engines:
+            self._instrument_engine(engine)
+        self._instrument_json(app)
+
+    def render(self):
+        """Render every collector in the Prometheus text exposition format"""
+        lines = []
+        for collector in self.collectors:
+            lines.extend(collector.render())
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _endpoint():
+        return request.endpoint or 'unmatched'
+
+    def _start_request(self):
+        # Batched sub-requests are accounted to the batch request that runs them
+        if is_subrequest():
+            return
+        g.metrics_started = time.perf_counter()
+        g.metrics_db_queries = 0
+        g.metrics_db_time = 0.0
+        g.metrics_serialization_time = 0.0
+
+    def _finish_request(self, response):
+        if 'metrics_started' not in g or is_subrequest():
+            return response
+
+        endpoint = self._endpoint()
+        elapsed = time.perf_counter() - g.metrics_started
+        self.requests.inc(endpoint, request.method, response.status_code)
+        self.latency.observe(elapsed, endpoint, request.method)
+        self.db_queries.observe(g.metrics_db_queries, endpoint)
+        self.db_time.inc(endpoint, amount=g.metrics_db_time)
+        self.serialization_time.inc(endpoint, amount=g.metrics_serialization_time)
+        if not response.is_streamed:
+            self.response_size.observe(response.calculate_content_length() or 0, endpoint)
+
+        if current_app.config['SERVER_TIMING']:
+            # Name the read replicas that served the request, if any
+            binds = sorted(g.get('db_binds', ()))
+            replicas = f' on {", ".join(binds)}' if binds else ''
+            response.headers['Server-Timing'] = ', '.join([
+                f'db;dur={g.metrics_db_time * 1000:.2f};desc="{g.metrics_db_queries} queries{replicas}"',
+                f'serialize;dur={g.metrics_serialization_time * 1000:.2f}',
+                f'total;dur={elapsed * 1000:.2f}'
+            ])
+        return response
+
+    def _instrument_engine(self, engine):
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['metrics_query_start'].pop()
+            if not has_request_context() or 'metrics_started' not in g:
+                return
+
+            g.metrics_db_queries += 1
+            g.metrics_db_time += elapsed
+
+            threshold = current_app.config['SLOW_QUERY_LOG_MS']
+            if threshold and elapsed * 1000 >= threshold:
+                self.slow_queries.inc(self._endpoint())
+                current_app.logger.warning(
+                    'Slow query (%.1f ms) in %s: %s', elapsed * 1000, self._endpoint(), ' '.join(statement.split()))
+
+    @staticmethod
+    def _instrument_json(app):
+        """Time every response body built through the app's JSON provider"""
+        provider = app.json
+        build_response = provider.response
+
+        def timed_response(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return build_response(*args, **kwargs)
+            finally:
+                if has_request_context() and 'metrics_started' in g:
+                    g.metrics_serialization_time += time.perf_counter() - started
+
+        provider.response = timed_response
+
+metrics = Metrics()
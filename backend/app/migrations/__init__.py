@@ -0,0 +1,106 @@
+# Schema migrations package
+from datetime import datetime
+import sqlalchemy as sa
+import click
+
+from app import db
+from . import (
+    m0001_initial, m0002_composite_indexes, m0003_full_text_search, m0004_row_versions, m0005_change_log,
+    m0006_comment_cascade, m0007_jobs, m0008_due_date_index, m0009_comment_thread_index,
+    m0010_archive, m0011_task_id_autoincrement,
+)
+
+# Applied in order; each module defines revision, description and upgrade(connection)
+MIGRATIONS = [
+    m0001_initial,
+    m0002_composite_indexes,
+    m0003_full_text_search,
+    m0004_row_versions,
+    m0005_change_log,
+    m0006_comment_cascade,
+    m0007_jobs,
+    m0008_due_date_index,
+    m0009_comment_thread_index,
+    m0010_archive,
+    m0011_task_id_autoincrement,
+]
+
+version_table = sa.Table(
+    'schema_migrations', sa.MetaData(),
+    sa.Column('revision', sa.String(32), primary_key=True),
+    sa.Column('description', sa.String(200), nullable=False),
+    sa.Column('applied_at', sa.DateTime, nullable=False),
+)
+
+
+def applied_revisions(connection):
+    """Return the set of revisions already recorded in the database"""
+    version_table.create(connection, checkfirst=True)
+    return {row.revision for row in connection.execute(sa.select(version_table.c.revision))}
+
+
+def pending_migrations():
+    """Return the migrations that have not been applied yet"""
+    with db.engine.begin() as connection:
+        applied = applied_revisions(connection)
+    return [migration for migration in MIGRATIONS if migration.revision not in applied]
+
+
+def upgrade():
+    """Apply every pending migration inside a single transaction
+
+    pysqlite commits DDL as it runs unless a transaction was opened by hand,
+    so on SQLite the driver's own transaction handling is switched off and
+    BEGIN is issued explicitly; a failing migration then leaves no trace.
+    """
+    applied_now = []
+    with db.engine.connect() as connection:
+        driver_connection = connection.connection.driver_connection
+        sqlite = connection.dialect.name == 'sqlite'
+        if sqlite:
+            isolation_level = driver_connection.isolation_level
+            driver_connection.isolation_level = None
+        try:
+            with connection.begin():
+                if sqlite:
+                    connection.exec_driver_sql('BEGIN')
+                applied = applied_revisions(connection)
+                for migration in MIGRATIONS:
+                    if migration.revision in applied:
+                        continue
+                    migration.upgrade(connection)
+                    connection.execute(version_table.insert().values(
+                        revision=migration.revision,
+                        description=migration.description,
+                        applied_at=datetime.utcnow()
+                    ))
+                    applied_now.append(migration.revision)
+        finally:
+            if sqlite:
+                driver_connection.isolation_level = isolation_level
+    return applied_now
+
+
+def init_app(app):
+    """Register the schema management CLI commands"""
+
+    @app.cli.command('migrate')
+    def migrate_command():
+        """Apply pending schema migrations"""
+        applied = upgrade()
+        if applied:
+            click.echo(f"Applied migrations: {', '.join(applied)}")
+        else:
+            click.echo('Database schema is up to date')
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """Fail if a hot query falls back to a full table scan"""
+        from app.migrations.plans import check_query_plans
+
+        failures = 0
+        for name, plan, full_scan in check_query_plans():
+            failures += full_scan
+            click.echo(f"{'FULL SCAN' if full_scan else 'ok':9} {name}: {' | '.join(plan)}")
+        if failures:
+            raise SystemExit(1)
@@ -0,0 +1,33 @@
+"""Initial tasks and comments schema"""
+from datetime import datetime
+import sqlalchemy as sa
+
+revision = '0001'
+description = 'initial tasks and comments schema'
+
+
+def upgrade(connection):
+    # Frozen copy of the original schema so later model changes don't leak in here
+    metadata = sa.MetaData()
+    sa.Table(
+        'tasks', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('description', sa.Text, nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, default='pending'),
+        sa.Column('priority', sa.String(10), nullable=False, default='medium'),
+        sa.Column('due_date', sa.DateTime, nullable=True),
+        sa.Column('created_at', sa.DateTime, default=datetime.utcnow, nullable=False),
+        sa.Column('updated_at', sa.DateTime, default=datetime.utcnow, nullable=False),
+    )
+    sa.Table(
+        'comments', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('content', sa.Text, nullable=False),
+        sa.Column('author', sa.String(100), nullable=True),
+        sa.Column('created_at', sa.DateTime, default=datetime.utcnow, nullable=False),
+        sa.Column('updated_at', sa.DateTime, default=datetime.utcnow, nullable=False),
+        sa.Column('task_id', sa.Integer, sa.ForeignKey('tasks.id'), nullable=False),
+    )
+    # Databases created before migrations existed already have these tables
+    metadata.create_all(connection, checkfirst=True)
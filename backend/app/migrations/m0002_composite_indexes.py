@@ -0,0 +1,18 @@
+"""Composite indexes for the hot task and comment queries"""
+import sqlalchemy as sa
+
+revision = '0002'
+description = 'composite indexes for task listing, stats and comment lookups'
+
+INDEXES = [
+    ('ix_tasks_status_priority_created_at', 'tasks', 'status, priority, created_at'),
+    ('ix_tasks_status_created_at', 'tasks', 'status, created_at'),
+    ('ix_tasks_priority_created_at', 'tasks', 'priority, created_at'),
+    ('ix_tasks_created_at_id', 'tasks', 'created_at, id'),
+    ('ix_comments_task_id_created_at', 'comments', 'task_id, created_at'),
+]
+
+
+def upgrade(connection):
+    for name, table, columns in INDEXES:
+        connection.execute(sa.text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})'))
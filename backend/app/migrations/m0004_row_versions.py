@@ -0,0 +1,16 @@
+"""Row version counters for optimistic concurrency on tasks and comments"""
+import sqlalchemy as sa
+
+revision = '0004'
+description = 'version columns on tasks and comments'
+
+TABLES = ['tasks', 'comments']
+
+
+def upgrade(connection):
+    inspector = sa.inspect(connection)
+    for table in TABLES:
+        if 'version' in {column['name'] for column in inspector.get_columns(table)}:
+            continue
+        # Existing rows start at version 1, like rows inserted from now on
+        connection.execute(sa.text(f'ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1'))
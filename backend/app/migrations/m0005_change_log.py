@@ -0,0 +1,84 @@
+"""Change log feeding the delta sync endpoint"""
+import sqlalchemy as sa
+
+revision = '0005'
+description = 'change log of task and comment writes for delta sync'
+
+# One row per changed entity: each write replaces the entity's previous entry
+# with a fresh, ever increasing seq, and deletes leave a tombstone row behind
+SQLITE_STATEMENTS = [
+    "CREATE TABLE IF NOT EXISTS change_log ("
+    "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+    "entity VARCHAR(16) NOT NULL, "
+    "entity_id INTEGER NOT NULL, "
+    "task_id INTEGER NOT NULL, "
+    "deleted BOOLEAN NOT NULL DEFAULT 0, "
+    "changed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_change_log_entity ON change_log (entity, entity_id)",
+]
+
+SQLITE_TRIGGERS = [
+    ('tasks', 'task', 'insert', 'new', 'new.id', 0),
+    ('tasks', 'task', 'update', 'new', 'new.id', 0),
+    ('tasks', 'task', 'delete', 'old', 'old.id', 1),
+    ('comments', 'comment', 'insert', 'new', 'new.task_id', 0),
+    ('comments', 'comment', 'update', 'new', 'new.task_id', 0),
+    ('comments', 'comment', 'delete', 'old', 'old.task_id', 1),
+]
+
+POSTGRESQL_STATEMENTS = [
+    "CREATE TABLE IF NOT EXISTS change_log ("
+    "seq BIGSERIAL PRIMARY KEY, "
+    "entity VARCHAR(16) NOT NULL, "
+    "entity_id INTEGER NOT NULL, "
+    "task_id INTEGER NOT NULL, "
+    "deleted BOOLEAN NOT NULL DEFAULT FALSE, "
+    "changed_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'))",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_change_log_entity ON change_log (entity, entity_id)",
+    "CREATE OR REPLACE FUNCTION record_change() RETURNS trigger AS $$ "
+    "DECLARE row_data RECORD; "
+    "BEGIN "
+    "IF TG_OP = 'DELETE' THEN row_data := OLD; ELSE row_data := NEW; END IF; "
+    "DELETE FROM change_log WHERE entity = TG_ARGV[0] AND entity_id = row_data.id; "
+    "INSERT INTO change_log (entity, entity_id, task_id, deleted) VALUES ("
+    "TG_ARGV[0], row_data.id, "
+    "CASE WHEN TG_ARGV[0] = 'task' THEN row_data.id ELSE (to_jsonb(row_data) ->> 'task_id')::integer END, "
+    "TG_OP = 'DELETE'); "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS tasks_change_log ON tasks",
+    "CREATE TRIGGER tasks_change_log AFTER INSERT OR UPDATE OR DELETE ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION record_change('task')",
+    "DROP TRIGGER IF EXISTS comments_change_log ON comments",
+    "CREATE TRIGGER comments_change_log AFTER INSERT OR UPDATE OR DELETE ON comments "
+    "FOR EACH ROW EXECUTE FUNCTION record_change('comment')",
+]
+
+# Rows that existed before this migration, so since=0 returns a full snapshot
+BACKFILL_STATEMENTS = [
+    "INSERT INTO change_log (entity, entity_id, task_id) "
+    "SELECT 'task', id, id FROM tasks WHERE id NOT IN (SELECT entity_id FROM change_log WHERE entity = 'task') ORDER BY id",
+    "INSERT INTO change_log (entity, entity_id, task_id) "
+    "SELECT 'comment', id, task_id FROM comments WHERE id NOT IN (SELECT entity_id FROM change_log WHERE entity = 'comment') ORDER BY id",
+]
+
+
+def sqlite_trigger(table, entity, operation, row, task_id, deleted):
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {table}_change_log_{operation} AFTER {operation.upper()} ON {table} BEGIN "
+        f"DELETE FROM change_log WHERE entity = '{entity}' AND entity_id = {row}.id; "
+        f"INSERT INTO change_log (entity, entity_id, task_id, deleted) VALUES ('{entity}', {row}.id, {task_id}, {deleted}); "
+        "END"
+    )
+
+
+def upgrade(connection):
+    if connection.dialect.name == 'sqlite':
+        statements = SQLITE_STATEMENTS + [sqlite_trigger(*trigger) for trigger in SQLITE_TRIGGERS]
+    elif connection.dialect.name == 'postgresql':
+        statements = POSTGRESQL_STATEMENTS
+    else:
+        return
+
+    for statement in statements + BACKFILL_STATEMENTS:
+        connection.execute(sa.text(statement))
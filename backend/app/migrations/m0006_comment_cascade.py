@@ -0,0 +1,30 @@
+"""Delete a task's comments in the database instead of through the ORM cascade"""
+import sqlalchemy as sa
+
+revision = '0006'
+description = 'delete comments with their task in the database'
+
+# SQLite only enforces foreign key actions with PRAGMA foreign_keys=ON, and
+# changing a constraint means rebuilding the table, so a trigger does the cascade
+SQLITE_STATEMENTS = [
+    "CREATE TRIGGER IF NOT EXISTS tasks_delete_comments AFTER DELETE ON tasks BEGIN "
+    "DELETE FROM comments WHERE task_id = old.id; "
+    "END",
+]
+
+POSTGRESQL_STATEMENTS = [
+    "ALTER TABLE comments DROP CONSTRAINT IF EXISTS comments_task_id_fkey, "
+    "ADD CONSTRAINT comments_task_id_fkey FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE",
+]
+
+
+def upgrade(connection):
+    if connection.dialect.name == 'sqlite':
+        statements = SQLITE_STATEMENTS
+    elif connection.dialect.name == 'postgresql':
+        statements = POSTGRESQL_STATEMENTS
+    else:
+        return
+
+    for statement in statements:
+        connection.execute(sa.text(statement))
@@ -0,0 +1,27 @@
+"""Background job table"""
+import sqlalchemy as sa
+
+revision = '0007'
+description = 'background jobs'
+
+
+def upgrade(connection):
+    # Frozen copy of the table as introduced, like m0001
+    metadata = sa.MetaData()
+    sa.Table(
+        'jobs', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('kind', sa.String(50), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('payload', sa.Text, nullable=False),
+        sa.Column('result', sa.Text, nullable=True),
+        sa.Column('error', sa.Text, nullable=True),
+        sa.Column('attempts', sa.Integer, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('started_at', sa.DateTime, nullable=True),
+        sa.Column('finished_at', sa.DateTime, nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime, nullable=True),
+        # Workers look for the oldest queued job, or a running one whose lease ran out
+        sa.Index('ix_jobs_status_id', 'status', 'id'),
+    )
+    metadata.create_all(connection, checkfirst=True)
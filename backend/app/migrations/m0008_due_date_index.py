@@ -0,0 +1,10 @@
+"""Index for due date range queries"""
+import sqlalchemy as sa
+
+revision = '0008'
+description = 'index tasks by due date and status'
+
+
+def upgrade(connection):
+    # Serves /api/tasks/due pages and buckets and the overdue counts as range scans
+    connection.execute(sa.text('CREATE INDEX IF NOT EXISTS ix_tasks_due_date_status ON tasks (due_date, status)'))
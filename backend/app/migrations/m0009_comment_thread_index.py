@@ -0,0 +1,17 @@
+"""Index comment threads on (task_id, created_at, id)"""
+import sqlalchemy as sa
+
+revision = '0009'
+description = 'index comment threads by task, created_at and id for cursor pages'
+
+STATEMENTS = [
+    # id breaks created_at ties, so cursor pages are stable and read straight off the index
+    'CREATE INDEX IF NOT EXISTS ix_comments_task_id_created_at_id ON comments (task_id, created_at, id)',
+    # Superseded by the index above, which also covers the comments_count subquery
+    'DROP INDEX IF EXISTS ix_comments_task_id_created_at',
+]
+
+
+def upgrade(connection):
+    for statement in STATEMENTS:
+        connection.execute(sa.text(statement))
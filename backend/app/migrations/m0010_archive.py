@@ -0,0 +1,46 @@
+"""Archive tier for completed tasks and their comments"""
+import sqlalchemy as sa
+
+revision = '0010'
+description = 'archive tables and counters for completed tasks'
+
+
+def upgrade(connection):
+    # Frozen copy of the tables as introduced, like m0001
+    metadata = sa.MetaData()
+    sa.Table(
+        'archived_tasks', metadata,
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('description', sa.Text, nullable=True),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('priority', sa.String(10), nullable=False),
+        sa.Column('due_date', sa.DateTime, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False),
+        sa.Column('version', sa.Integer, nullable=False),
+        sa.Column('comments_count', sa.Integer, nullable=False),
+        sa.Column('archived_at', sa.DateTime, nullable=False),
+        sa.Index('ix_archived_tasks_created_at_id', 'created_at', 'id'),
+        sa.Index('ix_archived_tasks_priority_created_at', 'priority', 'created_at'),
+    )
+    sa.Table(
+        'archived_comments', metadata,
+        sa.Column('task_id', sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column('content', sa.Text, nullable=False),
+        sa.Column('author', sa.String(100), nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False),
+        sa.Column('version', sa.Integer, nullable=False),
+    )
+    sa.Table(
+        'archive_counters', metadata,
+        sa.Column('status', sa.String(20), primary_key=True),
+        sa.Column('priority', sa.String(10), primary_key=True),
+        sa.Column('count', sa.Integer, nullable=False),
+    )
+    metadata.create_all(connection, checkfirst=True)
+
+    # The archiver picks completed tasks by how long ago they last changed
+    connection.execute(sa.text('CREATE INDEX IF NOT EXISTS ix_tasks_status_updated_at ON tasks (status, updated_at)'))
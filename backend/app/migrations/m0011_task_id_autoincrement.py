@@ -0,0 +1,54 @@
+"""Never hand out a task id twice, so archived task ids stay unique"""
+import sqlalchemy as sa
+
+revision = '0011'
+description = 'AUTOINCREMENT task ids on SQLite'
+
+TASK_COLUMNS = 'id, title, description, status, priority, due_date, created_at, updated_at, version'
+
+# Frozen copy of the tasks table as of 0004, with the id declared AUTOINCREMENT
+CREATE_TASKS = """
+CREATE TABLE tasks_rebuilt (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    status VARCHAR(20) NOT NULL,
+    priority VARCHAR(10) NOT NULL,
+    due_date DATETIME,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1
+)
+"""
+
+
+def upgrade(connection):
+    # PostgreSQL sequences never go back; a plain SQLite rowid is max(id) + 1, so deleting
+    # the newest tasks hands their ids out again, including ids already in archived_tasks
+    if connection.dialect.name != 'sqlite':
+        return
+
+    # Indexes and triggers go with the old table; keep their definitions to recreate them
+    dependents = connection.execute(sa.text(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = 'tasks' AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+    )).scalars().all()
+
+    # Foreign key enforcement is off on these connections, so dropping tasks leaves comments alone.
+    # A copy left behind by an earlier run that failed outside a transaction would block the rebuild
+    connection.execute(sa.text('DROP TABLE IF EXISTS tasks_rebuilt'))
+    connection.execute(sa.text(CREATE_TASKS))
+    connection.execute(sa.text(f'INSERT INTO tasks_rebuilt ({TASK_COLUMNS}) SELECT {TASK_COLUMNS} FROM tasks'))
+    connection.execute(sa.text('DROP TABLE tasks'))
+    connection.execute(sa.text('ALTER TABLE tasks_rebuilt RENAME TO tasks'))
+    for statement in dependents:
+        connection.execute(sa.text(statement))
+
+    # Continue after every id known to have been handed out: live, archived, or deleted
+    # with a tombstone left in the change log for sync clients
+    connection.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = 'tasks'"))
+    connection.execute(sa.text(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'tasks', max("
+        "coalesce((SELECT max(id) FROM tasks), 0), "
+        "coalesce((SELECT max(id) FROM archived_tasks), 0), "
+        "coalesce((SELECT max(entity_id) FROM change_log WHERE entity = 'task'), 0))"
+    ))
@@ -0,0 +1,62 @@
+"""EXPLAIN based checks that the hot queries are served by indexes"""
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+
+from app import db
+
+
+def hot_queries():
+    """Return the queries issued by the busiest routes, keyed by name"""
+    from app.routes.tasks import build_task_query
+    from app.comment_pages import comment_page_statement, task_with_comments_statement
+    from app.stats import task_stats
+    from app.models.change_log import ChangeLog
+    from app.models.task import Task
+    from app.due import due_filter
+    from app.pagination import encode_cursor
+    from app.archive import archivable_statement, tiered_task_statement
+
+    now = datetime(2024, 1, 1)
+    return {
+        'tasks.list': build_task_query(),
+        'tasks.list_by_status': build_task_query(status='pending'),
+        'tasks.list_by_priority': build_task_query(priority='high'),
+        'tasks.list_by_status_priority': build_task_query(status='pending', priority='high'),
+        'tasks.stats': task_stats.grouped_counts_query(),
+        'comments.list_by_task': comment_page_statement(1),
+        'comments.page': comment_page_statement(1, 20, encode_cursor(now, 1)),
+        'tasks.get_embed': task_with_comments_statement(1, 20),
+        'tasks.due': due_filter(db.session.query(Task.id), now, now + timedelta(days=7))
+                     .order_by(Task.due_date, Task.id).limit(51),
+        'tasks.overdue': due_filter(db.session.query(Task.priority, db.func.count(Task.id)), before=now)
+                         .group_by(Task.priority),
+        'tasks.list_with_archive': tiered_task_statement(['title'], cursor=encode_cursor(now, 1), limit=51),
+        'tasks.archivable': archivable_statement(now, 500),
+        'sync.changes': db.session.query(ChangeLog.seq).filter(ChangeLog.seq > 0).order_by(ChangeLog.seq).limit(500),
+    }
+
+
+def explain(query):
+    """Return the SQLite query plan lines for a query"""
+    statement = getattr(query, 'statement', query).compile(db.engine, compile_kwargs={'literal_binds': True})
+    rows = db.session.execute(sa.text(f'EXPLAIN QUERY PLAN {statement}'))
+    return [row.detail for row in rows]
+
+
+def is_full_scan(detail):
+    """A SCAN step that is not walking an index reads the whole table
+
+    Scans of anon_ subqueries read rows an earlier step already limited, not a table.
+    """
+    return detail.startswith('SCAN ') and 'INDEX' not in detail and not detail.startswith('SCAN anon_')
+
+
+def check_query_plans():
+    """Yield (name, plan, full_scan) for every hot query"""
+    if db.engine.dialect.name != 'sqlite':
+        raise RuntimeError('Query plan checks are only supported on SQLite')
+
+    for name, query in hot_queries().items():
+        plan = explain(query)
+        yield name, plan, any(is_full_scan(detail) for detail in plan)
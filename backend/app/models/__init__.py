@@ -1,5 +1,8 @@
 # Models package
 from .task import Task
 from .comment import Comment
+from .change_log import ChangeLog
+from .job import Job
+from .archive import ArchivedTask, ArchivedComment, ArchiveCounter
 
-__all__ = ['Task', 'Comment']
\ No newline at end of file
+__all__ = ['Task', 'Comment', 'ChangeLog', 'Job', 'ArchivedTask', 'ArchivedComment', 'ArchiveCounter']
\ No newline at end of file
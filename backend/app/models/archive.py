@@ -0,0 +1,61 @@
+from datetime import datetime
+from app import db
+
+class ArchivedTask(db.Model):
+    """A completed task moved out of the hot tasks table by the archiver; read only"""
+    __tablename__ = 'archived_tasks'
+    __table_args__ = (
+        # Same list ordering and priority filter as the hot table
+        db.Index('ix_archived_tasks_created_at_id', 'created_at', 'id'),
+        db.Index('ix_archived_tasks_priority_created_at', 'priority', 'created_at'),
+    )
+    
+    # Ids are kept from the tasks table, so a task reads the same from either tier
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=False)
+    priority = db.Column(db.String(10), nullable=False)
+    due_date = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    # Archived tasks take no new comments, so the count is stored instead of computed
+    comments_count = db.Column(db.Integer, nullable=False, default=0)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    @classmethod
+    def exists_query(cls, task_id):
+        """SELECT EXISTS for an archived task id"""
+        return db.select(db.exists().where(cls.id == task_id))
+    
+    def __repr__(self):
+        return f'<ArchivedTask {self.id}: {self.title}>'
+
+class ArchivedComment(db.Model):
+    """A comment of an archived task"""
+    __tablename__ = 'archived_comments'
+    
+    # Comment ids can be handed out again once the newest comment is archived, so the
+    # key includes the task, whose id never is (see app.archive)
+    task_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    content = db.Column(db.Text, nullable=False)
+    author = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    
+    def __repr__(self):
+        return f'<ArchivedComment {self.id} for Task {self.task_id}>'
+
+class ArchiveCounter(db.Model):
+    """Number of archived tasks per (status, priority), kept by the archiver for the stats view"""
+    __tablename__ = 'archive_counters'
+    
+    status = db.Column(db.String(20), primary_key=True)
+    priority = db.Column(db.String(10), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ArchiveCounter {self.status}/{self.priority}: {self.count}>'
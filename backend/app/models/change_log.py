@@ -0,0 +1,19 @@
+from datetime import datetime
+from app import db
+
+class ChangeLog(db.Model):
+    """Latest change per task or comment, maintained by database triggers (migration 0005)"""
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        db.Index('ix_change_log_entity', 'entity', 'entity_id', unique=True),
+    )
+    
+    seq = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(16), nullable=False)  # task, comment
+    entity_id = db.Column(db.Integer, nullable=False)
+    task_id = db.Column(db.Integer, nullable=False)
+    deleted = db.Column(db.Boolean, nullable=False, default=False)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ChangeLog {self.seq}: {self.entity} {self.entity_id}>'
@@ -1,17 +1,32 @@
 from datetime import datetime
 from app import db
+from app.models.task import Task
 
 class Comment(db.Model):
     __tablename__ = 'comments'
+    __table_args__ = (
+        # Serves per-task comment pages and the comments_count subquery
+        db.Index('ix_comments_task_id_created_at_id', 'task_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
     author = db.Column(db.String(100), nullable=True, default='Anonymous')
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=1)
     
     # Foreign key to tasks
-    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id', ondelete='CASCADE'), nullable=False)
+    
+    # Every ORM flush checks and bumps version, so concurrent writers can't silently overwrite each other
+    __mapper_args__ = {'version_id_col': version}
+    
+    # Columns serialized by the list endpoints, in to_dict order
+    FIELDS = ['id', 'content', 'author', 'task_id', 'created_at', 'updated_at', 'version']
+    
+    # Columns a PATCH request may change
+    PATCHABLE_FIELDS = ['content', 'author']
     
     def __repr__(self):
         return f'<Comment {self.id} for Task {self.task_id}>'
@@ -23,20 +38,47 @@ class Comment(db.Model):
             'author': self.author,
             'task_id': self.task_id,
             'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'updated_at': self.updated_at.isoformat(),
+            'version': self.version
         }
     
     def validate(self):
         """Validate comment data"""
+        return self.validate_fields(self.content, self.author)
+    
+    @classmethod
+    def validate_fields(cls, content, author):
+        """Validate raw comment field values without building a model instance"""
+        return cls.validate_changes({'content': content, 'author': author})
+    
+    @staticmethod
+    def validate_changes(changes):
+        """Validate the comment fields present in changes, skipping the others"""
         errors = []
         
-        if not self.content or len(self.content.strip()) < 1:
-            errors.append("Comment content is required and cannot be empty")
-        
-        if self.content and len(self.content) > 1000:
-            errors.append("Comment cannot exceed 1000 characters")
+        if 'content' in changes:
+            content = changes['content']
+            if not isinstance(content, str) or len(content.strip()) < 1:
+                errors.append("Comment content is required and cannot be empty")
+            
+            if isinstance(content, str) and len(content) > 1000:
+                errors.append("Comment cannot exceed 1000 characters")
         
-        if self.author and len(self.author) > 100:
-            errors.append("Author name cannot exceed 100 characters")
+        if 'author' in changes:
+            author = changes['author']
+            if author is not None and not isinstance(author, str):
+                errors.append("Author name must be a string")
+            
+            if isinstance(author, str) and len(author) > 100:
+                errors.append("Author name cannot exceed 100 characters")
         
-        return errors
\ No newline at end of file
+        return errors
+
+# Comment counts are loaded together with each task row through a correlated
+# subquery, so listing tasks never lazy loads the comments relationship
+Task.comments_count = db.column_property(
+    db.select(db.func.count(Comment.id))
+    .where(Comment.task_id == Task.id)
+    .correlate_except(Comment)
+    .scalar_subquery()
+)
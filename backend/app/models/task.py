@@ -1,8 +1,21 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from app import db
 
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Composite indexes backing the list filters, ordering and stats grouping
+        db.Index('ix_tasks_status_priority_created_at', 'status', 'priority', 'created_at'),
+        db.Index('ix_tasks_status_created_at', 'status', 'created_at'),
+        db.Index('ix_tasks_priority_created_at', 'priority', 'created_at'),
+        db.Index('ix_tasks_created_at_id', 'created_at', 'id'),
+        # Due date range scans for /api/tasks/due and the overdue counts
+        db.Index('ix_tasks_due_date_status', 'due_date', 'status'),
+        # Completed tasks by last change, for the archiver (migration 0010)
+        db.Index('ix_tasks_status_updated_at', 'status', 'updated_at'),
+        # Ids are never reused, so an archived task keeps its id to itself (migration 0011)
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -12,9 +25,23 @@ class Task(db.Model):
     due_date = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=1)
     
-    # Relationship with comments
-    comments = db.relationship('Comment', backref='task', lazy=True, cascade='all, delete-orphan')
+    # Relationship with comments; the database deletes them with the task (migration 0006),
+    # so deleting a task never loads its comments
+    comments = db.relationship('Comment', backref='task', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    
+    # Every ORM flush checks and bumps version, so concurrent writers can't silently overwrite each other
+    __mapper_args__ = {'version_id_col': version}
+    
+    STATUSES = ['pending', 'in_progress', 'completed']
+    PRIORITIES = ['low', 'medium', 'high']
+    
+    # Columns that can be selected through the fields= projection on list endpoints
+    PROJECTABLE_FIELDS = ['id', 'title', 'description', 'status', 'priority', 'due_date', 'created_at', 'updated_at', 'version', 'comments_count']
+    
+    # Columns a PATCH request may change
+    PATCHABLE_FIELDS = ['title', 'description', 'status', 'priority', 'due_date']
     
     def __repr__(self):
         return f'<Task {self.id}: {self.title}>'
@@ -29,25 +56,55 @@ class Task(db.Model):
             'due_date': self.due_date.isoformat() if self.due_date else None,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
-            'comments_count': len(self.comments)
+            'version': self.version,
+            'comments_count': self.comments_count
         }
     
+    @staticmethod
+    def parse_due_date(value):
+        """Parse an ISO formatted due date into the naive UTC form it is stored in
+
+        A trailing Z or another offset is converted to UTC; values without
+        one are taken to be UTC already.
+        """
+        if not isinstance(value, str):
+            raise ValueError('due_date must be a string')
+        due_date = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if due_date.tzinfo is not None:
+            due_date = due_date.astimezone(timezone.utc).replace(tzinfo=None)
+        return due_date
+    
+    @classmethod
+    def exists_query(cls, task_id):
+        """SELECT EXISTS for a task id; unlike loading the task it skips the comments_count subquery"""
+        return db.select(db.exists().where(cls.id == task_id))
+    
     def validate(self):
         """Validate task data"""
+        return self.validate_fields(self.title, self.status, self.priority)
+    
+    @classmethod
+    def validate_fields(cls, title, status, priority):
+        """Validate raw task field values without building a model instance"""
+        return cls.validate_changes({'title': title, 'status': status, 'priority': priority})
+    
+    @classmethod
+    def validate_changes(cls, changes):
+        """Validate the task fields present in changes, skipping the others"""
         errors = []
         
-        if not self.title or len(self.title.strip()) < 1:
-            errors.append("Title is required and cannot be empty")
-        
-        if self.title and len(self.title) > 200:
-            errors.append("Title cannot exceed 200 characters")
+        if 'title' in changes:
+            title = changes['title']
+            if not isinstance(title, str) or len(title.strip()) < 1:
+                errors.append("Title is required and cannot be empty")
+            
+            if isinstance(title, str) and len(title) > 200:
+                errors.append("Title cannot exceed 200 characters")
         
-        valid_statuses = ['pending', 'in_progress', 'completed']
-        if self.status not in valid_statuses:
-            errors.append(f"Status must be one of: {', '.join(valid_statuses)}")
+        if 'status' in changes and changes['status'] not in cls.STATUSES:
+            errors.append(f"Status must be one of: {', '.join(cls.STATUSES)}")
         
-        valid_priorities = ['low', 'medium', 'high']
-        if self.priority not in valid_priorities:
-            errors.append(f"Priority must be one of: {', '.join(valid_priorities)}")
+        if 'priority' in changes and changes['priority'] not in cls.PRIORITIES:
+            errors.append(f"Priority must be one of: {', '.join(cls.PRIORITIES)}")
         
         return errors
\ No newline at end of file
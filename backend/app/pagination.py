@@ -0,0 +1,78 @@
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at, item_id):
+    """Encode a (created_at, id) position into an opaque cursor string"""
+    payload = json.dumps([created_at.isoformat(), item_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode an opaque cursor string back into a (created_at, id) tuple"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse the limit query parameter, clamping it to the allowed page size"""
+    if value is None or value == '':
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(limit, maximum)
+
+
+def parse_ids(value, maximum=MAX_PAGE_SIZE):
+    """Parse a comma separated ids parameter into unique integer ids, in the order given"""
+    try:
+        ids = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise ValueError('ids must be a comma separated list of integers')
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise ValueError('ids must not be empty')
+    if len(ids) > maximum:
+        raise ValueError(f'At most {maximum} ids can be requested at once')
+    return ids
+
+
+def parse_fields(value, allowed):
+    """Parse a comma separated fields parameter against the allowed field names"""
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed fields: {', '.join(allowed)}")
+    return fields
+
+
+def keyset_filter(query, created_at_column, id_column, cursor):
+    """Restrict a created_at desc, id desc ordered query to rows after the cursor"""
+    created_at, item_id = decode_cursor(cursor)
+    return query.filter(
+        (created_at_column < created_at) |
+        ((created_at_column == created_at) & (id_column < item_id))
+    )
+
+
+def keyset_filter_ascending(query, sort_column, id_column, cursor):
+    """Restrict a sort_column asc, id asc ordered query to rows after the cursor"""
+    value, item_id = decode_cursor(cursor)
+    return query.filter(
+        (sort_column > value) |
+        ((sort_column == value) & (id_column > item_id))
+    )
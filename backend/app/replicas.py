@@ -0,0 +1,142 @@
+import itertools
+import threading
+import time
+from datetime import datetime
+
+import sqlalchemy as sa
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+class RoutingSession(Session):
+    """db.session class that sends the reads of replica routed requests to a read replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            engine = replica_router.engine_for(self, clause)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Round-robin routing of read-only requests across read replicas
+
+    Replicas are Flask-SQLAlchemy binds named replica_0, replica_1, ... from
+    DATABASE_REPLICA_URLS. Only the requests of blueprints registered with
+    route_reads() are eligible, and only their SELECTs: the first write or
+    flush pins the rest of the request to the primary, so it reads what it
+    just wrote. Work outside a request (jobs, scheduler, CLI) always uses the
+    primary.
+
+    A scheduled check measures each replica's lag as the age of the oldest
+    change_log entry it has not replayed yet. Replicas that fail the check,
+    lag more than max_lag seconds, or have not been checked recently are
+    skipped, and when none is left requests fall back to the primary.
+    """
+
+    def __init__(self):
+        self.replicas = []
+        self.max_lag = 5
+        self.check_interval = 5
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        self.db = db
+        self.max_lag = app.config['REPLICA_MAX_LAG_SECONDS']
+        self.check_interval = app.config['REPLICA_CHECK_INTERVAL']
+        self.replicas = [
+            {'name': name, 'healthy': False, 'lag': None, 'checked_at': None, 'error': None}
+            for name in app.config['SQLALCHEMY_BINDS'] if name.startswith('replica_')
+        ]
+
+        for replica in self.replicas:
+            self._watch_disconnects(replica)
+
+        @app.teardown_request
+        def forget_route(exception=None):
+            g.pop('db_replica', None)
+
+    @property
+    def engines(self):
+        return [self.db.engines[replica['name']] for replica in self.replicas]
+
+    def route_reads(self, blueprint):
+        """Let the GET requests of a blueprint read from a replica"""
+        blueprint.before_request(self._choose_replica)
+
+    def _choose_replica(self):
+        # Batched sub-requests share the session, so a write in one pins the ones after it
+        if request.method in READ_METHODS and not g.get('db_wrote'):
+            g.db_replica = self.pick()
+
+    def pick(self):
+        """Name of the next available replica, or None to use the primary"""
+        available = [replica['name'] for replica in self.replicas if self.is_available(replica)]
+        if not available:
+            return None
+        return available[next(self._counter) % len(available)]
+
+    def is_available(self, replica):
+        if not replica['healthy'] or replica['lag'] is None or replica['lag'] > self.max_lag:
+            return False
+        # A check that stopped running says nothing about the replica any more
+        return time.monotonic() - replica['checked_at'] <= 3 * self.check_interval
+
+    def engine_for(self, session, clause):
+        """Engine for a statement of the current request, or None for the default bind"""
+        if not has_request_context():
+            return None
+
+        is_read = (
+            not session._flushing
+            and isinstance(clause, sa.Select)
+            and clause._for_update_arg is None
+        )
+        if not is_read:
+            # Everything after a write, reads included, goes to the primary
+            g.db_replica = None
+            g.db_wrote = True
+            return None
+        if g.get('db_replica') is None:
+            return None
+
+        g.setdefault('db_binds', set()).add(g.db_replica)
+        return session._db.engines[g.db_replica]
+
+    def check(self):
+        """Refresh the health and lag of every replica"""
+        from app.models.change_log import ChangeLog
+
+        for replica in self.replicas:
+            try:
+                with self.db.engines[replica['name']].connect() as connection:
+                    replayed = connection.scalar(sa.select(sa.func.coalesce(sa.func.max(ChangeLog.seq), 0)))
+                with self.db.engine.connect() as connection:
+                    oldest_missing = connection.scalar(
+                        sa.select(sa.func.min(ChangeLog.changed_at)).where(ChangeLog.seq > replayed)
+                    )
+            except Exception as e:
+                self._mark_down(replica, str(e))
+                continue
+
+            lag = 0.0 if oldest_missing is None else max(0.0, (datetime.utcnow() - oldest_missing).total_seconds())
+            with self._lock:
+                replica.update(healthy=True, lag=lag, checked_at=time.monotonic(), error=None)
+
+    def _mark_down(self, replica, error):
+        with self._lock:
+            replica.update(healthy=False, checked_at=time.monotonic(), error=error)
+
+    def _watch_disconnects(self, replica):
+        # Stop routing to a replica as soon as one of its connections drops, not at the next check
+        @sa.event.listens_for(self.db.engines[replica['name']], 'handle_error')
+        def handle_error(context):
+            if context.is_disconnect:
+                self._mark_down(replica, str(context.original_exception))
+
+
+replica_router = ReplicaRouter()
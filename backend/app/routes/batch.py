@@ -0,0 +1,30 @@
+from flask import Blueprint, current_app, request, jsonify
+from app.batch import parse_batch, run_batch
+
+batch_bp = Blueprint('batch', __name__)
+
+@batch_bp.route('/batch', methods=['POST'])
+def batch():
+    """Run several API requests in one round trip, sharing one database session"""
+    try:
+        try:
+            subrequests = parse_batch(request.get_json(silent=True), current_app.config['BATCH_MAX_REQUESTS'])
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        responses = run_batch(subrequests)
+        
+        return jsonify({
+            'success': True,
+            'responses': responses,
+            'count': len(responses)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
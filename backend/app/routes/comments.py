@@ -1,32 +1,61 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from datetime import datetime
 from app import db
 from app.models.comment import Comment
 from app.models.task import Task
+from app.models.archive import ArchivedTask
+from app.cache import response_cache
+from app.replicas import replica_router
+from app.events import event_bus
+from app.serialization import rows_to_dicts
+from app.conditional import if_match_versions, prefers_minimal, version_etag
+from app.bulk import bulk_batch_size, bulk_insert, bulk_response_status, iter_bulk_items
+from app.comment_pages import comment_page, comment_page_statement
+from app.pagination import parse_limit
 
 comments_bp = Blueprint('comments', __name__)
 
+# GET requests read from a replica when one is configured and caught up
+replica_router.route_reads(comments_bp)
+
 @comments_bp.route('/tasks/<int:task_id>/comments', methods=['GET'])
+@response_cache.cached()
 def get_task_comments(task_id):
-    """Get all comments for a specific task"""
+    """Get the comments of a task, newest first, with optional cursor pagination"""
     try:
-        # Check if task exists
-        task = Task.query.get(task_id)
-        if not task:
+        cursor = request.args.get('cursor')
+        paginate = cursor is not None or 'limit' in request.args
+        
+        try:
+            limit = parse_limit(request.args.get('limit')) if paginate else None
+            statement = comment_page_statement(task_id, limit, cursor)
+        except ValueError as e:
             return jsonify({
                 'success': False,
-                'error': 'Task not found'
-            }), 404
+                'error': str(e)
+            }), 400
         
-        # Get comments for this task
-        comments = Comment.query.filter(Comment.task_id == task_id)\
-                                .order_by(Comment.created_at.desc()).all()
+        comments, next_cursor = comment_page(db.session.execute(statement).all(), limit)
         
-        return jsonify({
+        # Only an empty page needs to tell a missing task from a task without comments
+        if not comments and not db.session.scalar(Task.exists_query(task_id)):
+            if not db.session.scalar(ArchivedTask.exists_query(task_id)):
+                return jsonify({
+                    'success': False,
+                    'error': 'Task not found'
+                }), 404
+            statement = comment_page_statement(task_id, limit, cursor, archived=True)
+            comments, next_cursor = comment_page(db.session.execute(statement).all(), limit)
+        
+        response = {
             'success': True,
-            'comments': [comment.to_dict() for comment in comments],
+            'comments': comments,
             'count': len(comments)
-        }), 200
+        }
+        if paginate:
+            response['next_cursor'] = next_cursor
+        
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({
@@ -38,9 +67,8 @@ def get_task_comments(task_id):
 def create_comment(task_id):
     """Create a new comment for a task"""
     try:
-        # Check if task exists
-        task = Task.query.get(task_id)
-        if not task:
+        # Check if task exists without loading it
+        if not db.session.scalar(Task.exists_query(task_id)):
             return jsonify({
                 'success': False,
                 'error': 'Task not found'
@@ -72,11 +100,14 @@ def create_comment(task_id):
         # Save to database
         db.session.add(comment)
         db.session.commit()
+        response_cache.invalidate(task_id)
+        comment_dict = comment.to_dict()
+        event_bus.publish('comment.created', comment_dict)
         
         return jsonify({
             'success': True,
             'message': 'Comment created successfully',
-            'comment': comment.to_dict()
+            'comment': comment_dict
         }), 201
         
     except Exception as e:
@@ -86,6 +117,62 @@ def create_comment(task_id):
             'error': str(e)
         }), 500
 
+@comments_bp.route('/tasks/<int:task_id>/comments/bulk', methods=['POST'])
+def bulk_create_comments(task_id):
+    """Create many comments for a task from a JSON array or an NDJSON stream"""
+    try:
+        # Check if task exists without loading it
+        if not db.session.scalar(Task.exists_query(task_id)):
+            return jsonify({
+                'success': False,
+                'error': 'Task not found'
+            }), 404
+        
+        def prepare_comment_row(data):
+            row = {
+                'content': data.get('content'),
+                'author': data.get('author', 'Anonymous'),
+                'task_id': task_id
+            }
+            return row, Comment.validate_fields(row['content'], row['author'])
+        
+        try:
+            batch_size = bulk_batch_size()
+            results, rows = bulk_insert(Comment, iter_bulk_items(), prepare_comment_row, batch_size)
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        if not results:
+            return jsonify({
+                'success': False,
+                'error': 'No data provided'
+            }), 400
+        
+        # All valid batches are written in one transaction
+        db.session.commit()
+        response_cache.invalidate(task_id)
+        if rows:
+            event_bus.publish('comment.bulk_created', {'task_id': task_id, 'ids': [row['id'] for row in rows]})
+        
+        status_code = bulk_response_status(results)
+        return jsonify({
+            'success': status_code == 201,
+            'created': len(rows),
+            'failed': len(results) - len(rows),
+            'results': results
+        }), status_code
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @comments_bp.route('/comments/<int:comment_id>', methods=['GET'])
 def get_comment(comment_id):
     """Get a specific comment by ID"""
@@ -148,11 +235,14 @@ def update_comment(comment_id):
         
         # Save changes
         db.session.commit()
+        response_cache.invalidate(comment.task_id)
+        comment_dict = comment.to_dict()
+        event_bus.publish('comment.updated', comment_dict)
         
         return jsonify({
             'success': True,
             'message': 'Comment updated successfully',
-            'comment': comment.to_dict()
+            'comment': comment_dict
         }), 200
         
     except Exception as e:
@@ -162,6 +252,94 @@ def update_comment(comment_id):
             'error': str(e)
         }), 500
 
+@comments_bp.route('/comments/<int:comment_id>', methods=['PATCH'])
+def patch_comment(comment_id):
+    """Partially update a comment with a single UPDATE, guarded by If-Match when given"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'No data provided'
+            }), 400
+        
+        changes = {name: data[name] for name in Comment.PATCHABLE_FIELDS if name in data}
+        if not changes:
+            return jsonify({
+                'success': False,
+                'error': f"No updatable fields provided. Allowed: {', '.join(Comment.PATCHABLE_FIELDS)}"
+            }), 400
+        
+        # Validate only the fields being changed, the stored row is never loaded
+        validation_errors = Comment.validate_changes(changes)
+        if validation_errors:
+            return jsonify({
+                'success': False,
+                'error': 'Validation failed',
+                'validation_errors': validation_errors
+            }), 400
+        
+        # Compare and set in one statement: the version condition replaces a prior SELECT
+        updated_at = datetime.utcnow()
+        statement = db.update(Comment).where(Comment.id == comment_id).values(
+            **changes,
+            version=Comment.version + 1,
+            updated_at=updated_at
+        )
+        versions = if_match_versions()
+        if versions is not None:
+            statement = statement.where(Comment.version.in_(versions))
+        
+        # task_id is always returned, it scopes the cache invalidation
+        minimal = prefers_minimal()
+        fields = ['task_id', 'version'] if minimal else Comment.FIELDS
+        row = db.session.execute(statement.returning(*[getattr(Comment, name) for name in fields])).first()
+        
+        if row is None:
+            db.session.rollback()
+            current_version = db.session.query(Comment.version).filter(Comment.id == comment_id).scalar()
+            if current_version is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Comment not found'
+                }), 404
+            response = jsonify({
+                'success': False,
+                'error': 'Comment has been modified since the given version',
+                'current_version': current_version
+            })
+            response.status_code = 412
+            response.set_etag(version_etag(current_version))
+            return response
+        
+        db.session.commit()
+        response_cache.invalidate(row.task_id)
+        
+        if minimal:
+            # Subscribers merge the changed fields into their copy of the comment
+            event_bus.publish('comment.updated', {
+                'id': comment_id, 'task_id': row.task_id, **changes, 'updated_at': updated_at, 'version': row.version
+            })
+            response = current_app.response_class(status=204)
+            response.headers['Preference-Applied'] = 'return=minimal'
+        else:
+            comment_dict = rows_to_dicts([row], fields)[0]
+            event_bus.publish('comment.updated', comment_dict)
+            response = jsonify({
+                'success': True,
+                'message': 'Comment updated successfully',
+                'comment': comment_dict
+            })
+        response.set_etag(version_etag(row.version))
+        return response
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @comments_bp.route('/comments/<int:comment_id>', methods=['DELETE'])
 def delete_comment(comment_id):
     """Delete a specific comment"""
@@ -175,8 +353,11 @@ def delete_comment(comment_id):
             }), 404
         
         # Delete comment
+        task_id = comment.task_id
         db.session.delete(comment)
         db.session.commit()
+        response_cache.invalidate(task_id)
+        event_bus.publish('comment.deleted', {'id': comment_id, 'task_id': task_id})
         
         return jsonify({
             'success': True,
@@ -0,0 +1,40 @@
+from flask import Blueprint, Response, request, jsonify
+from app.events import event_bus
+
+events_bp = Blueprint('events', __name__)
+
+@events_bp.route('/events', methods=['GET'])
+def stream_events():
+    """Stream task and comment changes as Server-Sent Events"""
+    try:
+        # Browsers send Last-Event-ID when reconnecting; the query parameter covers the first connect
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        if last_event_id is not None:
+            try:
+                last_event_id = int(last_event_id)
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'error': 'Last-Event-ID must be an integer'
+                }), 400
+        
+        # Every open stream holds a worker thread, so cap them per process
+        if not event_bus.acquire_stream():
+            return jsonify({
+                'success': False,
+                'error': 'Too many open event streams. Retry later.'
+            }), 503, {'Retry-After': '5'}
+        
+        response = Response(
+            event_bus.stream(last_event_id),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        response.call_on_close(event_bus.release_stream)
+        return response
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -0,0 +1,42 @@
+from flask import Blueprint, jsonify, url_for
+from app.models.job import Job
+
+jobs_bp = Blueprint('jobs', __name__)
+
+# Seconds a client polling an unfinished job is asked to wait
+JOB_POLL_AFTER = 1
+
+def job_accepted(job, message):
+    """202 Accepted response pointing at the status resource of a queued job"""
+    return jsonify({
+        'success': True,
+        'message': message,
+        'job': job.to_dict()
+    }), 202, {
+        'Location': url_for('jobs.get_job', job_id=job.id),
+        'Preference-Applied': 'respond-async'
+    }
+
+@jobs_bp.route('/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the status of a background job, with its result once it has finished"""
+    try:
+        job = Job.query.get(job_id)
+        
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Job not found'
+            }), 404
+        
+        headers = {} if job.finished else {'Retry-After': str(JOB_POLL_AFTER)}
+        return jsonify({
+            'success': True,
+            'job': job.to_dict()
+        }), 200, headers
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -0,0 +1,117 @@
+from flask import Blueprint, request, jsonify
+from app import db
+from app.models.task import Task
+from app.models.comment import Comment
+from app.models.change_log import ChangeLog
+from app.models.archive import ArchivedComment, ArchivedTask
+from app.cache import response_cache
+from app.serialization import rows_to_dicts
+from app.pagination import parse_limit
+
+sync_bp = Blueprint('sync', __name__)
+
+SYNC_PAGE_SIZE = 500
+SYNC_MAX_PAGE_SIZE = 5000
+
+@sync_bp.route('/sync', methods=['GET'])
+@response_cache.cached()
+def sync_changes():
+    """Get the tasks and comments changed after a watermark, plus tombstones for deletes
+
+    Archived tasks and their comments come back as changes flagged archived, not as deletes.
+    since=latest returns no changes, only the current watermark to poll from.
+    """
+    try:
+        if request.args.get('since') == 'latest':
+            watermark = db.session.scalar(db.select(db.func.coalesce(db.func.max(ChangeLog.seq), 0)))
+            return jsonify({
+                'success': True,
+                'tasks': [],
+                'comments': [],
+                'deleted': {'tasks': [], 'comments': []},
+                'watermark': watermark,
+                'has_more': False
+            }), 200
+        
+        try:
+            since = int(request.args.get('since', 0))
+            if since < 0:
+                raise ValueError
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'since must be a watermark returned by a previous sync, 0 or latest'
+            }), 400
+        
+        try:
+            limit = parse_limit(request.args.get('limit'), default=SYNC_PAGE_SIZE, maximum=SYNC_MAX_PAGE_SIZE)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        # Walk the change log by seq; its primary key keeps this proportional to the churn
+        entries = db.session.query(ChangeLog.seq, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.task_id, ChangeLog.deleted)\
+                            .filter(ChangeLog.seq > since)\
+                            .order_by(ChangeLog.seq)\
+                            .limit(limit + 1).all()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        
+        changed = {'task': [], 'comment': []}
+        deleted = {'task': [], 'comment': []}
+        for entry in entries:
+            (deleted if entry.deleted else changed)[entry.entity].append(entry)
+        
+        # Current state of the changed rows, read in the same transaction as the log
+        tasks = []
+        if changed['task']:
+            task_ids = [entry.entity_id for entry in changed['task']]
+            rows = db.session.query(*[getattr(Task, name) for name in Task.PROJECTABLE_FIELDS])\
+                             .filter(Task.id.in_(task_ids)).all()
+            tasks = rows_to_dicts(rows, Task.PROJECTABLE_FIELDS)
+            
+            # Changed tasks missing from the hot table were moved by the archiver
+            archived_ids = set(task_ids) - {task['id'] for task in tasks}
+            if archived_ids:
+                rows = db.session.query(*[getattr(ArchivedTask, name) for name in Task.PROJECTABLE_FIELDS])\
+                                 .filter(ArchivedTask.id.in_(archived_ids)).all()
+                tasks += [{**task, 'archived': True} for task in rows_to_dicts(rows, Task.PROJECTABLE_FIELDS)]
+        
+        comments = []
+        if changed['comment']:
+            comment_ids = [entry.entity_id for entry in changed['comment']]
+            rows = db.session.query(*[getattr(Comment, name) for name in Comment.FIELDS])\
+                             .filter(Comment.id.in_(comment_ids)).all()
+            comments = rows_to_dicts(rows, Comment.FIELDS)
+            
+            # Archived comment ids are only unique per task, so they are matched on both
+            archived_keys = {(entry.task_id, entry.entity_id) for entry in changed['comment']} - \
+                            {(comment['task_id'], comment['id']) for comment in comments}
+            if archived_keys:
+                rows = db.session.query(*[getattr(ArchivedComment, name) for name in Comment.FIELDS])\
+                                 .filter(ArchivedComment.task_id.in_({task_id for task_id, _ in archived_keys}),
+                                         ArchivedComment.id.in_({comment_id for _, comment_id in archived_keys})).all()
+                comments += [
+                    comment for comment in rows_to_dicts(rows, Comment.FIELDS)
+                    if (comment['task_id'], comment['id']) in archived_keys
+                ]
+        
+        return jsonify({
+            'success': True,
+            'tasks': tasks,
+            'comments': comments,
+            'deleted': {
+                'tasks': [entry.entity_id for entry in deleted['task']],
+                'comments': [entry.entity_id for entry in deleted['comment']]
+            },
+            'watermark': entries[-1].seq if entries else since,
+            'has_more': has_more
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -1,34 +1,174 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from datetime import datetime
+from sqlalchemy.orm.exc import StaleDataError
 from app import db
 from app.models.task import Task
+from app.stats import task_stats
+from app.cache import response_cache
+from app.replicas import replica_router
+from app.events import event_bus
+from app.jobs import job_queue
+from app.search import search_task_ids
+from app.export import EXPORT_FORMATS, buffered, csv_lines, iter_export_records, ndjson_lines
+from app.bulk import bulk_batch_size, bulk_insert, bulk_response_status, iter_bulk_items
+from app.serialization import rows_to_dicts
+from app.conditional import if_match_versions, prefers_async, prefers_minimal, version_etag
+from app.comment_pages import parse_embed, split_task_with_comments, task_with_comments_statement
+from app.archive import archive_completed_tasks, parse_archive_options, tiered_task_statement
+from app.due import BUCKETS, due_bucket_counts, due_filter, parse_instant
+from app.pagination import encode_cursor, keyset_filter, keyset_filter_ascending, parse_fields, parse_ids, parse_limit
+from app.routes.jobs import job_accepted
 
 tasks_bp = Blueprint('tasks', __name__)
 
+# GET requests read from a replica when one is configured and caught up
+replica_router.route_reads(tasks_bp)
+
+def project_tasks(fields, required=('id', 'created_at')):
+    """Query only the projected task columns, plus those the ordering and cursors need"""
+    columns = set(fields) | set(required)
+    return db.session.query(*[getattr(Task, name) for name in Task.PROJECTABLE_FIELDS if name in columns])
+
+def build_task_query(status=None, priority=None, fields=None):
+    """Build the ordered task list statement shared by the Flask and ASGI list endpoints
+
+    A plain SELECT with no session attached, so the async app can execute it too.
+    """
+    # Load only the projected columns, plus those the ordering and cursors need, when requested
+    if fields:
+        columns = set(fields) | {'id', 'created_at'}
+        statement = db.select(*[getattr(Task, name) for name in Task.PROJECTABLE_FIELDS if name in columns])
+    else:
+        statement = db.select(Task)
+    
+    # Apply filters
+    if status:
+        statement = statement.where(Task.status == status)
+    if priority:
+        statement = statement.where(Task.priority == priority)
+    
+    # Order by created_at desc, with id as a tie breaker for stable cursors
+    return statement.order_by(Task.created_at.desc(), Task.id.desc())
+
 @tasks_bp.route('/tasks', methods=['GET'])
+@response_cache.cached()
 def get_tasks():
-    """Get all tasks with optional filtering"""
+    """Get all tasks with optional filtering, cursor pagination and field projection, or the tasks listed in ids"""
     try:
         # Get query parameters
         status = request.args.get('status')
         priority = request.args.get('priority')
+        cursor = request.args.get('cursor')
+        ids = request.args.get('ids')
+        paginate = ids is None and (cursor is not None or 'limit' in request.args)
+        include_archived = request.args.get('include_archived', '').lower() in ('1', 'true', 'yes')
+        
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            fields = parse_fields(request.args.get('fields'), Task.PROJECTABLE_FIELDS) or Task.PROJECTABLE_FIELDS
+            ids = parse_ids(ids) if ids is not None else None
+            
+            if include_archived:
+                # Hot and archived tasks in one UNION ALL statement, flagged by tier
+                statement = tiered_task_statement(
+                    fields, status, priority, ids,
+                    cursor=cursor if paginate else None,
+                    limit=limit + 1 if paginate else None
+                )
+                fields = fields + ['archived']
+            else:
+                statement = build_task_query(status, priority, fields)
+                if ids is not None:
+                    # One IN query for the whole set
+                    statement = statement.where(Task.id.in_(ids))
+                elif paginate:
+                    if cursor:
+                        statement = keyset_filter(statement, Task.created_at, Task.id, cursor)
+                    # Fetch one extra row to find out whether another page exists
+                    statement = statement.limit(limit + 1)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
-        # Start with base query
-        query = Task.query
+        tasks = db.session.execute(statement).all()
         
-        # Apply filters
-        if status:
-            query = query.filter(Task.status == status)
-        if priority:
-            query = query.filter(Task.priority == priority)
+        next_cursor = None
+        missing = None
+        if ids is not None:
+            # Returned in the order the ids were asked for
+            found = {task.id: task for task in tasks}
+            tasks = [found[task_id] for task_id in ids if task_id in found]
+            missing = [task_id for task_id in ids if task_id not in found]
+        elif paginate and len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor(tasks[-1].created_at, tasks[-1].id)
+        
+        # Rows are plain column tuples; the JSON provider formats their datetimes
+        items = rows_to_dicts(tasks, fields)
+        
+        response = {
+            'success': True,
+            'tasks': items,
+            'count': len(items)
+        }
+        if paginate:
+            response['next_cursor'] = next_cursor
+        if missing is not None:
+            response['missing'] = missing
         
-        # Order by created_at desc
-        tasks = query.order_by(Task.created_at.desc()).all()
+        return jsonify(response), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@tasks_bp.route('/tasks/search', methods=['GET'])
+@response_cache.cached()
+def search_tasks():
+    """Full-text search over task titles, descriptions and comments"""
+    try:
+        text = request.args.get('q', '').strip()
+        if not text:
+            return jsonify({
+                'success': False,
+                'error': 'Query parameter q is required'
+            }), 400
+        
+        try:
+            limit = parse_limit(request.args.get('limit'), default=20)
+            offset = int(request.args.get('offset', 0))
+            if offset < 0:
+                raise ValueError('offset must not be negative')
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        # Rank matching ids in the search index, then load just that page of tasks
+        matches = search_task_ids(text, limit + 1, offset)
+        has_more = len(matches) > limit
+        matches = matches[:limit]
+        
+        tasks = Task.query.filter(Task.id.in_([task_id for task_id, _ in matches])).all()
+        tasks_by_id = {task.id: task for task in tasks}
+        
+        results = []
+        for task_id, score in matches:
+            if task_id in tasks_by_id:
+                task_dict = tasks_by_id[task_id].to_dict()
+                task_dict['score'] = score
+                results.append(task_dict)
         
         return jsonify({
             'success': True,
-            'tasks': [task.to_dict() for task in tasks],
-            'count': len(tasks)
+            'tasks': results,
+            'count': len(results),
+            'next_offset': offset + limit if has_more else None
         }), 200
         
     except Exception as e:
@@ -37,6 +177,108 @@ def get_tasks():
             'error': str(e)
         }), 500
 
+@tasks_bp.route('/tasks/due', methods=['GET'])
+@response_cache.cached()
+def get_due_tasks():
+    """Get tasks due in [after, before), soonest first, with optional per day or week counts"""
+    try:
+        try:
+            after = parse_instant(request.args['after'], 'after') if request.args.get('after') else None
+            before = parse_instant(request.args['before'], 'before') if request.args.get('before') else None
+            if after is not None and before is not None and after >= before:
+                raise ValueError('after must be earlier than before')
+            
+            bucket = request.args.get('bucket')
+            if bucket and bucket not in BUCKETS:
+                raise ValueError(f"bucket must be one of: {', '.join(BUCKETS)}")
+            
+            limit = parse_limit(request.args.get('limit'))
+            fields = parse_fields(request.args.get('fields'), Task.PROJECTABLE_FIELDS) or Task.PROJECTABLE_FIELDS
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        # Completed tasks are left out unless asked for, they are no longer due
+        include_completed = request.args.get('include_completed', 'false').lower() in ('1', 'true', 'yes')
+        
+        # Walk ix_tasks_due_date_status from the start of the range, soonest first
+        query = due_filter(project_tasks(fields, ('id', 'due_date')), after, before, include_completed)\
+            .order_by(Task.due_date, Task.id)
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                query = keyset_filter_ascending(query, Task.due_date, Task.id, cursor)
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+        
+        # Fetch one extra row to find out whether another page exists
+        tasks = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor(tasks[-1].due_date, tasks[-1].id)
+        
+        items = rows_to_dicts(tasks, fields)
+        response = {
+            'success': True,
+            'tasks': items,
+            'count': len(items),
+            'next_cursor': next_cursor
+        }
+        if bucket:
+            # Counts cover the whole range, not just this page
+            response['buckets'] = due_bucket_counts(bucket, after, before, include_completed)
+        
+        return jsonify(response), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@tasks_bp.route('/tasks/export', methods=['GET'])
+def export_tasks():
+    """Stream every task, optionally with its comments, as NDJSON or CSV"""
+    try:
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'error': f"Format must be one of: {', '.join(EXPORT_FORMATS)}"
+            }), 400
+        
+        include_comments = request.args.get('include_comments', 'false').lower() in ('1', 'true', 'yes')
+        records = iter_export_records(
+            status=request.args.get('status'),
+            priority=request.args.get('priority'),
+            include_comments=include_comments,
+            yield_per=current_app.config['EXPORT_YIELD_PER']
+        )
+        
+        if export_format == 'csv':
+            lines = csv_lines(records, include_comments)
+        else:
+            lines = ndjson_lines(records)
+        
+        # The generator keeps the request context, and with it the session, open while streaming
+        return Response(
+            stream_with_context(buffered(lines)),
+            mimetype=EXPORT_FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename=tasks.{export_format}'}
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @tasks_bp.route('/tasks', methods=['POST'])
 def create_task():
     """Create a new task"""
@@ -60,7 +302,7 @@ def create_task():
         # Parse due_date if provided
         if data.get('due_date'):
             try:
-                task.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
+                task.due_date = Task.parse_due_date(data['due_date'])
             except ValueError:
                 return jsonify({
                     'success': False,
@@ -79,11 +321,15 @@ def create_task():
         # Save to database
         db.session.add(task)
         db.session.commit()
+        task_stats.record_create(task.status, task.priority)
+        response_cache.invalidate()
+        task_dict = task.to_dict()
+        event_bus.publish('task.created', task_dict)
         
         return jsonify({
             'success': True,
             'message': 'Task created successfully',
-            'task': task.to_dict()
+            'task': task_dict
         }), 201
         
     except Exception as e:
@@ -93,26 +339,131 @@ def create_task():
             'error': str(e)
         }), 500
 
-@tasks_bp.route('/tasks/<int:task_id>', methods=['GET'])
-def get_task(task_id):
-    """Get a specific task by ID"""
+def prepare_task_row(data):
+    """Turn a bulk task item into an insertable row plus its validation errors"""
+    row = {
+        'title': data.get('title'),
+        'description': data.get('description', ''),
+        'status': data.get('status', 'pending'),
+        'priority': data.get('priority', 'medium'),
+        'due_date': None
+    }
+    errors = Task.validate_fields(row['title'], row['status'], row['priority'])
+    
+    if data.get('due_date'):
+        try:
+            row['due_date'] = Task.parse_due_date(data['due_date'])
+        except ValueError:
+            errors.append('Invalid due_date format. Use ISO format.')
+    
+    return row, errors
+
+def import_tasks(items, batch_size):
+    """Insert bulk task items in one transaction and publish the new tasks; returns (results, rows)"""
+    results, rows = bulk_insert(Task, items, prepare_task_row, batch_size)
+    
+    # All valid batches are written in one transaction
+    db.session.commit()
+    for row in rows:
+        task_stats.record_create(row['status'], row['priority'])
+    response_cache.invalidate()
+    if rows:
+        event_bus.publish('task.bulk_created', {'ids': [row['id'] for row in rows]})
+    return results, rows
+
+@job_queue.handler('tasks.bulk_create')
+def run_bulk_create_tasks(payload):
+    """Background half of a bulk import sent with Prefer: respond-async"""
+    results, rows = import_tasks(payload['items'], payload['batch_size'])
+    return {
+        'created': len(rows),
+        'failed': len(results) - len(rows),
+        'results': results
+    }
+
+@tasks_bp.route('/tasks/bulk', methods=['POST'])
+def bulk_create_tasks():
+    """Create many tasks from a JSON array or an NDJSON stream, as a background job with Prefer: respond-async"""
     try:
-        task = Task.query.get(task_id)
+        respond_async = prefers_async()
+        try:
+            batch_size = bulk_batch_size()
+            if respond_async:
+                # Only the body is read now; items are validated when the job runs
+                items = list(iter_bulk_items())
+            else:
+                results, rows = import_tasks(iter_bulk_items(), batch_size)
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
-        if not task:
+        if not (items if respond_async else results):
             return jsonify({
                 'success': False,
-                'error': 'Task not found'
-            }), 404
+                'error': 'No data provided'
+            }), 400
         
-        # Get task with comments
-        task_dict = task.to_dict()
-        task_dict['comments'] = [comment.to_dict() for comment in task.comments]
+        if respond_async:
+            job = job_queue.enqueue('tasks.bulk_create', {'items': items, 'batch_size': batch_size})
+            return job_accepted(job, 'Bulk import queued')
         
+        status_code = bulk_response_status(results)
         return jsonify({
+            'success': status_code == 201,
+            'created': len(rows),
+            'failed': len(results) - len(rows),
+            'results': results
+        }), status_code
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@tasks_bp.route('/tasks/<int:task_id>', methods=['GET'])
+@response_cache.cached()
+def get_task(task_id):
+    """Get a specific task by ID with its comments, or only the newest N with embed=comments:N"""
+    try:
+        try:
+            embed = parse_embed(request.args.get('embed'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        # The task row and its comment page come back from one query
+        rows = db.session.execute(task_with_comments_statement(task_id, embed)).all()
+        task_dict, comments, next_cursor = split_task_with_comments(rows, embed)
+        
+        if task_dict is None:
+            # Archived tasks keep answering on their id, read only
+            rows = db.session.execute(task_with_comments_statement(task_id, embed, archived=True)).all()
+            task_dict, comments, next_cursor = split_task_with_comments(rows, embed)
+            if task_dict is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Task not found'
+                }), 404
+            task_dict['archived'] = True
+        
+        response = {
             'success': True,
             'task': task_dict
-        }), 200
+        }
+        if embed != 0:
+            task_dict['comments'] = comments
+        if embed:
+            # Older comments continue at GET /api/tasks/<id>/comments?cursor=
+            response['comments_next_cursor'] = next_cursor
+        
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({
@@ -139,6 +490,8 @@ def update_task(task_id):
                 'error': 'No data provided'
             }), 400
         
+        old_status, old_priority = task.status, task.priority
+        
         # Update fields
         if 'title' in data:
             task.title = data['title']
@@ -151,7 +504,7 @@ def update_task(task_id):
         if 'due_date' in data:
             if data['due_date']:
                 try:
-                    task.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
+                    task.due_date = Task.parse_due_date(data['due_date'])
                 except ValueError:
                     return jsonify({
                         'success': False,
@@ -172,13 +525,21 @@ def update_task(task_id):
         # Update timestamp
         task.updated_at = datetime.utcnow()
         
-        # Save changes
-        db.session.commit()
+        # Save changes; the version check fails when another write landed since the task was read
+        try:
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            return version_conflict(task_id)
+        task_stats.record_update(old_status, old_priority, task.status, task.priority)
+        response_cache.invalidate(task_id)
+        task_dict = task.to_dict()
+        event_bus.publish('task.updated', task_dict)
         
         return jsonify({
             'success': True,
             'message': 'Task updated successfully',
-            'task': task.to_dict()
+            'task': task_dict
         }), 200
         
     except Exception as e:
@@ -188,22 +549,168 @@ def update_task(task_id):
             'error': str(e)
         }), 500
 
+def version_conflict(task_id):
+    """409 naming the current version after a concurrent write won, or 404 if it was a delete"""
+    current_version = db.session.query(Task.version).filter(Task.id == task_id).scalar()
+    if current_version is None:
+        return jsonify({
+            'success': False,
+            'error': 'Task not found'
+        }), 404
+    response = jsonify({
+        'success': False,
+        'error': 'Task was modified by another request; reload it and retry',
+        'current_version': current_version
+    })
+    response.status_code = 409
+    response.set_etag(version_etag(current_version))
+    return response
+
+@tasks_bp.route('/tasks/<int:task_id>', methods=['PATCH'])
+def patch_task(task_id):
+    """Partially update a task with a single UPDATE, guarded by If-Match when given"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'No data provided'
+            }), 400
+        
+        changes = {name: data[name] for name in Task.PATCHABLE_FIELDS if name in data}
+        if not changes:
+            return jsonify({
+                'success': False,
+                'error': f"No updatable fields provided. Allowed: {', '.join(Task.PATCHABLE_FIELDS)}"
+            }), 400
+        
+        # Validate only the fields being changed, the stored row is never loaded
+        validation_errors = Task.validate_changes(changes)
+        if validation_errors:
+            return jsonify({
+                'success': False,
+                'error': 'Validation failed',
+                'validation_errors': validation_errors
+            }), 400
+        
+        if changes.get('due_date'):
+            try:
+                changes['due_date'] = Task.parse_due_date(changes['due_date'])
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid due_date format. Use ISO format.'
+                }), 400
+        elif 'due_date' in changes:
+            changes['due_date'] = None
+        
+        # Compare and set in one statement: the version condition replaces a prior SELECT
+        updated_at = datetime.utcnow()
+        statement = db.update(Task).where(Task.id == task_id).values(
+            **changes,
+            version=Task.version + 1,
+            updated_at=updated_at
+        )
+        versions = if_match_versions()
+        if versions is not None:
+            statement = statement.where(Task.version.in_(versions))
+        
+        # comments_count is left out: RETURNING drops the table name from its
+        # correlated subquery, which then compares against comments.id instead
+        minimal = prefers_minimal()
+        fields = ['version'] if minimal else [name for name in Task.PROJECTABLE_FIELDS if name != 'comments_count']
+        row = db.session.execute(statement.returning(*[getattr(Task, name) for name in fields])).first()
+        
+        if row is None:
+            db.session.rollback()
+            current_version = db.session.query(Task.version).filter(Task.id == task_id).scalar()
+            if current_version is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Task not found'
+                }), 404
+            response = jsonify({
+                'success': False,
+                'error': 'Task has been modified since the given version',
+                'current_version': current_version
+            })
+            response.status_code = 412
+            response.set_etag(version_etag(current_version))
+            return response
+        
+        db.session.commit()
+        if 'status' in changes or 'priority' in changes:
+            # The previous status and priority were never read, so rebuild the counts on the next read
+            task_stats.invalidate()
+        response_cache.invalidate(task_id)
+        
+        if minimal:
+            # Subscribers merge the changed fields into their copy of the task
+            event_bus.publish('task.updated', {'id': task_id, **changes, 'updated_at': updated_at, 'version': row.version})
+            response = current_app.response_class(status=204)
+            response.headers['Preference-Applied'] = 'return=minimal'
+        else:
+            task_dict = rows_to_dicts([row], fields)[0]
+            task_dict['comments_count'] = db.session.query(Task.comments_count).filter(Task.id == task_id).scalar()
+            event_bus.publish('task.updated', task_dict)
+            response = jsonify({
+                'success': True,
+                'message': 'Task updated successfully',
+                'task': task_dict
+            })
+        response.set_etag(version_etag(row.version))
+        return response
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def remove_task(task_id):
+    """Delete a task and its comments with one statement; returns False when it did not exist"""
+    # The database deletes the comments (migration 0006), so none of them are loaded
+    row = db.session.execute(
+        db.delete(Task).where(Task.id == task_id).returning(Task.status, Task.priority)
+    ).first()
+    if row is None:
+        db.session.rollback()
+        return False
+    
+    db.session.commit()
+    task_stats.record_delete(row.status, row.priority)
+    response_cache.invalidate(task_id, removed=True)
+    event_bus.publish('task.deleted', {'id': task_id})
+    return True
+
+@job_queue.handler('tasks.delete')
+def run_delete_task(payload):
+    """Background half of a task delete sent with Prefer: respond-async"""
+    if not remove_task(payload['id']):
+        raise LookupError('Task not found')
+    return {'id': payload['id']}
+
 @tasks_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
 def delete_task(task_id):
-    """Delete a specific task"""
+    """Delete a specific task, as a background job with Prefer: respond-async"""
     try:
-        task = Task.query.get(task_id)
+        if prefers_async():
+            if not db.session.scalar(Task.exists_query(task_id)):
+                return jsonify({
+                    'success': False,
+                    'error': 'Task not found'
+                }), 404
+            
+            job = job_queue.enqueue('tasks.delete', {'id': task_id})
+            return job_accepted(job, 'Task deletion queued')
         
-        if not task:
+        if not remove_task(task_id):
             return jsonify({
                 'success': False,
                 'error': 'Task not found'
             }), 404
         
-        # Delete task (comments will be deleted due to cascade)
-        db.session.delete(task)
-        db.session.commit()
-        
         return jsonify({
             'success': True,
             'message': 'Task deleted successfully'
@@ -216,34 +723,51 @@ def delete_task(task_id):
             'error': str(e)
         }), 500
 
+@tasks_bp.route('/tasks/archive', methods=['POST'])
+def archive_tasks():
+    """Move tasks completed more than after_days ago to the archive, as a background job with Prefer: respond-async"""
+    try:
+        try:
+            options = parse_archive_options(request.get_json(silent=True) or {})
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        if prefers_async():
+            job = job_queue.enqueue('tasks.archive', options)
+            return job_accepted(job, 'Archiving queued')
+        
+        result = archive_completed_tasks(options['after_days'], options['batch_size'])
+        return jsonify({
+            'success': True,
+            **result
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @tasks_bp.route('/tasks/stats', methods=['GET'])
+@response_cache.cached()
 def get_task_stats():
-    """Get task statistics"""
+    """Get task statistics from the materialized stats view"""
     try:
-        total_tasks = Task.query.count()
-        pending_tasks = Task.query.filter(Task.status == 'pending').count()
-        in_progress_tasks = Task.query.filter(Task.status == 'in_progress').count()
-        completed_tasks = Task.query.filter(Task.status == 'completed').count()
-        
-        high_priority_tasks = Task.query.filter(Task.priority == 'high').count()
-        medium_priority_tasks = Task.query.filter(Task.priority == 'medium').count()
-        low_priority_tasks = Task.query.filter(Task.priority == 'low').count()
+        breakdowns = [name.strip() for name in request.args.get('breakdown', '').split(',') if name.strip()]
+        unknown = [name for name in breakdowns if name not in task_stats.BREAKDOWNS]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown breakdown: {', '.join(unknown)}. Allowed: {', '.join(task_stats.BREAKDOWNS)}"
+            }), 400
         
         return jsonify({
             'success': True,
-            'stats': {
-                'total_tasks': total_tasks,
-                'by_status': {
-                    'pending': pending_tasks,
-                    'in_progress': in_progress_tasks,
-                    'completed': completed_tasks
-                },
-                'by_priority': {
-                    'high': high_priority_tasks,
-                    'medium': medium_priority_tasks,
-                    'low': low_priority_tasks
-                }
-            }
+            'stats': task_stats.summary(breakdowns)
         }), 200
         
     except Exception as e:
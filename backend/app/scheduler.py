@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+
+
+class Scheduler:
+    """Runs registered functions periodically on one background thread per process
+
+    Meant for cheap refreshes of per-process state, such as the overdue
+    counts, so requests read a precomputed value instead of querying. Work
+    that has to run exactly once across processes belongs in the job queue.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.entries = []
+        self._thread_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.entries = []
+        # Threads don't survive a fork, so each process starts its own on its first request
+        app.before_request(self.start)
+
+    def every(self, interval, function):
+        """Run function(), inside an app context, every interval seconds; 0 disables it"""
+        if interval:
+            self.entries.append({'interval': interval, 'function': function, 'next_run': 0.0})
+
+    def start(self):
+        """Start the scheduler thread once per process, forked workers included"""
+        if not self.entries:
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+
+        threading.Thread(target=self._run, name='scheduler', daemon=True).start()
+
+    def run_pending(self):
+        """Run every entry that is due and return the seconds until the next one"""
+        now = time.monotonic()
+        for entry in self.entries:
+            if entry['next_run'] > now:
+                continue
+            entry['next_run'] = now + entry['interval']
+            with self.app.app_context():
+                try:
+                    entry['function']()
+                except Exception:
+                    self.app.logger.exception('Scheduled %s failed', entry['function'].__qualname__)
+        return max(0.0, min(entry['next_run'] for entry in self.entries) - time.monotonic())
+
+    def _run(self):
+        while True:
+            time.sleep(self.run_pending())
+
+
+scheduler = Scheduler()
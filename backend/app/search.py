@@ -0,0 +1,64 @@
+import re
+
+import sqlalchemy as sa
+
+from app import db
+
+SEARCH_TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Ranked task ids matching either the task text or any of its comments.
+# bm25() returns lower scores for better matches, title hits weigh the most.
+SQLITE_SEARCH = sa.text("""
+    SELECT task_id, MIN(score) AS score FROM (
+        SELECT rowid AS task_id, bm25(tasks_fts, 10.0, 2.0) AS score
+        FROM tasks_fts WHERE tasks_fts MATCH :query
+        UNION ALL
+        SELECT comments.task_id AS task_id, bm25(comments_fts) AS score
+        FROM comments_fts JOIN comments ON comments.id = comments_fts.rowid
+        WHERE comments_fts MATCH :query
+    )
+    GROUP BY task_id
+    ORDER BY score, task_id
+    LIMIT :limit OFFSET :offset
+""")
+
+# ts_rank returns higher scores for better matches, negate it so both backends sort ascending
+POSTGRESQL_SEARCH = sa.text("""
+    SELECT task_id, MIN(score) AS score FROM (
+        SELECT id AS task_id, -ts_rank(search_vector, websearch_to_tsquery('english', :query)) AS score
+        FROM tasks WHERE search_vector @@ websearch_to_tsquery('english', :query)
+        UNION ALL
+        SELECT task_id, -0.5 * ts_rank(search_vector, websearch_to_tsquery('english', :query)) AS score
+        FROM comments WHERE search_vector @@ websearch_to_tsquery('english', :query)
+    ) matches
+    GROUP BY task_id
+    ORDER BY score, task_id
+    LIMIT :limit OFFSET :offset
+""")
+
+
+def fts5_query(text):
+    """Turn free text into a safe FTS5 query: every term must match, the last one as a prefix"""
+    terms = SEARCH_TERM_PATTERN.findall(text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def search_task_ids(text, limit, offset=0):
+    """Return [(task_id, score)] ranked best first for a free text query"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        query, statement = fts5_query(text), SQLITE_SEARCH
+    elif dialect == 'postgresql':
+        query, statement = text.strip(), POSTGRESQL_SEARCH
+    else:
+        raise RuntimeError(f'Full-text search is not supported on {dialect}')
+
+    if not query:
+        return []
+
+    rows = db.session.execute(statement, {'query': query, 'limit': limit, 'offset': offset})
+    return [(row.task_id, row.score) for row in rows]
@@ -0,0 +1,134 @@
+from datetime import date, datetime, timezone
+
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+from app.batch import is_subrequest
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+# Lists of objects sent as {"columns": [...], "rows": [[...], ...]}, see to_columnar
+COLUMNAR_MIMETYPE = 'application/vnd.task-api.columnar+json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+# Blueprints whose responses follow the Accept header; the rest always answer JSON
+NEGOTIATED_BLUEPRINTS = {'tasks', 'comments'}
+NESTED_TYPES = (dict, list)
+
+
+def is_negotiated():
+    """True when the current request's response format follows its Accept header"""
+    # Batch sub-responses are read back as JSON by the batch endpoint
+    return has_request_context() and request.blueprint in NEGOTIATED_BLUEPRINTS and not is_subrequest()
+
+
+def response_mimetype():
+    """Pick the response format from the Accept header, JSON unless the client prefers another"""
+    if not is_negotiated():
+        return JSON_MIMETYPE
+    offers = [JSON_MIMETYPE, COLUMNAR_MIMETYPE]
+    if msgpack is not None:
+        offers.append(MSGPACK_MIMETYPE)
+    return request.accept_mimetypes.best_match(offers, default=JSON_MIMETYPE)
+
+
+def vary_on_accept(response):
+    """Mark a response of a negotiated endpoint as depending on the Accept header"""
+    if is_negotiated():
+        response.vary.add('Accept')
+    return response
+
+
+def to_columnar(value):
+    """Rewrite every list of objects sharing the same keys as {'columns': [...], 'rows': [[...], ...]}"""
+    if isinstance(value, dict):
+        return {key: to_columnar(item) if isinstance(item, NESTED_TYPES) else item for key, item in value.items()}
+    if not isinstance(value, list):
+        return value
+
+    if value and all(isinstance(item, dict) for item in value):
+        columns = list(value[0])
+        if all(list(item) == columns for item in value):
+            return {
+                'columns': columns,
+                'rows': [
+                    [to_columnar(cell) if isinstance(cell, NESTED_TYPES) else cell for cell in item.values()]
+                    for item in value
+                ]
+            }
+    return [to_columnar(item) if isinstance(item, NESTED_TYPES) else item for item in value]
+
+
+def msgpack_default(o):
+    """Encode datetimes as MessagePack timestamps; stored datetimes are naive UTC"""
+    if isinstance(o, datetime):
+        return msgpack.Timestamp.from_datetime(o if o.tzinfo else o.replace(tzinfo=timezone.utc))
+    return FastJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson when it is installed
+
+    Falls back to the stdlib encoder otherwise. Both paths render datetimes
+    as ISO 8601 strings, so views can hand over raw column values instead
+    of calling isoformat() on every row. Responses of the negotiated
+    endpoints are encoded as columnar JSON or MessagePack instead when the
+    client's Accept header prefers them.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_options(self, kwargs):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options(kwargs)).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        mimetype = response_mimetype()
+        if mimetype == JSON_MIMETYPE and orjson is None:
+            return vary_on_accept(super().response(*args, **kwargs))
+
+        obj = self._prepare_response_obj(args, kwargs)
+        if mimetype == MSGPACK_MIMETYPE:
+            body = msgpack.packb(obj, default=msgpack_default)
+            return vary_on_accept(self._app.response_class(body, mimetype=mimetype))
+        if mimetype == COLUMNAR_MIMETYPE:
+            obj = to_columnar(obj)
+        if orjson is None:
+            return vary_on_accept(self._app.response_class(f'{self.dumps(obj)}\n', mimetype=mimetype))
+
+        # Encode straight to bytes, skipping the str round trip of the default provider
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_options({'indent': indent}))
+        return vary_on_accept(self._app.response_class(body + b'\n', mimetype=mimetype))
+
+
+def rows_to_dicts(rows, fields):
+    """Build response dicts straight from Row tuples for the requested fields"""
+    if not rows:
+        return []
+    keys = list(rows[0]._fields)
+    if keys == list(fields):
+        return [dict(zip(keys, row)) for row in rows]
+    indexes = [keys.index(field) for field in fields]
+    return [{field: row[index] for field, index in zip(fields, indexes)} for row in rows]
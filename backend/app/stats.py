@@ -0,0 +1,169 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.task import Task
+from app.models.archive import ArchiveCounter
+from app.due import due_filter
+
+
+class TaskStats:
+    """In-process materialized view of task counts keyed by (status, priority)
+
+    The counter table is built from a single GROUP BY query and then kept up
+    to date incrementally by the task routes. Each worker process holds its
+    own copy, so the view is also rebuilt once it is older than the refresh
+    interval to pick up writes made by other workers. Archived tasks are
+    counted from archive_counters, read by the same statement, so totals
+    stay the same when the archiver moves tasks out of the hot table.
+
+    The overdue breakdown depends on the clock as well as on writes, so it is
+    recomputed by the scheduler every overdue refresh interval instead, and
+    read requests get that snapshot.
+    """
+
+    BREAKDOWNS = ['matrix', 'overdue']
+
+    def __init__(self, refresh_interval=30, overdue_refresh_interval=60):
+        self.refresh_interval = refresh_interval
+        self.overdue_refresh_interval = overdue_refresh_interval
+        self._lock = threading.Lock()
+        self._counts = None
+        self._archived = {}
+        self._loaded_at = 0.0
+        self._overdue = None
+        self._overdue_loaded_at = 0.0
+
+    def init_app(self, app):
+        self.refresh_interval = app.config.get('STATS_REFRESH_INTERVAL', self.refresh_interval)
+        self.overdue_refresh_interval = app.config.get('OVERDUE_REFRESH_INTERVAL', self.overdue_refresh_interval)
+        self.invalidate()
+        with self._lock:
+            self._overdue = None
+
+    def invalidate(self):
+        """Drop the materialized counts so the next read rebuilds them"""
+        with self._lock:
+            self._counts = None
+
+    def grouped_counts_query(self):
+        """Query counting tasks per (status, priority) pair"""
+        return db.session.query(Task.status, Task.priority, db.func.count(Task.id))\
+                         .group_by(Task.status, Task.priority)
+
+    def archived_counts_query(self):
+        """Query the pre-aggregated (status, priority) counts of archived tasks"""
+        return db.session.query(ArchiveCounter.status, ArchiveCounter.priority, ArchiveCounter.count)
+
+    def load(self):
+        """Rebuild the counter tables with one query over the hot GROUP BY and the archive counters"""
+        hot = self.grouped_counts_query().add_columns(db.literal(False, db.Boolean))
+        rows = hot.union_all(self.archived_counts_query().add_columns(db.literal(True, db.Boolean))).all()
+        counts = {(status, priority): count for status, priority, count, archived in rows if not archived}
+        archived_counts = {(status, priority): count for status, priority, count, archived in rows if archived and count}
+
+        with self._lock:
+            self._counts = counts
+            self._archived = archived_counts
+            self._loaded_at = time.monotonic()
+        return counts, archived_counts
+
+    def counts(self):
+        """Return the hot and archived (status, priority) counter tables, rebuilding them when stale"""
+        with self._lock:
+            counts = self._counts
+            archived_counts = self._archived
+            fresh = counts is not None and (
+                not self.refresh_interval or
+                time.monotonic() - self._loaded_at < self.refresh_interval
+            )
+        if not fresh:
+            counts, archived_counts = self.load()
+        return dict(counts), dict(archived_counts)
+
+    def _adjust(self, status, priority, delta):
+        with self._lock:
+            if self._counts is None:
+                return
+            key = (status, priority)
+            self._counts[key] = self._counts.get(key, 0) + delta
+            if self._counts[key] <= 0:
+                del self._counts[key]
+
+    def record_create(self, status, priority):
+        self._adjust(status, priority, 1)
+
+    def record_update(self, old_status, old_priority, status, priority):
+        if (old_status, old_priority) != (status, priority):
+            self._adjust(old_status, old_priority, -1)
+            self._adjust(status, priority, 1)
+
+    def record_delete(self, status, priority):
+        self._adjust(status, priority, -1)
+
+    def summary(self, breakdowns=()):
+        """Build the stats payload, optionally including extra breakdowns"""
+        counts, archived_counts = self.counts()
+        for key, count in archived_counts.items():
+            counts[key] = counts.get(key, 0) + count
+        by_status = {status: 0 for status in Task.STATUSES}
+        by_priority = {priority: 0 for priority in Task.PRIORITIES}
+        for (status, priority), count in counts.items():
+            by_status[status] = by_status.get(status, 0) + count
+            by_priority[priority] = by_priority.get(priority, 0) + count
+
+        stats = {
+            'total_tasks': sum(counts.values()),
+            'archived_tasks': sum(archived_counts.values()),
+            'by_status': by_status,
+            'by_priority': by_priority
+        }
+
+        if 'matrix' in breakdowns:
+            stats['matrix'] = {
+                status: {priority: counts.get((status, priority), 0) for priority in Task.PRIORITIES}
+                for status in by_status
+            }
+
+        if 'overdue' in breakdowns:
+            stats['overdue'] = self.overdue()
+
+        return stats
+
+    def overdue_counts(self, now=None):
+        """Count open tasks past their due date by priority, plus those due within a week"""
+        now = now or datetime.utcnow()
+        rows = due_filter(db.session.query(Task.priority, db.func.count(Task.id)), before=now)\
+            .group_by(Task.priority).all()
+        by_priority = {priority: 0 for priority in Task.PRIORITIES}
+        by_priority.update(dict(rows))
+        due_soon = due_filter(db.session.query(db.func.count(Task.id)), now, now + timedelta(days=7)).scalar()
+        return {
+            'total': sum(by_priority.values()),
+            'by_priority': by_priority,
+            'due_within_week': due_soon,
+            'computed_at': now.isoformat()
+        }
+
+    def refresh_overdue(self):
+        """Recompute the overdue snapshot; the scheduler calls this periodically"""
+        overdue = self.overdue_counts()
+        with self._lock:
+            self._overdue = overdue
+            self._overdue_loaded_at = time.monotonic()
+        return overdue
+
+    def overdue(self):
+        """Return the overdue snapshot, computing it here only when the scheduler has fallen behind"""
+        with self._lock:
+            overdue = self._overdue
+            fresh = overdue is not None and self.overdue_refresh_interval and (
+                time.monotonic() - self._overdue_loaded_at < 2 * self.overdue_refresh_interval
+            )
+        if fresh:
+            return dict(overdue)
+        return dict(self.refresh_overdue())
+
+
+task_stats = TaskStats()
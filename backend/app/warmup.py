@@ -0,0 +1,44 @@
+"""Pre-fork warm up: compile the hot statements once so forked workers inherit them"""
+import sqlalchemy as sa
+
+from app import db
+from app.models.task import Task
+from app.stats import task_stats
+
+
+def warm_up_queries():
+    """Return the hot statements in the shape the routes issue them; none match a row"""
+    from app.routes.tasks import build_task_query
+    from app.comment_pages import comment_page_statement, task_with_comments_statement
+
+    fields = Task.PROJECTABLE_FIELDS
+    return {
+        'tasks.list': build_task_query(fields=fields).limit(1),
+        'tasks.list_by_status': build_task_query('pending', fields=fields).limit(1),
+        'tasks.list_by_priority': build_task_query(priority='high', fields=fields).limit(1),
+        'tasks.list_by_status_priority': build_task_query('pending', 'high', fields=fields).limit(1),
+        'tasks.get': task_with_comments_statement(0),
+        'tasks.get_embed': task_with_comments_statement(0, 20),
+        'comments.list_by_task': comment_page_statement(0),
+        'comments.page': comment_page_statement(0, 20),
+    }
+
+
+def warm_up():
+    """Fill the compiled statement cache and stats table, then close the connections before forking"""
+    sa.orm.configure_mappers()
+    try:
+        queries = warm_up_queries()
+        # Twice: the first compile of the comments_count subquery settles its ORM
+        # compile options, which changes the cache key every later request uses
+        for _ in range(2):
+            for query in queries.values():
+                if isinstance(query, sa.Select):
+                    db.session.execute(query).all()
+                else:
+                    query.all()
+        task_stats.load()
+    finally:
+        db.session.remove()
+        db.engine.dispose()
+    return list(queries)
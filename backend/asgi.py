@@ -0,0 +1,28 @@
+import os
+from app import create_app
+from app.asgi import create_asgi_app
+
+# The Flask app resolves the configuration and owns the schema migrations
+flask_app = create_app()
+
+# Bring the database schema up to date before serving, like run.py
+with flask_app.app_context():
+    try:
+        from app import migrations
+        applied = migrations.upgrade()
+        if applied:
+            print(f"Applied database migrations: {', '.join(applied)}")
+        else:
+            print("Database schema is up to date")
+    except Exception as e:
+        print(f"Error applying database migrations: {e}")
+
+# Async ASGI app serving the task and comment routes
+app = create_asgi_app(flask_app)
+
+if __name__ == '__main__':
+    # Development server (only when run directly)
+    import uvicorn
+    print("Starting ASGI development server...")
+    port = int(os.getenv('PORT', 5000))
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,54 @@
+"""Compare two benchmark reports produced by endpoints.py or load.py
+
+    python benchmarks/compare.py before.json after.json
+
+Prints one line per scenario and metric with the relative change, so
+regressions between commits stand out.
+"""
+import argparse
+import json
+
+METRICS = ['p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'queries_per_request']
+
+
+def scenario_table(report):
+    if 'scenarios' in report:
+        return report['scenarios']
+    table = dict(report.get('routes', {}))
+    if 'overall' in report:
+        table['overall'] = report['overall']
+    return table
+
+
+def compare(before, after):
+    """Yield (scenario, metric, before, after, change percent) rows"""
+    before_table, after_table = scenario_table(before), scenario_table(after)
+    for scenario in sorted(set(before_table) & set(after_table)):
+        for metric in METRICS:
+            old = before_table[scenario].get(metric)
+            new = after_table[scenario].get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else None
+            yield scenario, metric, old, new, change
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"{before.get('revision')} -> {after.get('revision')}")
+    for scenario, metric, old, new, change in compare(before, after):
+        change_text = f'{change:+.1f}%' if change is not None else 'n/a'
+        print(f'{scenario:32} {metric:20} {old:>12} {new:>12} {change_text:>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""In-process micro-benchmark of every API endpoint through the Flask test client
+
+    python benchmarks/endpoints.py --tasks 20000 --comments 3 --iterations 200 --output before.json
+
+Each scenario is run for a number of iterations against a freshly seeded
+SQLite database. The report contains p50/p95/p99 latency, throughput and SQL
+statements per request for each scenario. The response cache is disabled
+unless --cache is given, so the numbers reflect the database path.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from common import report_metadata, summarize
+from seed import create_app_for, seed
+
+SEARCH_TERMS = ['login', 'cache', 'database migration', 'deploy', 'sch']
+
+
+def scenarios(rng, task_ids, comment_ids, created_ids):
+    """(name, method, path builder, body builder) for every endpoint"""
+    def task_id():
+        return rng.choice(task_ids)
+
+    def new_task():
+        return {'title': f'benchmark task {rng.random()}', 'priority': rng.choice(['low', 'medium', 'high'])}
+
+    return [
+        ('tasks.list_page', 'GET', lambda: '/api/tasks?limit=50', None),
+        ('tasks.list_page_filtered', 'GET', lambda: '/api/tasks?limit=50&status=pending&priority=high', None),
+        ('tasks.list_page_projected', 'GET', lambda: '/api/tasks?limit=50&fields=id,title,status', None),
+        ('tasks.list_all', 'GET', lambda: '/api/tasks', None),
+        ('tasks.detail', 'GET', lambda: f'/api/tasks/{task_id()}', None),
+        ('tasks.stats', 'GET', lambda: '/api/tasks/stats', None),
+        ('tasks.stats_breakdowns', 'GET', lambda: '/api/tasks/stats?breakdown=matrix,overdue', None),
+        ('tasks.search', 'GET', lambda: f'/api/tasks/search?q={rng.choice(SEARCH_TERMS)}', None),
+        ('tasks.export', 'GET', lambda: '/api/tasks/export?status=completed&priority=low', None),
+        ('comments.list', 'GET', lambda: f'/api/tasks/{task_id()}/comments', None),
+        ('comments.detail', 'GET', lambda: f'/api/comments/{rng.choice(comment_ids)}', None),
+        ('tasks.create', 'POST', lambda: '/api/tasks', new_task),
+        ('tasks.bulk_create', 'POST', lambda: '/api/tasks/bulk', lambda: [new_task() for _ in range(100)]),
+        ('tasks.update', 'PUT', lambda: f'/api/tasks/{task_id()}', lambda: {'status': rng.choice(['pending', 'in_progress', 'completed'])}),
+        ('comments.create', 'POST', lambda: f'/api/tasks/{task_id()}/comments', lambda: {'content': 'benchmark comment'}),
+        ('comments.update', 'PUT', lambda: f'/api/comments/{rng.choice(comment_ids)}', lambda: {'content': 'edited comment'}),
+        ('tasks.delete', 'DELETE', lambda: f'/api/tasks/{created_ids.pop()}' if created_ids else None, None),
+    ]
+
+
+def run(app, iterations, only=None, random_seed=7):
+    from sqlalchemy import event
+    from app import db
+    from app.models.task import Task
+    from app.models.comment import Comment
+
+    rng = random.Random(random_seed)
+    with app.app_context():
+        task_ids = [row[0] for row in db.session.query(Task.id)]
+        comment_ids = [row[0] for row in db.session.query(Comment.id)] or [0]
+        engine = db.engine
+
+    statements = [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    event.listen(engine, 'before_cursor_execute', count_statement)
+
+    client = app.test_client()
+    created_ids = []
+    results = {}
+    for name, method, path, body in scenarios(rng, task_ids, comment_ids, created_ids):
+        if only and name not in only:
+            continue
+
+        latencies, queries, errors = [], [], 0
+        started = time.perf_counter()
+        for _ in range(iterations):
+            url = path()
+            if url is None:
+                break
+            payload = body() if body else None
+            statements[0] = 0
+            request_started = time.perf_counter()
+            response = client.open(url, method=method, json=payload)
+            response.get_data()
+            latencies.append(time.perf_counter() - request_started)
+            queries.append(statements[0])
+            if response.status_code >= 400:
+                errors += 1
+            elif name == 'tasks.create':
+                created_ids.append(response.get_json()['task']['id'])
+        elapsed = time.perf_counter() - started
+
+        results[name] = summarize(latencies, elapsed, queries)
+        results[name]['errors'] = errors
+
+    event.remove(engine, 'before_cursor_execute', count_statement)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--comments', type=float, default=3, help='mean comments per task')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', help='comma separated scenario names')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache enabled')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app_for(database, CACHE_BACKEND='memory' if args.cache else 'none')
+    dataset = seed(app, args.tasks, args.comments, args.seed)
+
+    report = report_metadata(
+        benchmark='endpoints', iterations=args.iterations, cache=args.cache, dataset=dataset)
+    report['scenarios'] = run(app, args.iterations, args.only.split(',') if args.only else None)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Concurrent load test against a local gunicorn serving run:app
+
+    python benchmarks/load.py --tasks 20000 --workers 4 --concurrency 32 --duration 30 --output load.json
+
+Seeds a SQLite database, starts gunicorn on a free local port, then keeps
+--concurrency keep-alive clients busy with a read-heavy request mix for
+--duration seconds. Reports overall and per-route latency percentiles and
+throughput as JSON.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from common import BACKEND_DIR, report_metadata, summarize
+from seed import create_app_for, seed
+
+
+def request_mix(rng, max_task_id):
+    """(weight, route name, method, path builder, body builder); reads outnumber writes about 50:1"""
+    def task_id():
+        return rng.randint(1, max_task_id)
+
+    return [
+        (30, 'tasks.list_page', 'GET', lambda: '/api/tasks?limit=50', None),
+        (10, 'tasks.list_filtered', 'GET', lambda: '/api/tasks?limit=50&status=pending', None),
+        (25, 'tasks.detail', 'GET', lambda: f'/api/tasks/{task_id()}', None),
+        (15, 'comments.list', 'GET', lambda: f'/api/tasks/{task_id()}/comments', None),
+        (12, 'tasks.stats', 'GET', lambda: '/api/tasks/stats', None),
+        (6, 'tasks.search', 'GET', lambda: '/api/tasks/search?q=cache', None),
+        (1, 'tasks.create', 'POST', lambda: '/api/tasks', lambda: {'title': 'load test task'}),
+        (1, 'comments.create', 'POST', lambda: f'/api/tasks/{task_id()}/comments', lambda: {'content': 'load test'}),
+    ]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(database, port, workers, env_overrides):
+    env = dict(os.environ)
+    env.update(env_overrides)
+    env['DATABASE_URL'] = f'sqlite:///{database}'
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers), 'run:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/tasks/stats')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('gunicorn did not become ready within 30 seconds')
+
+
+def client_loop(port, mix, rng, stop_at, samples, lock):
+    weights = [entry[0] for entry in mix]
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    local = []
+    while time.perf_counter() < stop_at:
+        _, name, method, path, body = rng.choices(mix, weights)[0]
+        payload = json.dumps(body()) if body else None
+        headers = {'Content-Type': 'application/json'} if payload else {}
+        started = time.perf_counter()
+        try:
+            connection.request(method, path(), body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            ok = False
+        local.append((name, time.perf_counter() - started, ok))
+    with lock:
+        samples.extend(local)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--comments', type=float, default=3, help='mean comments per task')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent client connections')
+    parser.add_argument('--duration', type=float, default=20, help='seconds of load per run')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                        help='extra environment for the server, e.g. CACHE_BACKEND=none')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    env_overrides = dict(item.split('=', 1) for item in args.env)
+    database = os.path.join(tempfile.mkdtemp(), 'load.db')
+    dataset = seed(create_app_for(database), args.tasks, args.comments, args.seed)
+
+    port = free_port()
+    server = start_gunicorn(database, port, args.workers, env_overrides)
+    try:
+        samples, lock = [], threading.Lock()
+        stop_at = time.perf_counter() + args.duration
+        threads = [
+            threading.Thread(target=client_loop, args=(
+                port, request_mix(random.Random(args.seed + i), args.tasks), random.Random(args.seed + i),
+                stop_at, samples, lock))
+            for i in range(args.concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    report = report_metadata(
+        benchmark='load', workers=args.workers, concurrency=args.concurrency,
+        duration=args.duration, env=env_overrides, dataset=dataset)
+    report['overall'] = summarize([latency for _, latency, _ in samples], elapsed)
+    report['overall']['errors'] = sum(1 for _, _, ok in samples if not ok)
+    report['routes'] = {}
+    for name in sorted({name for name, _, _ in samples}):
+        route_samples = [(latency, ok) for route, latency, ok in samples if route == name]
+        report['routes'][name] = summarize([latency for latency, _ in route_samples], elapsed)
+        report['routes'][name]['errors'] = sum(1 for _, ok in route_samples if not ok)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Read replica routing check against two local SQLite files
+
+    python benchmarks/replicas.py
+
+Creates a primary and a replica database, copies the primary into the
+replica with the SQLite backup API (standing in for streaming replication),
+and walks through the routing cases, reading which database served each
+request from the Server-Timing header: GETs go to the replica, writes to
+the primary, a lagging or broken replica falls back to the primary, and
+endpoints outside the tasks and comments blueprints never use it. Exits
+non-zero when a request was served by the wrong database.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from common import report_metadata
+from seed import create_app_for, seed
+
+
+def replicate(primary, replica):
+    """Bring the replica file up to date with the primary"""
+    with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+        source.backup(target)
+
+
+def served_by(response):
+    """replica_N when the request read from a replica, otherwise primary"""
+    for metric in response.headers.get('Server-Timing', '').split(', '):
+        if metric.startswith('db;') and ' on ' in metric:
+            return metric.split(' on ', 1)[1].rstrip('"')
+    return 'primary'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--max-lag', type=float, default=0.5, help='REPLICA_MAX_LAG_SECONDS for the run')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    primary = os.path.join(directory, 'primary.db')
+    replica = os.path.join(directory, 'replica.db')
+    # Checks run by hand below, so the scheduler's own check never interferes
+    app = create_app_for(
+        primary,
+        DATABASE_REPLICA_URLS=f'sqlite:///{replica}',
+        REPLICA_MAX_LAG_SECONDS=args.max_lag,
+        REPLICA_CHECK_INTERVAL=3600,
+        OVERDUE_REFRESH_INTERVAL=0,
+        CACHE_BACKEND='none',
+        SERVER_TIMING='true',
+        JOBS_WORKERS=0
+    )
+    from app.replicas import replica_router
+    dataset = seed(app, args.tasks, 1)
+    client = app.test_client()
+
+    def check():
+        with app.app_context():
+            replica_router.check()
+
+    results = []
+
+    def expect(case, response, expected):
+        results.append({'case': case, 'status': response.status_code, 'served_by': served_by(response), 'expected': expected})
+
+    expect('list before the first check', client.get('/api/tasks?limit=10'), 'primary')
+
+    replicate(primary, replica)
+    check()
+    expect('list', client.get('/api/tasks?limit=10'), 'replica_0')
+    task_id = client.get('/api/tasks?limit=1').get_json()['tasks'][0]['id']
+    expect('task detail', client.get(f'/api/tasks/{task_id}'), 'replica_0')
+    expect('comments', client.get(f'/api/tasks/{task_id}/comments'), 'replica_0')
+    expect('stats', client.get('/api/tasks/stats'), 'replica_0')
+    expect('create', client.post('/api/tasks', json={'title': 'Written to the primary'}), 'primary')
+    expect('sync feed', client.get('/api/sync'), 'primary')
+
+    # The write above is not on the replica; once it is older than the allowed lag, reads fall back
+    time.sleep(args.max_lag * 2)
+    check()
+    expect('list while the replica lags', client.get('/api/tasks?limit=10'), 'primary')
+
+    replicate(primary, replica)
+    check()
+    expect('list after the replica caught up', client.get('/api/tasks?limit=10'), 'replica_0')
+
+    # Dropping the pooled connections makes the next check open the now missing file
+    os.remove(replica)
+    with app.app_context():
+        replica_router.engines[0].dispose()
+    check()
+    expect('list with the replica gone', client.get('/api/tasks?limit=10'), 'primary')
+
+    report = report_metadata(benchmark='replicas', dataset=dataset, max_lag=args.max_lag)
+    report['results'] = results
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+    mismatches = [result for result in results if result['served_by'] != result['expected'] or result['status'] >= 400]
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Seed a database with a synthetic, skewed task and comment dataset
+
+    python benchmarks/seed.py --database /tmp/bench.db --tasks 100000 --comments 5
+
+Status and priority follow a skewed distribution, and comments per task
+follow an exponential distribution around the requested mean, so a few hot
+tasks carry most of the comments.
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+from common import BACKEND_DIR, Timer  # noqa: F401  (puts the backend on sys.path)
+
+STATUS_WEIGHTS = {'pending': 0.5, 'in_progress': 0.3, 'completed': 0.2}
+PRIORITY_WEIGHTS = {'medium': 0.6, 'high': 0.25, 'low': 0.15}
+WORDS = (
+    'api backend bug cache client database deploy design docs frontend index latency '
+    'login metrics migration mobile query release review schema search server test ui'
+).split()
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def generate_tasks(rng, count, now):
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    priorities, priority_weights = zip(*PRIORITY_WEIGHTS.items())
+    for i in range(count):
+        created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+        due_date = created_at + timedelta(days=rng.randint(-10, 60)) if rng.random() < 0.6 else None
+        yield {
+            'title': f'{_sentence(rng, 4)} #{i}',
+            'description': _sentence(rng, rng.randint(5, 30)),
+            'status': rng.choices(statuses, status_weights)[0],
+            'priority': rng.choices(priorities, priority_weights)[0],
+            'due_date': due_date,
+            'created_at': created_at,
+            'updated_at': created_at
+        }
+
+
+def generate_comments(rng, task_ids, mean_per_task, now):
+    for task_id in task_ids:
+        for _ in range(int(rng.expovariate(1 / mean_per_task)) if mean_per_task else 0):
+            created_at = now - timedelta(seconds=rng.randint(0, 180 * 24 * 3600))
+            yield {
+                'task_id': task_id,
+                'content': _sentence(rng, rng.randint(3, 40)),
+                'author': rng.choice(['alice', 'bob', 'carol', 'dave', 'Anonymous']),
+                'created_at': created_at,
+                'updated_at': created_at
+            }
+
+
+def _insert_batches(model, rows, batch_size):
+    from sqlalchemy import insert
+    from app import db
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(insert(model), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(model), batch)
+
+
+def seed(app, tasks=10000, comments_per_task=3, random_seed=42, batch_size=5000):
+    """Insert the synthetic dataset into the app's database and return counts"""
+    from app import db, migrations
+    from app.models.task import Task
+    from app.models.comment import Comment
+
+    rng = random.Random(random_seed)
+    now = datetime.utcnow()
+    with app.app_context():
+        migrations.upgrade()
+        first_id = (db.session.query(db.func.max(Task.id)).scalar() or 0) + 1
+        _insert_batches(Task, generate_tasks(rng, tasks, now), batch_size)
+        task_ids = range(first_id, first_id + tasks)
+        _insert_batches(Comment, generate_comments(rng, task_ids, comments_per_task, now), batch_size)
+        db.session.commit()
+        return {
+            'tasks': db.session.query(db.func.count(Task.id)).scalar(),
+            'comments': db.session.query(db.func.count(Comment.id)).scalar()
+        }
+
+
+def create_app_for(database_path, **env):
+    """Create the app against a specific SQLite file with extra env overrides"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(database_path)}'
+    os.environ.update({name: str(value) for name, value in env.items()})
+    from app import create_app
+    return create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', required=True, help='SQLite file to create or extend')
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--comments', type=float, default=3, help='mean comments per task')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    app = create_app_for(args.database)
+    with Timer() as timer:
+        counts = seed(app, args.tasks, args.comments, args.seed)
+    counts['seconds'] = round(timer.elapsed, 2)
+    print(json.dumps(counts))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Serialization cost of the task list response
+
+    python benchmarks/serialization.py --tasks 20000 --repeat 5
+
+Compares the original path (ORM instances, to_dict() with per-row
+isoformat(), stdlib json) with the row based path used by GET /api/tasks,
+encoded once with the stdlib and once with orjson. Reports the best of
+--repeat runs for the fetch, dict building and encoding phases.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from common import report_metadata
+from seed import create_app_for, seed
+
+
+def best_of(repeat, function):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) * 1000, 2), result
+
+
+def measure(app, repeat):
+    from app import db
+    from app.models.task import Task
+    from app.routes.tasks import build_task_query
+    from app.serialization import FastJSONProvider, orjson, rows_to_dicts
+
+    fields = Task.PROJECTABLE_FIELDS
+    stdlib = json.JSONEncoder(default=FastJSONProvider.default, separators=(',', ':')).encode
+    results = {}
+
+    with app.app_context():
+        fetch_ms, tasks = best_of(repeat, lambda: build_task_query().all())
+        build_ms, items = best_of(repeat, lambda: [task.to_dict() for task in tasks])
+        encode_ms, body = best_of(repeat, lambda: json.dumps({'success': True, 'tasks': items}, separators=(',', ':')))
+        results['orm_to_dict_stdlib'] = {
+            'fetch_ms': fetch_ms, 'build_ms': build_ms, 'encode_ms': encode_ms,
+            'total_ms': round(fetch_ms + build_ms + encode_ms, 2), 'bytes': len(body)
+        }
+        db.session.expunge_all()
+
+        fetch_ms, rows = best_of(repeat, lambda: build_task_query(fields=fields).all())
+        build_ms, items = best_of(repeat, lambda: rows_to_dicts(rows, fields))
+        encode_ms, body = best_of(repeat, lambda: stdlib({'success': True, 'tasks': items}))
+        results['rows_stdlib'] = {
+            'fetch_ms': fetch_ms, 'build_ms': build_ms, 'encode_ms': encode_ms,
+            'total_ms': round(fetch_ms + build_ms + encode_ms, 2), 'bytes': len(body)
+        }
+
+        if orjson is not None:
+            encode_ms, body = best_of(repeat, lambda: orjson.dumps(
+                {'success': True, 'tasks': items}, default=FastJSONProvider.default))
+            results['rows_orjson'] = {
+                'fetch_ms': fetch_ms, 'build_ms': build_ms, 'encode_ms': encode_ms,
+                'total_ms': round(fetch_ms + build_ms + encode_ms, 2), 'bytes': len(body)
+            }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), 'serialization.db')
+    app = create_app_for(database, CACHE_BACKEND='none')
+    dataset = seed(app, args.tasks, 0)
+
+    report = report_metadata(benchmark='serialization', repeat=args.repeat, dataset=dataset)
+    report['paths'] = measure(app, args.repeat)
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
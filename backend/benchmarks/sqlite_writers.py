@@ -0,0 +1,99 @@
+"""Concurrent SQLite writer benchmark
+
+Runs several processes that each commit single task inserts against the
+same database file, once per SQLite profile, and reports writer throughput
+and the number of 'database is locked' failures.
+
+    python benchmarks/sqlite_writers.py --workers 4 --writes 500
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def writer(database_url, profile, writes, start_event, results):
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['SQLITE_PROFILE'] = profile
+    os.environ['CACHE_BACKEND'] = 'none'
+
+    from app import create_app, db
+    from app.models.task import Task
+
+    app = create_app()
+    committed = locked = 0
+    with app.app_context():
+        start_event.wait()
+        for i in range(writes):
+            try:
+                db.session.add(Task(title=f'bench {os.getpid()} {i}', status='pending', priority='medium'))
+                db.session.commit()
+                committed += 1
+            except Exception as e:
+                db.session.rollback()
+                if 'locked' not in str(e):
+                    raise
+                locked += 1
+    results.put((committed, locked))
+
+
+def run_profile(profile, workers, writes):
+    directory = tempfile.mkdtemp()
+    database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['SQLITE_PROFILE'] = profile
+    from app import create_app, migrations
+    with create_app().app_context():
+        migrations.upgrade()
+
+    start_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=writer, args=(database_url, profile, writes, start_event, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    # Give every worker time to import the app before starting the clock
+    time.sleep(2)
+    started = time.perf_counter()
+    start_event.set()
+    outcomes = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    committed = sum(outcome[0] for outcome in outcomes)
+    return {
+        'profile': profile,
+        'workers': workers,
+        'writes_per_worker': writes,
+        'committed': committed,
+        'locked_errors': sum(outcome[1] for outcome in outcomes),
+        'seconds': round(elapsed, 3),
+        'writes_per_second': round(committed / elapsed, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--writes', type=int, default=500)
+    parser.add_argument('--profiles', default='default,production')
+    args = parser.parse_args()
+
+    report = [run_profile(profile, args.workers, args.writes) for profile in args.profiles.split(',')]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
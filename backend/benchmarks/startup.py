@@ -0,0 +1,94 @@
+"""Process start up cost: import time and first request latency
+
+    python benchmarks/startup.py --tasks 10000 --runs 5
+
+Every run starts a fresh interpreter that imports run.py (app construction,
+schema check and warm up included), then forks a child the way gunicorn
+--preload forks its workers and times the child's first and second
+GET /api/tasks?limit=50. Runs once with WARM_UP_ON_START=false and once
+with it on, and reports the median of --runs runs for each.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from common import BACKEND_DIR, report_metadata
+from seed import create_app_for, seed
+
+PROBE = r'''
+import json, os, sys, time
+started = time.perf_counter()
+import run
+imported = time.perf_counter()
+
+read_end, write_end = os.pipe()
+pid = os.fork()
+if pid == 0:
+    os.close(read_end)
+    client = run.app.test_client()
+    timings = []
+    for _ in range(2):
+        before = time.perf_counter()
+        assert client.get('/api/tasks?limit=50').status_code == 200
+        timings.append(time.perf_counter() - before)
+    os.write(write_end, json.dumps(timings).encode())
+    os._exit(0)
+
+os.close(write_end)
+with os.fdopen(read_end) as pipe:
+    first, second = json.loads(pipe.read())
+os.waitpid(pid, 0)
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': first * 1000,
+    'second_request_ms': second * 1000
+}))
+'''
+
+
+def probe(database, warm_up):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f'sqlite:///{database}',
+        CACHE_BACKEND='none',
+        WARM_UP_ON_START='true' if warm_up else 'false'
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(database, runs, warm_up):
+    samples = [probe(database, warm_up) for _ in range(runs)]
+    return {
+        name: round(statistics.median(sample[name] for sample in samples), 2)
+        for name in ('import_ms', 'first_request_ms', 'second_request_ms')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), 'startup.db')
+    app = create_app_for(database, CACHE_BACKEND='none')
+    dataset = seed(app, args.tasks, 1)
+
+    report = report_metadata(benchmark='startup', runs=args.runs, dataset=dataset)
+    report['modes'] = {
+        'cold': measure(database, args.runs, warm_up=False),
+        'warm_up': measure(database, args.runs, warm_up=True)
+    }
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
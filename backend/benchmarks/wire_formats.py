@@ -0,0 +1,91 @@
+"""Bytes on the wire and encode time of the task list response per format and encoding
+
+    python benchmarks/wire_formats.py --tasks 20000 --page 50 --repeat 5
+
+Encodes a full list and a --page sized list through the app's JSON provider,
+once per negotiated format (JSON as jsonify sends it, columnar JSON and
+MessagePack), then compresses each body with gzip and brotli at the levels
+the app is configured with. Reports the best of --repeat runs.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from common import report_metadata
+from seed import create_app_for, seed
+
+FORMATS = {
+    'json': 'application/json',
+    'columnar': 'application/vnd.task-api.columnar+json',
+    'msgpack': 'application/msgpack'
+}
+
+
+def best_of(repeat, function):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) * 1000, 3), result
+
+
+def measure(app, limit, repeat):
+    from app.compression import brotli, compression
+    from app.models.task import Task
+    from app.routes.tasks import build_task_query
+    from app.serialization import msgpack, rows_to_dicts
+
+    fields = Task.PROJECTABLE_FIELDS
+    encodings = ['gzip'] + (['br'] if brotli is not None else [])
+    results = {}
+
+    with app.app_context():
+        rows = build_task_query(fields=fields).limit(limit).all()
+        items = rows_to_dicts(rows, fields)
+
+    for name, mimetype in FORMATS.items():
+        if name == 'msgpack' and msgpack is None:
+            continue
+        # Goes through response negotiation exactly like a GET /api/tasks with this Accept header
+        with app.test_request_context('/api/tasks', headers={'Accept': mimetype}):
+            encode_ms, response = best_of(repeat, lambda: app.json.response({'success': True, 'tasks': items}))
+        body = response.get_data()
+        result = {'encode_ms': encode_ms, 'bytes': len(body)}
+
+        for encoding in encodings:
+            def compress():
+                compress_body, finish, _ = compression.compressor(encoding)
+                return compress_body(body) + finish()
+            compress_ms, compressed = best_of(repeat, compress)
+            result[encoding] = {
+                'compress_ms': compress_ms,
+                'bytes': len(compressed),
+                'ratio': round(len(compressed) / len(body), 3)
+            }
+        results[name] = result
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--page', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), 'wire_formats.db')
+    app = create_app_for(database, CACHE_BACKEND='none')
+    dataset = seed(app, args.tasks, 0)
+
+    report = report_metadata(benchmark='wire_formats', repeat=args.repeat, page=args.page, dataset=dataset)
+    report['page'] = measure(app, args.page, args.repeat)
+    report['full_list'] = measure(app, args.tasks, args.repeat)
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
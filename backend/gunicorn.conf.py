@@ -0,0 +1,12 @@
+# Gunicorn settings for run:app
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+workers = int(os.getenv('WEB_CONCURRENCY', 4))
+# Read by create_app, which shortens the per-worker cache lifetimes when there are several
+os.environ['WEB_CONCURRENCY'] = str(workers)
+threads = int(os.getenv('GUNICORN_THREADS', 32))
+
+# Import the app, migrate and warm up once in the master, then fork; workers
+# share the imported modules copy-on-write and start serving immediately
+preload_app = True
@@ -0,0 +1,27 @@
+"""Apply pending schema migrations once, outside the web processes
+
+Run it as a release or pre-deploy step, then start the web processes with
+MIGRATE_ON_START=false so they never touch the schema while serving.
+"""
+import sys
+
+from app import create_app, migrations
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        try:
+            applied = migrations.upgrade()
+        except Exception as e:
+            print(f"Error applying database migrations: {e}")
+            return 1
+    if applied:
+        print(f"Applied database migrations: {', '.join(applied)}")
+    else:
+        print("Database schema is up to date")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,16 +4,29 @@ from app import create_app
 # Create the Flask app
 app = create_app()
 
-# Always initialize database tables on startup
-with app.app_context():
-    try:
-        from app import db
-        from app.models.task import Task
-        from app.models.comment import Comment
-        db.create_all()
-        print("Database tables initialized successfully!")
-    except Exception as e:
-        print(f"Error initializing database tables: {e}")
+# Bring the database schema up to date on startup; deploys that run `python migrate.py`
+# as a release step set MIGRATE_ON_START=false so web processes skip the check
+if os.getenv('MIGRATE_ON_START', 'true').lower() in ('1', 'true', 'yes'):
+    with app.app_context():
+        try:
+            from app import migrations
+            applied = migrations.upgrade()
+            if applied:
+                print(f"Applied database migrations: {', '.join(applied)}")
+            else:
+                print("Database schema is up to date")
+        except Exception as e:
+            print(f"Error applying database migrations: {e}")
+
+# Compile the hot queries once; under gunicorn --preload this runs in the master
+# and the forked workers inherit the warm caches but none of its connections
+if os.getenv('WARM_UP_ON_START', 'true').lower() in ('1', 'true', 'yes'):
+    with app.app_context():
+        try:
+            from app.warmup import warm_up
+            warm_up()
+        except Exception as e:
+            print(f"Error warming up: {e}")
 
 if __name__ == '__main__':
     # Development server (only when run directly)
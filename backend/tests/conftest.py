@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Background threads and admission limits off, so tests drive them explicitly
+TEST_ENV = {
+    'JOBS_WORKERS': '0',
+    'OVERDUE_REFRESH_INTERVAL': '0',
+    'RATE_LIMIT_ENABLED': 'false',
+    'CACHE_BACKEND': 'memory',
+    'EVENTS_BACKEND': 'memory',
+}
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """Build an app on a fresh, migrated SQLite file; keyword arguments override the environment"""
+
+    def factory(**env):
+        monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+        for name, value in {**TEST_ENV, **env}.items():
+            monkeypatch.setenv(name, str(value))
+
+        from app import create_app, db, migrations
+        app = create_app()
+        app.config['TESTING'] = True
+        with app.app_context():
+            migrations.upgrade()
+        apps.append((app, db))
+        return app
+
+    apps = []
+    yield factory
+    for app, db in apps:
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def create_task(client):
+    """POST a task and return its JSON representation"""
+
+    def create(title='Task', **fields):
+        response = client.post('/api/tasks', json={'title': title, **fields})
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['task']
+
+    return create
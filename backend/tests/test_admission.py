@@ -0,0 +1,88 @@
+import time
+
+import app.batch
+from app.admission import admission
+
+
+def test_batch_holds_its_slot_until_it_finishes(make_app, monkeypatch):
+    client = make_app(ADMISSION_MAX_WRITES=1).test_client()
+    slot = admission.slots['writes']
+    free_slots = []
+
+    run_subrequest = app.batch.run_subrequest
+
+    def recording_run_subrequest(subrequest):
+        result = run_subrequest(subrequest)
+        free_slots.append(slot._value)
+        return result
+
+    monkeypatch.setattr(app.batch, 'run_subrequest', recording_run_subrequest)
+    response = client.post('/api/batch', json={'requests': [
+        {'method': 'POST', 'path': '/api/tasks', 'body': {'title': 'one'}},
+        {'method': 'POST', 'path': '/api/tasks', 'body': {'title': 'two'}},
+        {'path': '/api/tasks'},
+    ]})
+
+    assert response.status_code == 200
+    assert [item['status'] for item in response.get_json()['responses']] == [201, 201, 200]
+    assert free_slots == [0, 0, 0]
+    assert slot._value == 1
+
+
+def test_write_over_capacity_is_shed_with_503(make_app):
+    client = make_app(ADMISSION_MAX_WRITES=1, ADMISSION_QUEUE_BUDGET_MS=50).test_client()
+    slot = admission.slots['writes']
+    slot.acquire()
+    try:
+        started = time.perf_counter()
+        response = client.post('/api/tasks', json={'title': 'busy'})
+        assert time.perf_counter() - started < 1
+    finally:
+        slot.release()
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert client.post('/api/tasks', json={'title': 'free'}).status_code == 201
+    assert 'reason="over_capacity"' in client.get('/api/metrics').get_data(as_text=True)
+
+
+def test_requests_queued_past_the_budget_are_shed(make_app):
+    client = make_app(ADMISSION_QUEUE_BUDGET_MS=100).test_client()
+    stale = f't={int((time.time() - 2) * 1000)}'
+    assert client.get('/api/tasks', headers={'X-Request-Start': stale}).status_code == 503
+    assert client.get('/api/tasks', headers={'X-Request-Start': f't={time.time():.3f}'}).status_code == 200
+
+
+def test_export_slot_is_released_after_streaming(client, create_task):
+    create_task('exported')
+    slot = admission.slots['exports']
+    response = client.get('/api/tasks/export')
+    assert slot._value == 1
+    response.get_data()
+    response.close()
+    assert slot._value == 2
+
+
+def test_rate_limiting_is_off_unless_enabled(make_app):
+    client = make_app(RATE_LIMIT_ENABLED='', RATE_LIMIT_READS=1, RATE_LIMIT_BURST_SECONDS=1).test_client()
+    assert {client.get('/api/tasks').status_code for _ in range(5)} == {200}
+
+
+def test_rate_limit_per_client_behind_a_proxy(make_app):
+    client = make_app(
+        RATE_LIMIT_ENABLED='true', RATE_LIMIT_PROXY_HOPS=1, RATE_LIMIT_READS=2, RATE_LIMIT_BURST_SECONDS=1
+    ).test_client()
+
+    def get(forwarded_for):
+        return client.get('/api/tasks', headers={'X-Forwarded-For': forwarded_for})
+
+    assert [get('203.0.113.1').status_code for _ in range(3)] == [200, 200, 429]
+    limited = get('203.0.113.1')
+    assert limited.headers['Retry-After'] == '1'
+    assert limited.get_json() == {'success': False, 'error': 'Too many requests. Retry later.'}
+
+    # Another client behind the same proxy has its own bucket, and a forged first hop doesn't help
+    assert get('203.0.113.2').status_code == 200
+    assert get('198.51.100.7, 203.0.113.1').status_code == 429
+    # Buckets are per endpoint
+    assert client.get('/api/tasks/stats', headers={'X-Forwarded-For': '203.0.113.1'}).status_code == 200
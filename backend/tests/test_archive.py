@@ -0,0 +1,213 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import ArchivedTask, Task
+from app.scheduler import scheduler
+
+
+def age_tasks(app, ids, days=100):
+    with app.app_context():
+        db.session.execute(
+            db.update(Task).where(Task.id.in_(ids)).values(updated_at=datetime.utcnow() - timedelta(days=days))
+        )
+        db.session.commit()
+
+
+def complete_and_age(app, client, ids):
+    for task_id in ids:
+        assert client.put(f'/api/tasks/{task_id}', json={'status': 'completed'}).status_code == 200
+    age_tasks(app, ids)
+
+
+def test_archive_moves_old_completed_tasks_and_comments(app, client, create_task):
+    ids = [create_task(f'task {number}')['id'] for number in range(4)]
+    client.post(f'/api/tasks/{ids[0]}/comments', json={'content': 'kept'})
+    complete_and_age(app, client, ids[:2])
+    before = client.get('/api/tasks/stats').get_json()['stats']
+
+    response = client.post('/api/tasks/archive', json={})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['archived_tasks'] == 2
+    assert result['archived_comments'] == 1
+
+    listed = [task['id'] for task in client.get('/api/tasks').get_json()['tasks']]
+    assert sorted(listed) == sorted(ids[2:])
+
+    after = client.get('/api/tasks/stats').get_json()['stats']
+    assert after['total_tasks'] == before['total_tasks']
+    assert after['by_status'] == before['by_status']
+    assert after['archived_tasks'] == 2
+
+
+def test_archived_tasks_stay_readable_on_their_id(app, client, create_task):
+    task = create_task('old')
+    client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'kept'})
+    complete_and_age(app, client, [task['id']])
+    client.post('/api/tasks/archive', json={})
+
+    body = client.get(f"/api/tasks/{task['id']}").get_json()['task']
+    assert (body['title'], body['archived']) == ('old', True)
+    assert [comment['content'] for comment in body['comments']] == ['kept']
+    assert client.get(f"/api/tasks/{task['id']}/comments").get_json()['comments'][0]['content'] == 'kept'
+    # Archived tasks are read only
+    assert client.put(f"/api/tasks/{task['id']}", json={'title': 'new'}).status_code == 404
+
+
+def test_sync_reports_archived_tasks_as_changes(app, client, create_task):
+    task = create_task('old')
+    comment = client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'kept'}).get_json()['comment']
+    complete_and_age(app, client, [task['id']])
+    watermark = client.get('/api/sync').get_json()['watermark']
+    client.post('/api/tasks/archive', json={})
+
+    body = client.get(f'/api/sync?since={watermark}').get_json()
+    assert body['deleted'] == {'tasks': [], 'comments': []}
+    assert [(item['id'], item['archived']) for item in body['tasks']] == [(task['id'], True)]
+    assert [item['id'] for item in body['comments']] == [comment['id']]
+    # Deleting a hot task still leaves a tombstone
+    other = create_task()
+    client.delete(f"/api/tasks/{other['id']}")
+    assert client.get(f"/api/sync?since={body['watermark']}").get_json()['deleted']['tasks'] == [other['id']]
+
+
+def test_include_archived_lists_both_tiers_with_default_fields(app, client, create_task):
+    ids = [create_task(f'task {number}')['id'] for number in range(3)]
+    client.post(f'/api/tasks/{ids[0]}/comments', json={'content': 'hello'})
+    complete_and_age(app, client, ids[:1])
+    client.post('/api/tasks/archive', json={})
+
+    response = client.get('/api/tasks?include_archived=true')
+    assert response.status_code == 200, response.get_json()
+    tasks = {task['id']: task for task in response.get_json()['tasks']}
+    assert set(tasks) == set(ids)
+    assert tasks[ids[0]]['archived'] is True
+    assert tasks[ids[0]]['comments_count'] == 1
+    assert tasks[ids[1]]['archived'] is False
+    assert set(Task.PROJECTABLE_FIELDS) <= set(tasks[ids[1]])
+
+
+def test_include_archived_pages_across_tiers(app, client, create_task):
+    ids = [create_task(f'task {number}')['id'] for number in range(7)]
+    complete_and_age(app, client, ids[1:6:2])
+    client.post('/api/tasks/archive', json={})
+
+    seen, cursor = [], None
+    while True:
+        query = '/api/tasks?include_archived=true&limit=2' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(query).get_json()
+        seen += [task['id'] for task in body['tasks']]
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_include_archived_with_ids_keeps_requested_order(app, client, create_task):
+    ids = [create_task(f'task {number}')['id'] for number in range(3)]
+    complete_and_age(app, client, ids[:1])
+    client.post('/api/tasks/archive', json={})
+
+    body = client.get(f'/api/tasks?include_archived=true&ids={ids[2]},{ids[0]},999').get_json()
+    assert [task['id'] for task in body['tasks']] == [ids[2], ids[0]]
+    assert body['missing'] == [999]
+
+
+def test_archiving_is_opt_in(app, client, create_task):
+    task = create_task()
+    complete_and_age(app, client, [task['id']])
+
+    assert app.config['ARCHIVE_INTERVAL'] == 0
+    assert 'enqueue_archive' not in [entry['function'].__name__ for entry in scheduler.entries]
+    assert 'archived' not in client.get(f"/api/tasks/{task['id']}").get_json()['task']
+
+
+def test_archive_rejects_invalid_options(client):
+    assert client.post('/api/tasks/archive', json={'batch_size': 0}).status_code == 400
+    assert client.post('/api/tasks/archive', json={'after_days': 'soon'}).status_code == 400
+
+
+def test_archive_runs_as_a_job(app, client, create_task):
+    ids = [create_task(f'task {number}')['id'] for number in range(2)]
+    complete_and_age(app, client, ids[:1])
+
+    response = client.post('/api/tasks/archive', json={}, headers={'Prefer': 'respond-async'})
+    assert response.status_code == 202
+    from app.jobs import job_queue
+    with app.app_context():
+        assert job_queue.run_next()
+    job = client.get(response.headers['Location']).get_json()['job']
+    assert job['status'] == 'succeeded'
+    assert job['result']['archived_tasks'] == 1
+    with app.app_context():
+        assert db.session.scalar(db.select(db.func.count()).select_from(ArchivedTask)) == 1
+
+
+def test_archived_ids_are_not_handed_out_again(app, client, create_task):
+    ids = [create_task(f'task {number}')['id'] for number in range(4)]
+    complete_and_age(app, client, [ids[1]])
+    assert client.post('/api/tasks/archive', json={}).get_json()['archived_tasks'] == 1
+
+    # Deleting the newest tasks used to lower max(id) and let SQLite reissue the archived id
+    for task_id in ids[:1:-1]:
+        assert client.delete(f'/api/tasks/{task_id}').status_code == 200
+    reissued = create_task('new task')
+    assert reissued['id'] > ids[-1]
+
+    complete_and_age(app, client, [reissued['id']])
+    response = client.post('/api/tasks/archive', json={})
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['archived_tasks'] == 1
+
+
+def test_task_id_migration_keeps_data_and_skips_reused_ids(make_app, monkeypatch):
+    from app import migrations
+
+    # Build the schema as it was before 0011, where ids could be reused
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [m for m in migrations.MIGRATIONS if m.revision < '0011'])
+    app = make_app()
+    client = app.test_client()
+    ids = [client.post('/api/tasks', json={'title': f'legacy {number}'}).get_json()['task']['id'] for number in range(3)]
+    client.post(f'/api/tasks/{ids[0]}/comments', json={'content': 'legacy comment'})
+    complete_and_age(app, client, [ids[1]])
+    client.post('/api/tasks/archive', json={})
+    client.delete(f'/api/tasks/{ids[2]}')
+    reused = client.post('/api/tasks', json={'title': 'reused'}).get_json()['task']
+    assert reused['id'] == ids[1]
+
+    monkeypatch.undo()
+    with app.app_context():
+        assert migrations.upgrade() == ['0011']
+
+    # Data, indexes and triggers survive the rebuild
+    assert client.get(f'/api/tasks/{ids[0]}').get_json()['task']['comments_count'] == 1
+    assert [task['title'] for task in client.get('/api/tasks/search?q=legacy').get_json()['tasks']] == ['legacy 0']
+    new = client.post('/api/tasks', json={'title': 'after upgrade'}).get_json()['task']
+    assert new['id'] > ids[2]
+
+    # The task that already reused an archived id stays hot rather than failing the run
+    complete_and_age(app, client, [reused['id'], new['id']])
+    response = client.post('/api/tasks/archive', json={})
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['archived_tasks'] == 1
+    assert client.get(f"/api/tasks/{reused['id']}").status_code == 200
+
+    client.delete(f'/api/tasks/{ids[0]}')
+    with app.app_context():
+        from app.models import Comment
+        assert db.session.scalar(db.select(db.func.count()).select_from(Comment)) == 0
+
+
+def test_task_id_migration_reruns_after_a_partial_failure(make_app, monkeypatch):
+    from app import migrations
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [m for m in migrations.MIGRATIONS if m.revision < '0011'])
+    app = make_app()
+    with app.app_context():
+        # What a run that stopped after creating the copy used to leave behind
+        db.session.execute(db.text('CREATE TABLE tasks_rebuilt (id INTEGER PRIMARY KEY)'))
+        db.session.commit()
+
+        monkeypatch.undo()
+        assert migrations.upgrade() == ['0011']
+        assert 'tasks_rebuilt' not in db.inspect(db.engine).get_table_names()
@@ -0,0 +1,104 @@
+from starlette.testclient import TestClient
+
+from app import db
+from app.asgi import create_asgi_app
+from app.events import event_bus
+from app.models.task import Task
+
+
+def test_preflight_allows_the_served_methods_only(app):
+    preflight = {'Origin': 'http://localhost:3000', 'Access-Control-Request-Headers': 'If-Match, Content-Type'}
+    with TestClient(create_asgi_app(app)) as client:
+        put = client.options('/api/tasks/1', headers={**preflight, 'Access-Control-Request-Method': 'PUT'})
+        patch = client.options('/api/tasks/1', headers={**preflight, 'Access-Control-Request-Method': 'PATCH'})
+
+    assert put.status_code == 200
+    assert 'If-Match' in put.headers['Access-Control-Allow-Headers']
+    # PATCH has no ASGI route, so browsers are not told they may send it
+    assert patch.status_code == 400
+    assert 'PATCH' not in patch.headers['Access-Control-Allow-Methods']
+
+
+def test_writes_invalidate_cache_and_publish_events(app, client):
+    assert client.get('/api/tasks').get_json()['count'] == 0
+    before = event_bus._last_id
+
+    with TestClient(create_asgi_app(app)) as asgi_client:
+        task = asgi_client.post('/api/tasks', json={'title': 'async'}).json()['task']
+        asgi_client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'hi'})
+
+    assert event_bus._last_id == before + 2
+    assert [event[1] for event in event_bus.buffer][-2:] == ['task.created', 'comment.created']
+    # The Flask app's cached list and task responses see the async writes straight away
+    assert client.get('/api/tasks').get_json()['count'] == 1
+    assert client.get(f"/api/tasks/{task['id']}").get_json()['task']['comments'][0]['content'] == 'hi'
+
+
+def test_reads_match_the_flask_routes(app, client, create_task):
+    first = create_task('first', priority='high', due_date='2030-01-02T03:04:05')
+    second = create_task('second', status='completed')
+    for content in ('a', 'b', 'c'):
+        client.post(f"/api/tasks/{first['id']}/comments", json={'content': content})
+    cursor = client.get('/api/tasks?limit=1').get_json()['next_cursor']
+    comment_cursor = client.get(f"/api/tasks/{first['id']}/comments?limit=1").get_json()['next_cursor']
+
+    urls = [
+        '/api/tasks',
+        '/api/tasks?status=completed',
+        '/api/tasks?fields=title,comments_count',
+        '/api/tasks?limit=1',
+        f'/api/tasks?limit=1&cursor={cursor}',
+        f"/api/tasks?ids={second['id']},999,{first['id']}",
+        '/api/tasks?include_archived=true',
+        f"/api/tasks/{first['id']}",
+        f"/api/tasks/{first['id']}?embed=comments:2",
+        f"/api/tasks/{first['id']}?embed=none",
+        f"/api/tasks/{first['id']}/comments",
+        f"/api/tasks/{first['id']}/comments?limit=1&cursor={comment_cursor}",
+        '/api/tasks/999',
+        '/api/tasks/999/comments',
+        '/api/tasks?limit=0',
+    ]
+    with TestClient(create_asgi_app(app)) as asgi_client:
+        for url in urls:
+            expected = client.get(url)
+            response = asgi_client.get(url)
+            assert (response.status_code, response.json()) == (expected.status_code, expected.get_json()), url
+
+
+def test_writes_validate_like_the_flask_routes(app, create_task):
+    task = create_task()
+    with TestClient(create_asgi_app(app)) as asgi_client:
+        assert asgi_client.post('/api/tasks', json={'title': ''}).json()['validation_errors']
+        assert asgi_client.put(f"/api/tasks/{task['id']}", json={'status': 'unknown'}).status_code == 400
+        assert asgi_client.put(f"/api/tasks/{task['id']}", json={'due_date': 'soon'}).status_code == 400
+
+        updated = asgi_client.put(f"/api/tasks/{task['id']}", json={'title': 'async'}).json()['task']
+        assert (updated['title'], updated['version']) == ('async', task['version'] + 1)
+
+        comment = asgi_client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'hi'}).json()['comment']
+        assert asgi_client.put(f"/api/comments/{comment['id']}", json={'content': 'edited'}).json()['comment']['content'] == 'edited'
+        assert asgi_client.delete(f"/api/comments/{comment['id']}").status_code == 200
+        assert asgi_client.delete(f"/api/comments/{comment['id']}").status_code == 404
+
+        assert asgi_client.delete(f"/api/tasks/{task['id']}").status_code == 200
+        assert asgi_client.delete(f"/api/tasks/{task['id']}").status_code == 404
+        assert asgi_client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'late'}).status_code == 404
+
+
+def test_put_racing_a_concurrent_write_is_a_conflict(app, create_task, monkeypatch):
+    task = create_task()
+    validate = Task.validate
+
+    def validate_after_a_concurrent_write(self):
+        with app.app_context(), db.engine.begin() as connection:
+            connection.execute(db.update(Task).where(Task.id == task['id']).values(version=Task.version + 1))
+        return validate(self)
+
+    monkeypatch.setattr(Task, 'validate', validate_after_a_concurrent_write)
+    with TestClient(create_asgi_app(app)) as asgi_client:
+        response = asgi_client.put(f"/api/tasks/{task['id']}", json={'title': 'async'})
+
+    assert response.status_code == 409
+    assert response.json()['current_version'] == task['version'] + 1
+    assert response.headers['ETag'] == f'"v{task["version"] + 1}"'
@@ -0,0 +1,101 @@
+import pytest
+
+from app import batch
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """Record the path of every sub-request actually dispatched"""
+    paths = []
+    run_subrequest = batch.run_subrequest
+
+    def recording(subrequest):
+        paths.append(subrequest['path'])
+        return run_subrequest(subrequest)
+
+    monkeypatch.setattr(batch, 'run_subrequest', recording)
+    return paths
+
+
+def test_ids_multi_get_keeps_the_requested_order(client, create_task):
+    first, second, third = (create_task(title)['id'] for title in ('a', 'b', 'c'))
+
+    response = client.get(f'/api/tasks?ids={third},999,{first},{third}')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [task['id'] for task in body['tasks']] == [third, first]
+    assert body['missing'] == [999]
+    assert 'next_cursor' not in body
+
+
+def test_invalid_ids_are_rejected(client):
+    assert client.get('/api/tasks?ids=1,two').status_code == 400
+    assert client.get('/api/tasks?ids=,').status_code == 400
+
+
+def test_batch_runs_subrequests_in_order(client, create_task):
+    task = create_task('batched')
+
+    response = client.post('/api/batch', json={'requests': [
+        {'path': f"/api/tasks/{task['id']}"},
+        {'method': 'POST', 'path': f"/api/tasks/{task['id']}/comments", 'body': {'content': 'hi'}},
+        {'method': 'PATCH', 'path': f"/api/tasks/{task['id']}", 'body': {'title': 'renamed'},
+         'headers': {'If-Match': f'"v{task["version"]}"'}},
+        {'path': '/api/tasks/999'},
+        {'path': '/api/nowhere'},
+    ]})
+    assert response.status_code == 200
+    responses = response.get_json()['responses']
+    assert [item['status'] for item in responses] == [200, 201, 200, 404, 404]
+    assert responses[0]['body']['task']['title'] == 'batched'
+    assert responses[2]['body']['task']['title'] == 'renamed'
+    assert responses[2]['headers']['ETag'] == f'"v{task["version"] + 1}"'
+    assert responses[4]['body']['success'] is False
+
+
+def test_repeated_gets_are_dispatched_once(client, create_task, dispatched):
+    task = create_task()
+    path = f"/api/tasks/{task['id']}"
+
+    responses = client.post('/api/batch', json={'requests': [
+        {'path': path}, {'path': '/api/tasks'}, {'path': path}
+    ]}).get_json()['responses']
+    assert dispatched == [path, '/api/tasks']
+    assert responses[0] == responses[2]
+
+
+def test_writes_drop_the_remembered_gets(client, create_task, dispatched):
+    task = create_task('before')
+    path = f"/api/tasks/{task['id']}"
+
+    responses = client.post('/api/batch', json={'requests': [
+        {'path': path},
+        {'method': 'PUT', 'path': path, 'body': {'title': 'after'}},
+        {'path': path},
+    ]}).get_json()['responses']
+    assert dispatched == [path, path, path]
+    assert [item['body']['task']['title'] for item in (responses[0], responses[2])] == ['before', 'after']
+
+
+def test_different_headers_are_not_deduplicated(client, create_task, dispatched):
+    task = create_task()
+    path = f"/api/tasks/{task['id']}"
+
+    client.post('/api/batch', json={'requests': [
+        {'path': path}, {'path': path, 'headers': {'Accept': 'application/json'}}
+    ]})
+    assert dispatched == [path, path]
+
+
+@pytest.mark.parametrize('body, error', [
+    ({}, 'requests array'),
+    ({'requests': []}, 'must not be empty'),
+    ({'requests': [{'path': '/api/tasks'}] * 21}, 'At most 20'),
+    ({'requests': [{'method': 'HEAD', 'path': '/api/tasks'}]}, 'method'),
+    ({'requests': [{'path': 'http://example.com/'}]}, '/api/ path'),
+    ({'requests': [{'method': 'POST', 'path': '/api/batch'}]}, 'another batch'),
+])
+def test_invalid_batches_are_rejected(client, body, error):
+    response = client.post('/api/batch', json=body)
+    assert response.status_code == 400
+    assert error in response.get_json()['error']
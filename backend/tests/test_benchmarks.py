@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import compare  # noqa: E402
+import endpoints  # noqa: E402
+import seed  # noqa: E402
+
+
+@pytest.fixture
+def seeded_app(make_app):
+    app = make_app(CACHE_BACKEND='none')
+    dataset = seed.seed(app, tasks=40, comments_per_task=2)
+    assert dataset['tasks'] == 40
+    return app
+
+
+def test_seed_is_deterministic(seeded_app, make_app, tmp_path):
+    from app import db
+    from app.models.task import Task
+
+    def titles(app):
+        with app.app_context():
+            return [title for title, in db.session.query(Task.title).order_by(Task.id)]
+
+    expected = titles(seeded_app)
+    other = make_app(DATABASE_URL=f"sqlite:///{tmp_path / 'other.db'}")
+    seed.seed(other, tasks=40, comments_per_task=2)
+    assert titles(other) == expected
+
+
+def test_every_endpoint_scenario_runs_without_errors(seeded_app):
+    results = endpoints.run(seeded_app, iterations=3)
+    assert results
+    failing = {name: result['errors'] for name, result in results.items() if result['errors']}
+    assert failing == {}
+    assert all(result['requests'] and result['queries_per_request'] is not None for result in results.values())
+
+
+def test_compare_reports_the_change_per_metric():
+    before = {'scenarios': {'tasks.list': {'p50_ms': 10.0, 'requests': 5}}}
+    after = {'scenarios': {'tasks.list': {'p50_ms': 5.0, 'requests': 5}, 'tasks.new': {'p50_ms': 1.0}}}
+    # Only scenarios and metrics present in both reports are compared
+    assert list(compare.compare(before, after)) == [('tasks.list', 'p50_ms', 10.0, 5.0, -50.0)]
@@ -0,0 +1,84 @@
+import json
+
+from sqlalchemy import event
+
+from app import db
+
+
+def test_bulk_tasks_get_their_ids_in_order(app, client):
+    inserts = []
+    with app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, *args):
+        if statement.startswith('INSERT INTO tasks'):
+            inserts.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.post('/api/tasks/bulk?batch_size=2', json=[{'title': f'task {n}'} for n in range(5)])
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (5, 0)
+    # One multi-row INSERT per batch
+    assert len(inserts) == 3
+    for result in body['results']:
+        task = client.get(f"/api/tasks/{result['id']}").get_json()['task']
+        assert task['title'] == f"task {result['index']}"
+
+
+def test_invalid_items_are_reported_per_index(client):
+    response = client.post('/api/tasks/bulk', json=[
+        {'title': 'fine'},
+        {'title': ''},
+        'not an object',
+        {'title': 'bad date', 'due_date': 'someday'},
+    ])
+    assert response.status_code == 207
+    body = response.get_json()
+    assert body['success'] is False
+    assert (body['created'], body['failed']) == (1, 3)
+    assert [result['success'] for result in body['results']] == [True, False, False, False]
+    assert body['results'][3]['validation_errors'] == ['Invalid due_date format. Use ISO format.']
+    assert client.get('/api/tasks').get_json()['count'] == 1
+
+
+def test_all_invalid_items_give_400(client):
+    response = client.post('/api/tasks/bulk', json=[{'status': 'unknown'}])
+    assert response.status_code == 400
+    assert response.get_json()['created'] == 0
+
+
+def test_ndjson_bodies_are_streamed(client):
+    lines = [json.dumps({'title': 'one'}), '', '{broken', json.dumps({'title': 'two'})]
+    response = client.post('/api/tasks/bulk', data='\n'.join(lines), content_type='application/x-ndjson')
+    assert response.status_code == 207
+    assert [(result['index'], result['success']) for result in response.get_json()['results']] == [
+        (0, True), (1, False), (2, True)
+    ]
+    assert response.get_json()['results'][1]['validation_errors'] == ['Invalid JSON']
+
+
+def test_bad_bulk_requests_are_rejected(client):
+    assert client.post('/api/tasks/bulk', json={'title': 'not a list'}).status_code == 400
+    assert client.post('/api/tasks/bulk', json=[]).status_code == 400
+    assert client.post('/api/tasks/bulk?batch_size=0', json=[{'title': 'x'}]).status_code == 400
+    assert client.get('/api/tasks').get_json()['count'] == 0
+
+
+def test_bulk_comments(client, create_task):
+    task = create_task()
+    response = client.post(f"/api/tasks/{task['id']}/comments/bulk", json=[
+        {'content': 'first', 'author': 'ann'}, {'content': ''}, {'content': 'second'}
+    ])
+    assert response.status_code == 207
+    assert response.get_json()['created'] == 2
+
+    comments = client.get(f"/api/tasks/{task['id']}/comments").get_json()['comments']
+    assert sorted((comment['content'], comment['author']) for comment in comments) == [
+        ('first', 'ann'), ('second', 'Anonymous')
+    ]
+    assert client.post('/api/tasks/999/comments/bulk', json=[{'content': 'x'}]).status_code == 404
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.cache import response_cache
+from app.models.task import Task
+
+
+def test_writes_invalidate_the_cached_list(client, create_task):
+    task = create_task('first')
+    assert client.get('/api/tasks').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/tasks').headers['X-Cache'] == 'HIT'
+
+    create_task('second')
+    response = client.get('/api/tasks')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert {item['title'] for item in response.get_json()['tasks']} == {'first', 'second'}
+
+    client.put(f"/api/tasks/{task['id']}", json={'title': 'renamed'})
+    assert {item['title'] for item in client.get('/api/tasks').get_json()['tasks']} == {'renamed', 'second'}
+
+    client.delete(f"/api/tasks/{task['id']}")
+    assert [item['title'] for item in client.get('/api/tasks').get_json()['tasks']] == ['second']
+
+
+def test_comment_writes_invalidate_the_cached_task(client, create_task):
+    task = create_task()
+    assert client.get(f"/api/tasks/{task['id']}").get_json()['task']['comments_count'] == 0
+    client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'hi'})
+    assert client.get(f"/api/tasks/{task['id']}").get_json()['task']['comments_count'] == 1
+    assert client.get('/api/tasks/stats').get_json()['stats']['total_tasks'] == 1
+
+
+def test_deleted_and_archived_tasks_drop_their_counters(app, client, create_task):
+    kept, deleted, archived = (create_task(title)['id'] for title in ('kept', 'deleted', 'archived'))
+    for task_id in (kept, deleted, archived):
+        client.put(f'/api/tasks/{task_id}', json={'status': 'completed'})
+    counters = response_cache.backend._counters
+    assert {f'task:{task_id}' for task_id in (kept, deleted, archived)} <= set(counters)
+
+    # The archived task stays readable, and its cached copy from before the move is not served
+    assert client.get(f'/api/tasks/{archived}').get_json()['task'].get('archived') is None
+    client.delete(f'/api/tasks/{deleted}')
+    with app.app_context():
+        db.session.execute(db.update(Task).where(Task.id == archived).values(updated_at=datetime.utcnow() - timedelta(days=100)))
+        db.session.commit()
+    client.post('/api/tasks/archive', json={})
+
+    assert f'task:{kept}' in counters
+    assert f'task:{deleted}' not in counters and f'task:{archived}' not in counters
+    assert client.get(f'/api/tasks/{archived}').get_json()['task']['archived'] is True
+
+
+def test_cached_responses_revalidate_with_etag(client, create_task):
+    create_task()
+    etag = client.get('/api/tasks').headers['ETag']
+    response = client.get('/api/tasks', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_per_worker_state_is_short_lived_with_several_workers(make_app):
+    app = make_app(WEB_CONCURRENCY=4)
+    assert app.config['CACHE_DEFAULT_TTL'] == 2
+    assert app.config['STATS_REFRESH_INTERVAL'] == 2
+
+
+def test_single_worker_keeps_the_long_ttl(make_app):
+    app = make_app(WEB_CONCURRENCY=1)
+    assert app.config['CACHE_DEFAULT_TTL'] == 30
+    assert app.config['STATS_REFRESH_INTERVAL'] == 30
+
+
+def test_explicit_ttl_wins(make_app):
+    assert make_app(WEB_CONCURRENCY=4, CACHE_DEFAULT_TTL=10).config['CACHE_DEFAULT_TTL'] == 10
@@ -0,0 +1,79 @@
+import pytest
+
+from app.comment_pages import parse_embed
+
+
+@pytest.fixture
+def thread(client, create_task):
+    """A task with five comments; returns (task, comment ids oldest first)"""
+    task = create_task('threaded')
+    ids = [
+        client.post(f"/api/tasks/{task['id']}/comments", json={'content': f'comment {n}'}).get_json()['comment']['id']
+        for n in range(5)
+    ]
+    return task, ids
+
+
+def test_comment_pages_walk_newest_first(client, thread):
+    task, ids = thread
+    url = f"/api/tasks/{task['id']}/comments?limit=2"
+
+    seen, body = [], client.get(url).get_json()
+    seen += [comment['id'] for comment in body['comments']]
+    while body['next_cursor']:
+        body = client.get(f"{url}&cursor={body['next_cursor']}").get_json()
+        seen += [comment['id'] for comment in body['comments']]
+    assert seen == ids[::-1]
+
+
+def test_unpaged_comments_are_all_returned_without_a_cursor(client, thread):
+    task, ids = thread
+    body = client.get(f"/api/tasks/{task['id']}/comments").get_json()
+    assert body['count'] == 5
+    assert 'next_cursor' not in body
+
+
+def test_empty_pages_tell_missing_tasks_apart(client, create_task):
+    task = create_task()
+    assert client.get(f"/api/tasks/{task['id']}/comments").get_json()['comments'] == []
+    assert client.get('/api/tasks/999/comments').status_code == 404
+    assert client.get(f"/api/tasks/{task['id']}/comments?cursor=junk").status_code == 400
+
+
+def test_task_detail_embeds_the_newest_comments(client, thread):
+    task, ids = thread
+    url = f"/api/tasks/{task['id']}"
+
+    everything = client.get(url).get_json()
+    assert [comment['id'] for comment in everything['task']['comments']] == ids[::-1]
+    assert 'comments_next_cursor' not in everything
+
+    newest = client.get(f'{url}?embed=comments:2').get_json()
+    assert [comment['id'] for comment in newest['task']['comments']] == ids[:2:-1]
+    assert newest['task']['comments_count'] == 5
+    # The rest of the thread continues from the embedded page
+    rest = client.get(f"{url}/comments?cursor={newest['comments_next_cursor']}").get_json()
+    assert [comment['id'] for comment in rest['comments']] == ids[2::-1]
+
+    bare = client.get(f'{url}?embed=none').get_json()
+    assert 'comments' not in bare['task']
+    assert bare['task']['title'] == 'threaded'
+
+
+def test_task_without_comments_embeds_an_empty_page(client, create_task):
+    task = create_task()
+    body = client.get(f"/api/tasks/{task['id']}?embed=comments:3").get_json()
+    assert body['task']['comments'] == []
+    assert body['comments_next_cursor'] is None
+    assert client.get('/api/tasks/999?embed=comments:3').status_code == 404
+
+
+def test_parse_embed():
+    assert parse_embed(None) is None
+    assert parse_embed('comments') is None
+    assert parse_embed('none') == 0
+    assert parse_embed('comments:7') == 7
+    assert parse_embed('comments:100000') == 500
+    for value in ('comments:-1', 'comments:', 'author:3'):
+        with pytest.raises(ValueError):
+            parse_embed(value)
@@ -0,0 +1,101 @@
+from datetime import datetime
+
+from app import db
+from app.models.task import Task
+from app.scheduler import scheduler
+from app.stats import task_stats
+
+
+def due(client, query=''):
+    response = client.get(f'/api/tasks/due{query}')
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_open_tasks_in_range_soonest_first(client, create_task):
+    create_task('later', due_date='2030-01-20T09:00:00')
+    create_task('sooner', due_date='2030-01-05T09:00:00')
+    create_task('done', status='completed', due_date='2030-01-06T09:00:00')
+    create_task('outside', due_date='2030-03-01T09:00:00')
+    create_task('undated')
+
+    body = due(client, '?after=2030-01-01&before=2030-02-01')
+    assert [task['title'] for task in body['tasks']] == ['sooner', 'later']
+    assert body['next_cursor'] is None
+
+    body = due(client, '?after=2030-01-01&before=2030-02-01&include_completed=true')
+    assert [task['title'] for task in body['tasks']] == ['sooner', 'done', 'later']
+
+
+def test_timezone_offsets_are_converted_to_utc(client, create_task):
+    create_task('morning', due_date='2030-01-05T09:00:00')
+    # 10:00 at +02:00 is 08:00 UTC, before the task is due
+    assert due(client, '?after=2030-01-05T10:00:00%2B02:00')['count'] == 1
+    assert due(client, '?after=2030-01-05T12:00:00%2B02:00')['count'] == 0
+
+
+def test_due_dates_with_an_offset_are_stored_in_utc(client, create_task):
+    task = create_task('standup', due_date='2030-01-05T09:00:00+05:30')
+    assert task['due_date'].startswith('2030-01-05T03:30:00')
+    assert client.get(f"/api/tasks/{task['id']}").get_json()['task']['due_date'].startswith('2030-01-05T03:30:00')
+
+    # Ordered and filtered against due dates given in UTC
+    create_task('earlier', due_date='2030-01-05T04:00:00Z')
+    body = due(client, '?after=2030-01-05T03:00:00Z&before=2030-01-05T05:00:00Z')
+    assert [item['title'] for item in body['tasks']] == ['standup', 'earlier']
+
+    patched = client.patch(f"/api/tasks/{task['id']}", json={'due_date': '2030-01-05T09:00:00-02:00'}).get_json()['task']
+    assert patched['due_date'].startswith('2030-01-05T11:00:00')
+
+
+def test_due_pages_follow_the_cursor(client, create_task):
+    for day in range(1, 6):
+        create_task(f'day {day}', due_date=f'2030-01-0{day}T00:00:00')
+
+    seen, query = [], '?limit=2'
+    while True:
+        body = due(client, query)
+        seen += [task['title'] for task in body['tasks']]
+        if not body['next_cursor']:
+            break
+        query = f"?limit=2&cursor={body['next_cursor']}"
+    assert seen == [f'day {day}' for day in range(1, 6)]
+
+
+def test_day_and_week_buckets(client, create_task):
+    # 2030-01-07 is a Monday
+    for due_date in ('2030-01-07T08:00:00', '2030-01-07T20:00:00', '2030-01-09T08:00:00', '2030-01-14T08:00:00'):
+        create_task(due_date=due_date)
+
+    body = due(client, '?bucket=day&limit=1')
+    assert body['buckets'] == [
+        {'start': '2030-01-07', 'count': 2}, {'start': '2030-01-09', 'count': 1}, {'start': '2030-01-14', 'count': 1}
+    ]
+    # The counts cover the whole range, not just the page
+    assert body['count'] == 1
+    assert due(client, '?bucket=week')['buckets'] == [
+        {'start': '2030-01-07', 'count': 3}, {'start': '2030-01-14', 'count': 1}
+    ]
+
+
+def test_invalid_ranges_are_rejected(client):
+    assert client.get('/api/tasks/due?after=soon').status_code == 400
+    assert client.get('/api/tasks/due?after=2030-02-01&before=2030-01-01').status_code == 400
+    assert client.get('/api/tasks/due?bucket=month').status_code == 400
+
+
+def test_scheduler_refreshes_the_overdue_snapshot(make_app):
+    app = make_app(OVERDUE_REFRESH_INTERVAL=60)
+    with app.app_context():
+        db.session.execute(db.insert(Task).values(title='late', due_date=datetime(2000, 1, 1)))
+        db.session.commit()
+
+    # Run before any request, which would start the scheduler thread
+    scheduler.run_pending()
+    snapshot = task_stats._overdue
+    assert snapshot['total'] == 1
+
+    # Requests read the snapshot instead of counting again
+    client = app.test_client()
+    client.post('/api/tasks', json={'title': 'also late', 'due_date': '2000-01-01T00:00:00'})
+    assert client.get('/api/tasks/stats?breakdown=overdue').get_json()['stats']['overdue'] == snapshot
@@ -0,0 +1,42 @@
+import pytest
+
+from app import db
+from app.engine import engine_options, sqlite_pragmas
+
+
+def pragma(app, name):
+    with app.app_context():
+        return db.session.execute(db.text(f'PRAGMA {name}')).scalar()
+
+
+def test_production_profile_is_applied_to_connections(make_app):
+    app = make_app(SQLITE_PROFILE='production')
+    assert pragma(app, 'journal_mode') == 'wal'
+    assert pragma(app, 'busy_timeout') == 5000
+    assert pragma(app, 'synchronous') == 1  # NORMAL
+
+
+def test_pragmas_can_be_overridden_per_env_var(make_app):
+    app = make_app(SQLITE_PROFILE='production', SQLITE_BUSY_TIMEOUT_MS='1234')
+    assert pragma(app, 'busy_timeout') == 1234
+
+
+def test_default_profile_leaves_sqlite_alone(make_app):
+    app = make_app(SQLITE_PROFILE='default')
+    assert pragma(app, 'journal_mode') == 'delete'
+
+
+def test_invalid_pragmas_are_rejected(monkeypatch):
+    with pytest.raises(ValueError, match='Unknown SQLITE_PROFILE'):
+        sqlite_pragmas('fastest')
+    monkeypatch.setenv('SQLITE_JOURNAL_MODE', 'WAL; DROP TABLE tasks')
+    with pytest.raises(ValueError, match='journal_mode'):
+        sqlite_pragmas('production')
+
+
+def test_pool_settings_only_apply_to_server_databases(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '8')
+    assert 'pool_size' not in engine_options('sqlite:///tasks.db')
+    options = engine_options('postgresql://localhost/tasks')
+    assert options['pool_size'] == 8
+    assert options['pool_pre_ping'] is True
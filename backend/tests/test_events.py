@@ -0,0 +1,56 @@
+import logging
+
+from app.events import event_bus
+
+
+def read_events(client, last_event_id, wanted):
+    """Read SSE frames from last_event_id until one of type wanted arrives"""
+    response = client.get('/api/events', headers={'Last-Event-ID': str(last_event_id)}, buffered=False)
+    assert response.status_code == 200
+    frames = []
+    try:
+        for chunk in response.response:
+            frames.append(chunk.decode() if isinstance(chunk, bytes) else chunk)
+            if f'event: {wanted}' in frames[-1]:
+                break
+    finally:
+        response.close()
+    return frames
+
+
+def test_writes_are_streamed_to_event_clients(make_app):
+    client = make_app(EVENTS_STREAM_TIMEOUT=1).test_client()
+    before = event_bus._last_id
+    task = client.post('/api/tasks', json={'title': 'streamed'}).get_json()['task']
+
+    frames = read_events(client, before, 'task.created')
+    assert frames[0].startswith('retry:')
+    assert 'event: hello' in frames[1] and '"complete": true' in frames[1]
+    assert 'event: task.created' in frames[-1]
+    assert '"streamed"' in frames[-1]
+    assert f'"id":{task["id"]}' in frames[-1].replace(' ', '')
+
+
+def test_stream_resets_clients_that_missed_events(make_app):
+    client = make_app(EVENTS_STREAM_TIMEOUT=1, EVENTS_BUFFER_SIZE=1).test_client()
+    before = event_bus._last_id
+    client.post('/api/tasks', json={'title': 'one'})
+    client.post('/api/tasks', json={'title': 'two'})
+
+    assert 'event: reset' in read_events(client, before, 'reset')[-1]
+
+
+def test_memory_events_with_several_workers_warn(make_app, caplog):
+    with caplog.at_level(logging.WARNING):
+        make_app(WEB_CONCURRENCY=4)
+    assert 'EVENTS_BACKEND=memory with 4 workers' in caplog.text
+
+
+def test_streams_tell_clients_to_poll_without_a_shared_broker(make_app):
+    client = make_app(EVENTS_STREAM_TIMEOUT=1, WEB_CONCURRENCY=4).test_client()
+    assert event_bus.complete is False
+    client.post('/api/tasks', json={'title': 'streamed'})
+
+    frames = read_events(client, event_bus._last_id - 1, 'hello')
+    assert '"complete": false' in frames[-1]
+    assert 'id:' not in frames[-1]
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+
+from app.export import buffered
+
+
+def export(client, query=''):
+    response = client.get(f'/api/tasks/export{query}')
+    assert response.status_code == 200
+    assert response.is_streamed
+    return response
+
+
+def test_ndjson_export_with_comments(client, create_task):
+    first = create_task('first')
+    second = create_task('second', status='completed')
+    for content in ('a', 'b'):
+        client.post(f"/api/tasks/{first['id']}/comments", json={'content': content})
+
+    response = export(client, '?include_comments=true')
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=tasks.ndjson'
+    tasks = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [task['id'] for task in tasks] == [first['id'], second['id']]
+    assert [comment['content'] for comment in tasks[0]['comments']] == ['a', 'b']
+    assert tasks[1]['comments'] == []
+
+
+def test_ndjson_export_without_comments_is_filtered(client, create_task):
+    create_task('open')
+    create_task('done', status='completed', priority='high')
+    tasks = [json.loads(line) for line in export(client, '?status=completed').get_data(as_text=True).splitlines()]
+    assert [task['title'] for task in tasks] == ['done']
+    assert 'comments' not in tasks[0]
+
+
+def test_csv_export_has_one_row_per_comment(client, create_task):
+    task = create_task('commented')
+    create_task('quiet')
+    for content in ('a', 'b'):
+        client.post(f"/api/tasks/{task['id']}/comments", json={'content': content})
+
+    response = export(client, '?format=csv&include_comments=1')
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(row['title'], row['comment_content']) for row in rows] == [
+        ('commented', 'a'), ('commented', 'b'), ('quiet', '')
+    ]
+
+
+def test_unknown_format_is_rejected(client):
+    response = client.get('/api/tasks/export?format=xml')
+    assert response.status_code == 400
+    assert 'ndjson' in response.get_json()['error']
+
+
+def test_chunks_are_coalesced():
+    assert list(buffered(['ab', 'cd', 'e'], size=4)) == ['abcd', 'e']
+    assert list(buffered([], size=4)) == []
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.jobs import job_queue
+from app.models.job import Job
+
+RESPOND_ASYNC = {'Prefer': 'respond-async'}
+
+
+def job_status(client, response):
+    """Follow a 202's Location to the job resource"""
+    assert response.status_code == 202
+    assert response.headers['Preference-Applied'] == 'respond-async'
+    return client.get(response.headers['Location'])
+
+
+def test_async_delete_runs_as_a_job(client, create_task):
+    task = create_task()
+    response = client.delete(f"/api/tasks/{task['id']}", headers=RESPOND_ASYNC)
+
+    pending = job_status(client, response)
+    assert pending.get_json()['job']['status'] == 'queued'
+    assert pending.headers['Retry-After'] == '1'
+    # Nothing happens until a worker picks the job up
+    assert client.get(f"/api/tasks/{task['id']}").status_code == 200
+
+    assert job_queue.run_next() is True
+    done = job_status(client, response)
+    assert 'Retry-After' not in done.headers
+    assert done.get_json()['job']['status'] == 'succeeded'
+    assert done.get_json()['job']['result'] == {'id': task['id']}
+    assert client.get(f"/api/tasks/{task['id']}").status_code == 404
+    assert job_queue.run_next() is False
+
+
+def test_async_delete_of_a_missing_task_is_rejected_up_front(client):
+    assert client.delete('/api/tasks/999', headers=RESPOND_ASYNC).status_code == 404
+
+
+def test_async_bulk_import(client):
+    response = client.post('/api/tasks/bulk', headers=RESPOND_ASYNC, json=[{'title': 'a'}, {'title': ''}])
+    job_queue.run_next()
+
+    result = job_status(client, response).get_json()['job']['result']
+    assert (result['created'], result['failed']) == (1, 1)
+    assert [task['title'] for task in client.get('/api/tasks').get_json()['tasks']] == ['a']
+
+
+def test_failing_jobs_record_the_error(client, create_task):
+    task = create_task()
+    response = client.delete(f"/api/tasks/{task['id']}", headers=RESPOND_ASYNC)
+    # Deleted by someone else before the job ran
+    client.delete(f"/api/tasks/{task['id']}")
+
+    job_queue.run_next()
+    job = job_status(client, response).get_json()['job']
+    assert job['status'] == 'failed'
+    assert job['error'] == 'Task not found'
+
+
+def test_expired_leases_are_claimed_again_until_attempts_run_out(app, client, create_task):
+    task = create_task()
+    response = client.delete(f"/api/tasks/{task['id']}", headers=RESPOND_ASYNC)
+    job_id = response.get_json()['job']['id']
+
+    with app.app_context():
+        # A worker claims the job and its process dies
+        assert job_queue.claim().id == job_id
+        assert job_queue.claim() is None
+
+        expired = datetime.utcnow() - timedelta(seconds=1)
+        db.session.execute(db.update(Job).values(lease_expires_at=expired))
+        db.session.commit()
+        assert job_queue.claim().id == job_id
+
+        db.session.execute(db.update(Job).values(lease_expires_at=expired, attempts=job_queue.max_attempts))
+        db.session.commit()
+        assert job_queue.claim() is None
+
+    job = client.get(f'/api/jobs/{job_id}').get_json()['job']
+    assert job['status'] == 'failed'
+    assert 'Gave up after' in job['error']
+
+
+def test_unknown_jobs(client):
+    assert client.get('/api/jobs/999').status_code == 404
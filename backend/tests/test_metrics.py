@@ -0,0 +1,76 @@
+import logging
+import re
+
+from app.metrics import Counter, Histogram
+
+
+def sample(client, series):
+    """Read one sample from /api/metrics, 0 when the series was not recorded yet"""
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    match = re.search(rf'^{re.escape(series)} (\S+)$', response.get_data(as_text=True), re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_requests_are_counted_per_endpoint_and_status(client, create_task):
+    ok = 'http_requests_total{endpoint="tasks.get_tasks",method="GET",status="200"}'
+    missing = 'http_requests_total{endpoint="tasks.get_task",method="GET",status="404"}'
+    before_ok, before_missing = sample(client, ok), sample(client, missing)
+
+    create_task()
+    client.get('/api/tasks')
+    client.get('/api/tasks')
+    client.get('/api/tasks/999')
+
+    assert sample(client, ok) == before_ok + 2
+    assert sample(client, missing) == before_missing + 1
+    assert sample(client, 'http_request_db_queries_count{endpoint="tasks.get_task"}') >= 1
+
+
+def test_batch_subrequests_count_as_their_batch(client):
+    batched = 'http_requests_total{endpoint="tasks.get_tasks",method="GET",status="200"}'
+    batches = 'http_requests_total{endpoint="batch.batch",method="POST",status="200"}'
+    before_batched, before_batches = sample(client, batched), sample(client, batches)
+
+    client.post('/api/batch', json={'requests': [{'path': '/api/tasks'}, {'path': '/api/tasks?limit=1'}]})
+    assert sample(client, batched) == before_batched
+    assert sample(client, batches) == before_batches + 1
+
+
+def test_server_timing_reports_queries(make_app):
+    client = make_app(CACHE_BACKEND='none').test_client()
+    header = client.get('/api/tasks').headers['Server-Timing']
+    assert re.match(r'db;dur=[\d.]+;desc="1 queries", serialize;dur=[\d.]+, total;dur=[\d.]+$', header)
+
+    client = make_app(SERVER_TIMING='false').test_client()
+    assert 'Server-Timing' not in client.get('/api/tasks').headers
+
+
+def test_slow_queries_are_logged_and_counted(make_app, caplog):
+    client = make_app(SLOW_QUERY_LOG_MS='0.000001', CACHE_BACKEND='none').test_client()
+    series = 'db_slow_queries_total{endpoint="tasks.get_tasks"}'
+    before = sample(client, series)
+
+    with caplog.at_level(logging.WARNING):
+        client.get('/api/tasks')
+    assert sample(client, series) == before + 1
+    assert any('Slow query' in record.getMessage() and 'FROM tasks' in record.getMessage() for record in caplog.records)
+
+
+def test_collectors_render_the_exposition_format():
+    counter = Counter('jobs_total', 'Jobs run', ('kind',))
+    counter.inc('export')
+    counter.inc('export', amount=2)
+    assert counter.render()[2:] == ['jobs_total{kind="export"} 3']
+
+    histogram = Histogram('wait_seconds', 'Wait', buckets=(1, 5))
+    for value in (0.5, 2, 10):
+        histogram.observe(value)
+    assert histogram.render()[2:] == [
+        'wait_seconds_bucket{le="1"} 1',
+        'wait_seconds_bucket{le="5"} 2',
+        'wait_seconds_bucket{le="+Inf"} 3',
+        'wait_seconds_sum 12.5',
+        'wait_seconds_count 3',
+    ]
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from app import db
+from app.models.task import Task
+
+
+def collect_pages(client, url):
+    """Follow next_cursor from url until the last page; returns the pages"""
+    pages = []
+    response = client.get(url).get_json()
+    pages.append(response)
+    while response['next_cursor']:
+        response = client.get(f"{url}&cursor={response['next_cursor']}").get_json()
+        pages.append(response)
+    return pages
+
+
+def test_cursor_pages_cover_every_task_once_newest_first(client, create_task):
+    ids = [create_task(f'task {number}')['id'] for number in range(7)]
+
+    pages = collect_pages(client, '/api/tasks?limit=3')
+    assert [page['count'] for page in pages] == [3, 3, 1]
+    assert [task['id'] for page in pages for task in page['tasks']] == ids[::-1]
+    assert pages[-1]['next_cursor'] is None
+
+
+def test_cursor_breaks_created_at_ties_by_id(app, client, create_task):
+    ids = [create_task(f'task {number}')['id'] for number in range(5)]
+    with app.app_context():
+        db.session.execute(db.update(Task).values(created_at=datetime(2024, 1, 1)))
+        db.session.commit()
+
+    pages = collect_pages(client, '/api/tasks?limit=2')
+    assert [task['id'] for page in pages for task in page['tasks']] == ids[::-1]
+
+
+def test_cursor_pages_keep_the_filters(client, create_task):
+    for number in range(4):
+        create_task(f'task {number}', status='completed' if number % 2 else 'pending')
+
+    pages = collect_pages(client, '/api/tasks?status=completed&limit=1')
+    assert [task['title'] for page in pages for task in page['tasks']] == ['task 3', 'task 1']
+
+
+def test_unpaginated_list_has_no_cursor(client, create_task):
+    create_task()
+    response = client.get('/api/tasks').get_json()
+    assert response['count'] == 1
+    assert 'next_cursor' not in response
+
+
+def test_fields_project_the_items(client, create_task):
+    create_task('older')
+    create_task('projected', priority='high')
+    assert client.get('/api/tasks?fields=title,priority').get_json()['tasks'][0] == {
+        'title': 'projected', 'priority': 'high'
+    }
+
+    # The cursor columns are still loaded when they are not asked for
+    pages = collect_pages(client, '/api/tasks?fields=title&limit=1')
+    assert [page['tasks'] for page in pages] == [[{'title': 'projected'}], [{'title': 'older'}]]
+
+
+def test_invalid_parameters_are_rejected(client):
+    assert client.get('/api/tasks?cursor=not-a-cursor').status_code == 400
+    assert client.get('/api/tasks?limit=0').status_code == 400
+    assert client.get('/api/tasks?limit=many').status_code == 400
+    response = client.get('/api/tasks?fields=title,secret')
+    assert response.status_code == 400
+    assert 'secret' in response.get_json()['error']
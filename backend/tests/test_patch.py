@@ -0,0 +1,111 @@
+from app import db
+from app.models.task import Task
+
+
+def test_patch_changes_only_the_given_fields_and_bumps_the_version(client, create_task):
+    task = create_task('original', description='kept', priority='low')
+
+    response = client.patch(f"/api/tasks/{task['id']}", json={'status': 'completed'})
+    assert response.status_code == 200
+    patched = response.get_json()['task']
+    assert patched['status'] == 'completed'
+    assert (patched['title'], patched['description'], patched['priority']) == ('original', 'kept', 'low')
+    assert patched['version'] == task['version'] + 1
+    assert response.headers['ETag'] == f'"v{patched["version"]}"'
+
+
+def test_if_match_with_the_current_version_applies(client, create_task):
+    task = create_task()
+    response = client.patch(f"/api/tasks/{task['id']}", json={'title': 'renamed'},
+                            headers={'If-Match': f'"v{task["version"]}"'})
+    assert response.status_code == 200
+    assert response.get_json()['task']['title'] == 'renamed'
+
+
+def test_if_match_with_a_stale_version_is_rejected(client, create_task):
+    task = create_task('original')
+    stale = f'"v{task["version"]}"'
+    client.patch(f"/api/tasks/{task['id']}", json={'title': 'first writer'})
+
+    response = client.patch(f"/api/tasks/{task['id']}", json={'title': 'second writer'}, headers={'If-Match': stale})
+    assert response.status_code == 412
+    assert response.get_json()['current_version'] == task['version'] + 1
+    assert response.headers['ETag'] == f'"v{task["version"] + 1}"'
+    assert client.get(f"/api/tasks/{task['id']}").get_json()['task']['title'] == 'first writer'
+
+
+def test_if_match_star_and_unknown_tags(client, create_task):
+    task = create_task()
+    assert client.patch(f"/api/tasks/{task['id']}", json={'title': 'any'}, headers={'If-Match': '*'}).status_code == 200
+    assert client.patch(f"/api/tasks/{task['id']}", json={'title': 'x'}, headers={'If-Match': '"abc"'}).status_code == 412
+
+
+def test_put_bumps_the_version_too(client, create_task):
+    task = create_task()
+    updated = client.put(f"/api/tasks/{task['id']}", json={'title': 'put'}).get_json()['task']
+    assert updated['version'] == task['version'] + 1
+    response = client.patch(f"/api/tasks/{task['id']}", json={'title': 'stale'},
+                            headers={'If-Match': f'"v{task["version"]}"'})
+    assert response.status_code == 412
+
+
+def test_put_racing_a_concurrent_patch_is_a_conflict(app, client, create_task, monkeypatch):
+    task = create_task('original')
+    validate = Task.validate
+
+    def validate_after_a_concurrent_patch(self):
+        # Lands between the PUT's read and its flush, on a connection of its own
+        with db.engine.begin() as connection:
+            connection.execute(db.update(Task).where(Task.id == task['id']).values(title='patched', version=Task.version + 1))
+        return validate(self)
+
+    monkeypatch.setattr(Task, 'validate', validate_after_a_concurrent_patch)
+    response = client.put(f"/api/tasks/{task['id']}", json={'title': 'put'})
+    monkeypatch.undo()
+
+    assert response.status_code == 409
+    assert response.get_json()['current_version'] == task['version'] + 1
+    assert response.headers['ETag'] == f'"v{task["version"] + 1}"'
+    assert client.get(f"/api/tasks/{task['id']}").get_json()['task']['title'] == 'patched'
+
+
+def test_prefer_return_minimal(client, create_task):
+    task = create_task()
+    response = client.patch(f"/api/tasks/{task['id']}", json={'priority': 'high'},
+                            headers={'Prefer': 'return=minimal'})
+    assert response.status_code == 204
+    assert response.data == b''
+    assert response.headers['Preference-Applied'] == 'return=minimal'
+    assert response.headers['ETag'] == f'"v{task["version"] + 1}"'
+    assert client.get(f"/api/tasks/{task['id']}").get_json()['task']['priority'] == 'high'
+
+
+def test_patch_validation(client, create_task):
+    task = create_task()
+    assert client.patch('/api/tasks/999', json={'title': 'missing'}).status_code == 404
+    assert client.patch(f"/api/tasks/{task['id']}", json={'id': 5}).status_code == 400
+    response = client.patch(f"/api/tasks/{task['id']}", json={'status': 'unknown'})
+    assert response.status_code == 400
+    assert response.get_json()['validation_errors']
+
+
+def test_patch_invalidates_the_cached_task(client, create_task):
+    task = create_task('cached')
+    assert client.get(f"/api/tasks/{task['id']}").headers['X-Cache'] == 'MISS'
+    client.patch(f"/api/tasks/{task['id']}", json={'title': 'fresh'})
+    assert client.get(f"/api/tasks/{task['id']}").get_json()['task']['title'] == 'fresh'
+
+
+def test_comment_patch_with_if_match(client, create_task):
+    task = create_task()
+    comment = client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'first'}).get_json()['comment']
+    etag = f'"v{comment["version"]}"'
+
+    response = client.patch(f"/api/comments/{comment['id']}", json={'content': 'edited'}, headers={'If-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['comment']['content'] == 'edited'
+    assert response.get_json()['comment']['author'] == comment['author']
+
+    response = client.patch(f"/api/comments/{comment['id']}", json={'content': 'late'}, headers={'If-Match': etag})
+    assert response.status_code == 412
+    assert response.get_json()['current_version'] == comment['version'] + 1
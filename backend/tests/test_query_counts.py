@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app import db
+
+
+@contextmanager
+def count_statements(app):
+    """Collect the SQL statements executed on the app's engine"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def seed_tasks_with_comments(client, count, comments_per_task=2):
+    for number in range(count):
+        task = client.post('/api/tasks', json={'title': f'task {number}'}).get_json()['task']
+        for comment in range(comments_per_task):
+            client.post(f"/api/tasks/{task['id']}/comments", json={'content': f'comment {comment}'})
+
+
+def list_statements(app, client, query='/api/tasks'):
+    with count_statements(app) as statements:
+        response = client.get(query)
+    assert response.status_code == 200
+    return response, statements
+
+
+def test_task_list_query_count_does_not_grow_with_tasks(app, client):
+    seed_tasks_with_comments(client, 1)
+    response, one = list_statements(app, client)
+    assert response.get_json()['tasks'][0]['comments_count'] == 2
+
+    seed_tasks_with_comments(client, 24)
+    response, many = list_statements(app, client)
+    tasks = response.get_json()['tasks']
+    assert len(tasks) == 25
+    assert {task['comments_count'] for task in tasks} == {2}
+
+    # Comment counts come from the same SELECT, not one query per task
+    assert len(many) == len(one)
+    assert len(many) == 1
+
+
+def test_filtered_and_paged_lists_use_constant_queries(app, client):
+    seed_tasks_with_comments(client, 10, comments_per_task=1)
+
+    _, first = list_statements(app, client, '/api/tasks?status=pending&limit=3')
+    _, full = list_statements(app, client, '/api/tasks?status=pending&limit=10')
+    assert len(first) == len(full)
+
+
+def test_task_detail_with_comments_uses_constant_queries(app, client):
+    seed_tasks_with_comments(client, 2, comments_per_task=1)
+    seed_tasks_with_comments(client, 1, comments_per_task=15)
+
+    _, few = list_statements(app, client, '/api/tasks/1?embed=comments')
+    response, many = list_statements(app, client, '/api/tasks/3?embed=comments')
+    assert len(response.get_json()['task']['comments']) == 15
+    assert len(many) == len(few)
@@ -0,0 +1,18 @@
+from app import db
+from app.migrations.plans import check_query_plans, explain, is_full_scan
+from app.models.task import Task
+
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        plans = list(check_query_plans())
+
+    assert plans
+    full_scans = {name: plan for name, plan, full_scan in plans if full_scan}
+    assert not full_scans, f'Queries falling back to a full table scan: {full_scans}'
+
+
+def test_unindexed_filter_is_reported_as_a_full_scan(app):
+    with app.app_context():
+        plan = explain(db.session.query(Task.id).filter(Task.description == 'x'))
+    assert any(is_full_scan(detail) for detail in plan)
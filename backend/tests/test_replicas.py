@@ -0,0 +1,124 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.cache import response_cache
+from app.models.change_log import ChangeLog
+from app.replicas import replica_router
+
+
+def served_by(response):
+    """replica_N when the request read from a replica, otherwise primary"""
+    for metric in response.headers.get('Server-Timing', '').split(', '):
+        if metric.startswith('db;') and ' on ' in metric:
+            return metric.split(' on ', 1)[1].rstrip('"')
+    return 'primary'
+
+
+def make_replicated(make_app, tmp_path, **env):
+    """App with one replica file; returns (app, client, replicate, check)"""
+    primary, replica = tmp_path / 'test.db', tmp_path / 'replica.db'
+    # Checks run by hand, so the scheduler's own check never interferes
+    app = make_app(**{
+        'DATABASE_REPLICA_URLS': f'sqlite:///{replica}',
+        'REPLICA_MAX_LAG_SECONDS': 5,
+        'REPLICA_CHECK_INTERVAL': 3600,
+        'CACHE_BACKEND': 'none',
+        'SERVER_TIMING': 'true',
+        **env
+    })
+
+    def replicate():
+        with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+            source.backup(target)
+
+    def check():
+        with app.app_context():
+            replica_router.check()
+
+    return app, app.test_client(), replicate, check
+
+
+@pytest.fixture
+def replicated(make_app, tmp_path):
+    return make_replicated(make_app, tmp_path)
+
+
+def test_reads_go_to_a_checked_replica_and_writes_to_the_primary(replicated):
+    app, client, replicate, check = replicated
+    task = client.post('/api/tasks', json={'title': 'replicated'}).get_json()['task']
+    assert served_by(client.get('/api/tasks')) == 'primary'
+
+    replicate()
+    check()
+    assert served_by(client.get('/api/tasks')) == 'replica_0'
+    assert served_by(client.get(f"/api/tasks/{task['id']}")) == 'replica_0'
+    assert served_by(client.get(f"/api/tasks/{task['id']}/comments")) == 'replica_0'
+    assert served_by(client.post('/api/tasks', json={'title': 'written'})) == 'primary'
+    # Blueprints that were not registered with route_reads stay on the primary
+    assert served_by(client.get('/api/sync')) == 'primary'
+
+
+def test_lagging_replicas_are_skipped(replicated):
+    app, client, replicate, check = replicated
+    replicate()
+    client.post('/api/tasks', json={'title': 'not replicated yet'})
+    check()
+    assert served_by(client.get('/api/tasks')) == 'replica_0'
+
+    # The unreplayed write is now older than REPLICA_MAX_LAG_SECONDS
+    with app.app_context():
+        db.session.execute(db.update(ChangeLog).values(changed_at=datetime.utcnow() - timedelta(seconds=60)))
+        db.session.commit()
+    check()
+    assert served_by(client.get('/api/tasks')) == 'primary'
+
+    replicate()
+    check()
+    assert served_by(client.get('/api/tasks')) == 'replica_0'
+
+
+def test_replica_reads_right_after_a_write_are_not_cached(make_app, tmp_path):
+    app, client, replicate, check = make_replicated(make_app, tmp_path, CACHE_BACKEND='memory')
+    replicate()
+    check()
+
+    client.post('/api/tasks', json={'title': 'not replicated yet'})
+    stale = client.get('/api/tasks')
+    assert (served_by(stale), stale.get_json()['count']) == ('replica_0', 0)
+    # Within the lag window the stale page is not kept for the whole entry TTL
+    assert client.get('/api/tasks').headers['X-Cache'] == 'MISS'
+
+    replicate()
+    response_cache.backend._marks.clear()
+    assert client.get('/api/tasks').get_json()['count'] == 1
+    assert client.get('/api/tasks').headers['X-Cache'] == 'HIT'
+
+
+def test_unreachable_replicas_fall_back_to_the_primary(replicated, tmp_path):
+    app, client, replicate, check = replicated
+    replicate()
+    check()
+
+    os.remove(tmp_path / 'replica.db')
+    with app.app_context():
+        replica_router.engines[0].dispose()
+    check()
+    assert replica_router.replicas[0]['healthy'] is False
+    assert served_by(client.get('/api/tasks')) == 'primary'
+
+
+def test_stale_checks_make_the_replica_unavailable(replicated):
+    app, client, replicate, check = replicated
+    replicate()
+    check()
+    replica_router.replicas[0]['checked_at'] -= 4 * replica_router.check_interval
+    assert replica_router.pick() is None
+
+
+def test_no_replicas_configured(client):
+    assert replica_router.replicas == []
+    assert served_by(client.get('/api/tasks')) == 'primary'
@@ -0,0 +1,64 @@
+from app.search import fts5_query
+
+
+def search(client, query):
+    response = client.get(f'/api/tasks/search?{query}')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def titles(body):
+    return [task['title'] for task in body['tasks']]
+
+
+def test_title_matches_rank_above_description_matches(client, create_task):
+    create_task('Write docs', description='mention the deploy script')
+    create_task('Deploy release', description='ship it')
+    create_task('Unrelated')
+
+    body = search(client, 'q=deploy')
+    assert titles(body) == ['Deploy release', 'Write docs']
+    assert body['tasks'][0]['score'] <= body['tasks'][1]['score']
+
+
+def test_comments_find_their_task_and_prefixes_match(client, create_task):
+    task = create_task('Quiet title')
+    client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'the migration failed overnight'})
+    assert titles(search(client, 'q=migrat')) == ['Quiet title']
+
+
+def test_index_follows_updates_and_deletes(client, create_task):
+    task = create_task('Old name')
+    client.put(f"/api/tasks/{task['id']}", json={'title': 'New name'})
+    assert titles(search(client, 'q=old')) == []
+    assert titles(search(client, 'q=new')) == ['New name']
+
+    client.delete(f"/api/tasks/{task['id']}")
+    assert titles(search(client, 'q=new')) == []
+
+
+def test_results_are_paged_by_offset(client, create_task):
+    for number in range(3):
+        create_task(f'report {number}')
+
+    first = search(client, 'q=report&limit=2')
+    assert first['count'] == 2
+    assert first['next_offset'] == 2
+    last = search(client, 'q=report&limit=2&offset=2')
+    assert last['count'] == 1
+    assert last['next_offset'] is None
+    assert set(titles(first) + titles(last)) == {'report 0', 'report 1', 'report 2'}
+
+
+def test_query_syntax_is_neutralised(client, create_task):
+    create_task('AND OR NOT')
+    assert fts5_query('a "b" NEAR(c') == '"a" "b" "NEAR" "c"*'
+    assert fts5_query('***') is None
+    assert search(client, 'q=%22NOT%22%20OR')['count'] == 1
+    assert search(client, 'q=***')['count'] == 0
+
+
+def test_bad_search_requests_are_rejected(client):
+    assert client.get('/api/tasks/search').status_code == 400
+    assert client.get('/api/tasks/search?q=x&offset=-1').status_code == 400
+    assert client.get('/api/tasks/search?q=x&limit=abc').status_code == 400
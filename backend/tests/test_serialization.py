@@ -0,0 +1,40 @@
+import json
+from collections import namedtuple
+from datetime import datetime
+
+from app import serialization
+from app.models.task import Task
+from app.serialization import rows_to_dicts
+
+
+def test_list_items_match_to_dict(app, client, create_task):
+    task = create_task('serialized', description='body', due_date='2030-01-02T03:04:05')
+    client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'hi'})
+
+    item = client.get('/api/tasks').get_json()['tasks'][0]
+    with app.app_context():
+        expected = json.loads(app.json.dumps(Task.query.get(task['id']).to_dict()))
+    assert item == expected
+    assert item['comments_count'] == 1
+    assert item['due_date'] == '2030-01-02T03:04:05'
+
+
+def test_stdlib_fallback_encodes_the_same_body(app, client, create_task, monkeypatch):
+    create_task('fallback', due_date='2030-01-02T03:04:05')
+    with_orjson = client.get('/api/tasks?fields=id,title,due_date,created_at')
+
+    monkeypatch.setattr(serialization, 'orjson', None)
+    with app.test_request_context('/api/tasks'):
+        without_orjson = app.json.response(with_orjson.get_json())
+    assert json.loads(without_orjson.get_data()) == with_orjson.get_json()
+    assert app.json.dumps({'at': datetime(2024, 5, 6, 7, 8, 9)}).replace(' ', '') == '{"at":"2024-05-06T07:08:09"}'
+
+
+def test_rows_to_dicts_picks_the_requested_fields():
+    Row = namedtuple('Row', ['id', 'created_at', 'title'])
+    rows = [Row(1, 'then', 'a'), Row(2, 'now', 'b')]
+    assert rows_to_dicts(rows, ['id', 'created_at', 'title']) == [
+        {'id': 1, 'created_at': 'then', 'title': 'a'}, {'id': 2, 'created_at': 'now', 'title': 'b'}
+    ]
+    assert rows_to_dicts(rows, ['title']) == [{'title': 'a'}, {'title': 'b'}]
+    assert rows_to_dicts([], ['title']) == []
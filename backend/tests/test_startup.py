@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import pytest
+
+import migrate
+from app import create_app, db, migrations
+from app.warmup import warm_up
+from tests.conftest import TEST_ENV
+
+
+def test_create_app_leaves_the_schema_alone(tmp_path, monkeypatch):
+    for name, value in {**TEST_ENV, 'DATABASE_URL': f"sqlite:///{tmp_path / 'fresh.db'}"}.items():
+        monkeypatch.setenv(name, value)
+    app = create_app()
+    with app.app_context():
+        assert db.inspect(db.engine).get_table_names() == []
+
+    assert migrate.main() == 0
+    with app.app_context():
+        assert 'tasks' in db.inspect(db.engine).get_table_names()
+        assert migrations.upgrade() == []
+        db.engine.dispose()
+
+
+def test_failed_migrations_leave_no_schema_changes(make_app, monkeypatch):
+    def upgrade(connection):
+        connection.execute(db.text('CREATE TABLE half_done (id INTEGER)'))
+        raise RuntimeError('migration failed')
+
+    app = make_app()
+    broken = SimpleNamespace(revision='9999', description='fails halfway', upgrade=upgrade)
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS + [broken])
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            migrations.upgrade()
+        assert 'half_done' not in db.inspect(db.engine).get_table_names()
+        assert migrations.pending_migrations() == [broken]
+
+
+def test_warm_up_compiles_the_hot_statements(make_app):
+    app = make_app(CACHE_BACKEND='none')
+    client = app.test_client()
+    task = client.post('/api/tasks', json={'title': 'warm'}).get_json()['task']
+    client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'hi'})
+
+    with app.app_context():
+        assert 'tasks.list' in warm_up()
+        # Connections are closed so forked workers never share them
+        assert db.engine.pool.checkedout() == 0
+        compiled = set(db.engine._compiled_cache)
+
+    for url in ('/api/tasks?limit=5', '/api/tasks?status=pending&limit=5', f"/api/tasks/{task['id']}",
+                f"/api/tasks/{task['id']}?embed=comments:20", f"/api/tasks/{task['id']}/comments?limit=20"):
+        assert client.get(url).status_code == 200
+
+    with app.app_context():
+        assert set(db.engine._compiled_cache) == compiled
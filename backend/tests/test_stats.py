@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.task import Task
+from app.stats import task_stats
+
+
+def get_stats(client, breakdown=None):
+    url = f'/api/tasks/stats?breakdown={breakdown}' if breakdown else '/api/tasks/stats'
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.get_json()['stats']
+
+
+def rebuilt_stats(app):
+    """The summary computed from scratch with a fresh GROUP BY"""
+    with app.app_context():
+        task_stats.invalidate()
+        return task_stats.summary(['matrix'])
+
+
+def test_counts_follow_every_kind_of_write(app, client, create_task):
+    pending = create_task('pending', priority='high')
+    doing = create_task('doing', status='in_progress')
+    create_task('done', status='completed', priority='low')
+    assert get_stats(client)['total_tasks'] == 3
+
+    client.put(f"/api/tasks/{pending['id']}", json={'status': 'completed'})
+    client.patch(f"/api/tasks/{doing['id']}", json={'priority': 'low'})
+    client.delete(f"/api/tasks/{pending['id']}")
+
+    stats = get_stats(client, 'matrix')
+    assert stats['total_tasks'] == 2
+    assert stats['by_status'] == {'pending': 0, 'in_progress': 1, 'completed': 1}
+    assert stats['by_priority'] == {'low': 2, 'medium': 0, 'high': 0}
+    assert stats['matrix']['in_progress']['low'] == 1
+    assert stats == rebuilt_stats(app)
+
+
+def test_bulk_created_tasks_are_counted(client):
+    client.post('/api/tasks/bulk', json=[{'title': 'a'}, {'title': 'b', 'status': 'completed'}])
+    stats = get_stats(client)
+    assert stats['total_tasks'] == 2
+    assert stats['by_status']['completed'] == 1
+
+
+def test_overdue_breakdown(client, create_task):
+    now = datetime.utcnow()
+    create_task('late', priority='high', due_date=(now - timedelta(days=2)).isoformat())
+    create_task('late but done', status='completed', due_date=(now - timedelta(days=2)).isoformat())
+    create_task('soon', due_date=(now + timedelta(days=3)).isoformat())
+    create_task('later', due_date=(now + timedelta(days=30)).isoformat())
+
+    overdue = get_stats(client, 'overdue')['overdue']
+    assert overdue['total'] == 1
+    assert overdue['by_priority']['high'] == 1
+    assert overdue['due_within_week'] == 1
+
+
+def test_unknown_breakdown_is_rejected(client):
+    response = client.get('/api/tasks/stats?breakdown=matrix,weekly')
+    assert response.status_code == 400
+    assert 'weekly' in response.get_json()['error']
+
+
+def test_stale_view_is_rebuilt(app, create_task):
+    create_task()
+    with app.app_context():
+        assert task_stats.summary()['total_tasks'] == 1
+        # A write made by another worker never reaches this worker's counters
+        db.session.execute(db.insert(Task).values(title='elsewhere'))
+        db.session.commit()
+        assert task_stats.summary()['total_tasks'] == 1
+
+        task_stats._loaded_at -= task_stats.refresh_interval
+        assert task_stats.summary()['total_tasks'] == 2
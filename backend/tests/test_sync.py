@@ -0,0 +1,78 @@
+def sync(client, since=0, limit=None):
+    url = f'/api/sync?since={since}' + (f'&limit={limit}' if limit else '')
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_first_sync_is_a_full_snapshot(client, create_task):
+    task = create_task('first')
+    comment = client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'hi'}).get_json()['comment']
+
+    body = sync(client)
+    assert [item['id'] for item in body['tasks']] == [task['id']]
+    assert body['tasks'][0]['comments_count'] == 1
+    assert [item['id'] for item in body['comments']] == [comment['id']]
+    assert body['deleted'] == {'tasks': [], 'comments': []}
+    assert body['has_more'] is False
+
+    # Nothing changed since the watermark
+    again = sync(client, body['watermark'])
+    assert (again['tasks'], again['comments'], again['watermark']) == ([], [], body['watermark'])
+
+
+def test_only_changes_after_the_watermark_are_returned(client, create_task):
+    first = create_task('first')
+    create_task('second')
+    watermark = sync(client)['watermark']
+
+    client.put(f"/api/tasks/{first['id']}", json={'title': 'edited'})
+    client.patch(f"/api/tasks/{first['id']}", json={'priority': 'high'})
+    third = create_task('third')
+
+    body = sync(client, watermark)
+    # Each entity shows up once, with its current state
+    assert sorted((item['id'], item['title']) for item in body['tasks']) == [(first['id'], 'edited'), (third['id'], 'third')]
+    assert body['watermark'] > watermark
+
+
+def test_deletes_leave_tombstones(client, create_task):
+    task = create_task()
+    comment = client.post(f"/api/tasks/{task['id']}/comments", json={'content': 'hi'}).get_json()['comment']
+    watermark = sync(client)['watermark']
+
+    client.delete(f"/api/tasks/{task['id']}")
+    body = sync(client, watermark)
+    assert body['tasks'] == []
+    assert body['deleted'] == {'tasks': [task['id']], 'comments': [comment['id']]}
+
+
+def test_changes_are_paged_by_watermark(client, create_task):
+    ids = [create_task(f'task {number}')['id'] for number in range(5)]
+
+    seen, watermark, pages = [], 0, 0
+    while True:
+        body = sync(client, watermark, limit=2)
+        seen += [item['id'] for item in body['tasks']]
+        watermark = body['watermark']
+        pages += 1
+        if not body['has_more']:
+            break
+    assert sorted(seen) == ids
+    assert pages == 3
+
+
+def test_invalid_watermarks_are_rejected(client):
+    assert client.get('/api/sync?since=-1').status_code == 400
+    assert client.get('/api/sync?since=yesterday').status_code == 400
+    assert client.get('/api/sync?limit=0').status_code == 400
+
+
+def test_latest_returns_only_the_current_watermark(client, create_task):
+    create_task()
+    body = client.get('/api/sync?since=latest').get_json()
+    assert (body['tasks'], body['has_more']) == ([], False)
+    assert body['watermark'] == sync(client)['watermark']
+
+    task = create_task('after')
+    assert [item['id'] for item in sync(client, body['watermark'])['tasks']] == [task['id']]
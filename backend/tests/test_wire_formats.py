@@ -0,0 +1,110 @@
+import gzip
+import json
+from datetime import datetime
+
+import brotli
+import msgpack
+
+from app.serialization import COLUMNAR_MIMETYPE, MSGPACK_MIMETYPE
+
+
+def test_json_is_the_default(client, create_task):
+    create_task()
+    response = client.get('/api/tasks')
+    assert response.mimetype == 'application/json'
+    assert 'Accept' in response.vary
+    assert response.get_json()['count'] == 1
+
+
+def test_msgpack_is_negotiated(client, create_task):
+    task = create_task('packed')
+    response = client.get('/api/tasks', headers={'Accept': MSGPACK_MIMETYPE})
+    assert response.mimetype == MSGPACK_MIMETYPE
+
+    body = msgpack.unpackb(response.data, timestamp=3)
+    assert body['tasks'][0]['title'] == 'packed'
+    assert body['tasks'][0]['id'] == task['id']
+    # Datetimes travel as MessagePack timestamps instead of strings
+    assert isinstance(body['tasks'][0]['created_at'], datetime)
+
+
+def test_columnar_json_is_negotiated(client, create_task):
+    create_task('first')
+    create_task('second')
+    response = client.get('/api/tasks?fields=id,title', headers={'Accept': COLUMNAR_MIMETYPE})
+    assert response.mimetype == COLUMNAR_MIMETYPE
+
+    tasks = json.loads(response.data)['tasks']
+    assert tasks['columns'] == ['id', 'title']
+    assert [row[1] for row in tasks['rows']] == ['second', 'first']
+
+
+def test_json_is_preferred_when_accepted_equally(client, create_task):
+    create_task()
+    response = client.get('/api/tasks', headers={'Accept': f'{MSGPACK_MIMETYPE}, application/json'})
+    assert response.mimetype == 'application/json'
+
+
+def test_each_format_is_cached_separately(client, create_task):
+    create_task()
+    assert client.get('/api/tasks').headers['X-Cache'] == 'MISS'
+
+    response = client.get('/api/tasks', headers={'Accept': MSGPACK_MIMETYPE})
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.mimetype == MSGPACK_MIMETYPE
+
+    response = client.get('/api/tasks', headers={'Accept': MSGPACK_MIMETYPE})
+    assert response.headers['X-Cache'] == 'HIT'
+    assert response.mimetype == MSGPACK_MIMETYPE
+    assert msgpack.unpackb(response.data, timestamp=3)['count'] == 1
+    assert client.get('/api/tasks').get_json()['count'] == 1
+
+
+def test_other_blueprints_and_batch_subresponses_stay_json(client, create_task):
+    task = create_task()
+    assert client.get('/api/health', headers={'Accept': MSGPACK_MIMETYPE}).mimetype == 'application/json'
+
+    response = client.post('/api/batch', headers={'Accept': MSGPACK_MIMETYPE}, json={'requests': [
+        {'path': f"/api/tasks/{task['id']}", 'headers': {'Accept': MSGPACK_MIMETYPE}}
+    ]})
+    assert response.mimetype == 'application/json'
+    assert response.get_json()['responses'][0]['body']['task']['id'] == task['id']
+
+
+def test_large_responses_are_compressed(client, create_task):
+    for number in range(20):
+        create_task(f'task {number}', description='x' * 100)
+
+    response = client.get('/api/tasks', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert json.loads(gzip.decompress(response.data))['count'] == 20
+
+    response = client.get('/api/tasks', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(response.data))['count'] == 20
+
+
+def test_small_responses_are_sent_uncompressed(client, create_task):
+    task = create_task()
+    response = client.get(f"/api/tasks/{task['id']}", headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['task']['id'] == task['id']
+
+
+def test_streamed_exports_are_compressed(client, create_task):
+    for number in range(3):
+        create_task(f'task {number}')
+
+    response = client.get('/api/tasks/export', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert sorted(json.loads(line)['title'] for line in lines) == ['task 0', 'task 1', 'task 2']
+
+
+def test_compression_can_be_turned_off(make_app):
+    client = make_app(COMPRESSION='false').test_client()
+    for number in range(20):
+        client.post('/api/tasks', json={'title': f'task {number}', 'description': 'x' * 100})
+    assert 'Content-Encoding' not in client.get('/api/tasks', headers={'Accept-Encoding': 'gzip'}).headers
@@ -1,9 +1,14 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import TaskList from './components/TaskList';
 import TaskModal from './components/TaskModal';
 import TaskDetails from './components/TaskDetails';
 import About from './components/About';
-import { getTasks, createTask, updateTask, deleteTask } from './services/api';
+import {
+  getTasks, getTasksByIds, createTask, updateTask, deleteTask, getChanges, subscribeToEvents
+} from './services/api';
+
+// Poll interval for changes the event stream can't deliver
+const BACKGROUND_REFRESH_MS = 30000;
 
 function App() {
   const [tasks, setTasks] = useState([]);
@@ -21,16 +26,30 @@ function App() {
   const [statusFilter, setStatusFilter] = useState('all');
   const [priorityFilter, setPriorityFilter] = useState('all');
 
+  // Set when the event stream misses other workers' changes; they are then polled from /api/sync
+  const [pollChanges, setPollChanges] = useState(false);
+  const pollChangesRef = useRef(false);
+  const watermarkRef = useRef(null);
+
+  const matchesFilters = (task) =>
+    (statusFilter === 'all' || task.status === statusFilter) &&
+    (priorityFilter === 'all' || task.priority === priorityFilter);
+
   // Load tasks on component mount
   useEffect(() => {
     loadTasks();
   // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
-  const loadTasks = async () => {
+  // Background refreshes keep the current list on screen instead of the loading state
+  const loadTasks = async ({ background = false } = {}) => {
     try {
-      setLoading(true);
+      if (!background) setLoading(true);
       console.log('Loading tasks from API...');
+      // Taken before the list, so polling picks up anything written in between
+      if (pollChangesRef.current) {
+        watermarkRef.current = (await getChanges('latest')).data.watermark;
+      }
       const response = await getTasks(statusFilter, priorityFilter);
       console.log('API Response:', response);
       setTasks(response.data.tasks);
@@ -51,6 +70,99 @@ function App() {
   // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [statusFilter, priorityFilter]);
 
+  // Apply changes pushed by the server instead of refetching the list
+  useEffect(() => {
+    const adjustCommentsCount = (taskId, delta) => {
+      setTasks(prev => prev.map(task =>
+        task.id === taskId ? { ...task, comments_count: task.comments_count + delta } : task
+      ));
+    };
+
+    return subscribeToEvents({
+      'hello': ({ complete }) => {
+        if (complete === !pollChangesRef.current) return;
+        pollChangesRef.current = !complete;
+        setPollChanges(!complete);
+        // Reload once to take a watermark along with the list
+        if (!complete) loadTasks({ background: true });
+      },
+      'task.created': (task) => {
+        if (!matchesFilters(task)) return;
+        setTasks(prev => prev.some(existing => existing.id === task.id) ? prev : [task, ...prev]);
+      },
+      // Updates may carry only the changed fields, so merge them into the loaded task
+      'task.updated': (changes) => {
+        setTasks(prev => prev
+          .map(task => task.id === changes.id ? { ...task, ...changes } : task)
+          .filter(matchesFilters));
+      },
+      'task.deleted': ({ id }) => {
+        setTasks(prev => prev.filter(task => task.id !== id));
+      },
+      // Archived tasks leave the default list
+      'tasks.archived': ({ ids }) => {
+        setTasks(prev => prev.filter(task => !ids.includes(task.id)));
+      },
+      'comment.created': (comment) => adjustCommentsCount(comment.task_id, 1),
+      'comment.deleted': (comment) => adjustCommentsCount(comment.task_id, -1),
+      'comment.bulk_created': ({ task_id, ids }) => adjustCommentsCount(task_id, ids.length),
+      // Bulk imports and missed events are cheaper to pick up with one reload
+      'task.bulk_created': () => loadTasks(),
+      'reset': () => loadTasks(),
+    });
+  // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [statusFilter, priorityFilter]);
+
+  // Without a shared broker (EVENTS_BACKEND=redis) the stream only carries changes made
+  // through the server worker it is connected to, so poll the change log for the rest,
+  // periodically and on return to the tab
+  useEffect(() => {
+    if (!pollChanges) return undefined;
+
+    const applyChanges = async () => {
+      if (watermarkRef.current === null) return;
+      let body;
+      do {
+        body = (await getChanges(watermarkRef.current)).data;
+        watermarkRef.current = body.watermark;
+
+        // Comment writes change their task's comments_count, which only a task read returns
+        const changed = new Map(body.tasks.map(task => [task.id, task]));
+        const commentedIds = [...new Set(body.comments.map(comment => comment.task_id))]
+          .filter(id => !changed.has(id));
+        if (commentedIds.length) {
+          const response = await getTasksByIds(commentedIds);
+          response.data.tasks.forEach(task => changed.set(task.id, task));
+        }
+
+        const deleted = new Set(body.deleted.tasks);
+        setTasks(prev => {
+          const kept = prev
+            .filter(task => !deleted.has(task.id))
+            .map(task => changed.has(task.id) ? { ...task, ...changed.get(task.id) } : task)
+            // Archived tasks leave the default list
+            .filter(task => !task.archived && matchesFilters(task));
+          const known = new Set(prev.map(task => task.id));
+          const added = [...changed.values()].filter(task =>
+            !known.has(task.id) && !task.archived && matchesFilters(task));
+          return [...added, ...kept];
+        });
+      } while (body.has_more);
+    };
+
+    const refresh = () => {
+      if (document.visibilityState !== 'visible') return;
+      applyChanges().catch(error => console.error('Error polling changes:', error));
+    };
+    const timer = setInterval(refresh, BACKGROUND_REFRESH_MS);
+    document.addEventListener('visibilitychange', refresh);
+    return () => {
+      clearInterval(timer);
+      document.removeEventListener('visibilitychange', refresh);
+    };
+  // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [pollChanges, statusFilter, priorityFilter]);
+
   const handleCreateTask = async (taskData) => {
     try {
       const response = await createTask(taskData);
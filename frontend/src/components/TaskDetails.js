@@ -7,6 +7,8 @@ const TaskDetails = ({ task, onClose, onEdit, onDelete }) => {
   const [commentAuthor, setCommentAuthor] = useState('');
   const [loadingComments, setLoadingComments] = useState(true);
   const [addingComment, setAddingComment] = useState(false);
+  const [commentsCursor, setCommentsCursor] = useState(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
 
   useEffect(() => {
     loadComments();
@@ -18,6 +20,7 @@ const TaskDetails = ({ task, onClose, onEdit, onDelete }) => {
       setLoadingComments(true);
       const response = await getTaskComments(task.id);
       setComments(response.data.comments);
+      setCommentsCursor(response.data.next_cursor);
     } catch (error) {
       console.error('Error loading comments:', error);
     } finally {
@@ -25,6 +28,19 @@ const TaskDetails = ({ task, onClose, onEdit, onDelete }) => {
     }
   };
 
+  const loadOlderComments = async () => {
+    try {
+      setLoadingOlder(true);
+      const response = await getTaskComments(task.id, commentsCursor);
+      setComments(prev => [...prev, ...response.data.comments]);
+      setCommentsCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Error loading comments:', error);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const handleAddComment = async (e) => {
     e.preventDefault();
     
@@ -121,7 +137,7 @@ const TaskDetails = ({ task, onClose, onEdit, onDelete }) => {
 
           {/* Comments Section */}
           <div>
-            <h3 style={{ marginBottom: '1rem' }}>Comments ({comments.length})</h3>
+            <h3 style={{ marginBottom: '1rem' }}>Comments ({commentsCursor ? task.comments_count : comments.length})</h3>
             
             {/* Add Comment Form */}
             <form onSubmit={handleAddComment} style={{ marginBottom: '1.5rem' }}>
@@ -186,6 +202,16 @@ const TaskDetails = ({ task, onClose, onEdit, onDelete }) => {
                     <p style={{ margin: 0, color: '#495057' }}>{comment.content}</p>
                   </div>
                 ))}
+                {commentsCursor && (
+                  <button
+                    className="btn btn-secondary"
+                    onClick={loadOlderComments}
+                    disabled={loadingOlder}
+                    style={{ width: '100%' }}
+                  >
+                    {loadingOlder ? 'Loading...' : 'Load older comments'}
+                  </button>
+                )}
               </div>
             )}
           </div>
@@ -53,6 +53,11 @@ export const getTask = async (id) => {
   return api.get(`/tasks/${id}`);
 };
 
+// Several tasks by id in one request; ids that don't exist come back in response.data.missing
+export const getTasksByIds = async (ids) => {
+  return api.get('/tasks', { params: { ids: ids.join(',') } });
+};
+
 export const createTask = async (taskData) => {
   return api.post('/tasks', taskData);
 };
@@ -69,9 +74,18 @@ export const getTaskStats = async () => {
   return api.get('/tasks/stats');
 };
 
+// Changes after a watermark from a previous call, or 'latest' for just the current watermark.
+// Changed tasks come in response.data.tasks, deleted ids in response.data.deleted.
+export const getChanges = async (since, limit = 500) => {
+  return api.get('/sync', { params: { since, limit } });
+};
+
 // Comment API functions
-export const getTaskComments = async (taskId) => {
-  return api.get(`/tasks/${taskId}/comments`);
+// Comments come newest first, a page at a time; pass the previous next_cursor for older ones
+export const getTaskComments = async (taskId, cursor = null, limit = 20) => {
+  const params = { limit };
+  if (cursor) params.cursor = cursor;
+  return api.get(`/tasks/${taskId}/comments`, { params });
 };
 
 export const createComment = async (taskId, commentData) => {
@@ -90,4 +104,25 @@ export const deleteComment = async (commentId) => {
   return api.delete(`/comments/${commentId}`);
 };
 
-export default api;
\ No newline at end of file
+// Several API calls in one round trip: requests is a list of { method, path, body },
+// with paths relative to the API root (e.g. '/tasks/1'). Each entry of
+// response.data.responses holds the status and body of the matching request.
+export const batchRequests = async (requests) => {
+  return api.post('/batch', {
+    requests: requests.map(({ method = 'GET', path, body }) => ({ method, path: `/api${path}`, body })),
+  });
+};
+
+export default api;
+
+// Live change feed: calls handlers[eventType](data) for every server-sent event.
+// EventSource reconnects on its own and resumes from the last received event id.
+// Every connection opens with a hello event whose complete flag is false when the
+// stream misses changes made through other server workers.
+export const subscribeToEvents = (handlers) => {
+  const source = new EventSource(`${baseURL}/events`);
+  Object.entries(handlers).forEach(([eventType, handler]) => {
+    source.addEventListener(eventType, (event) => handler(JSON.parse(event.data)));
+  });
+  return () => source.close();
+};